@@ -5,16 +5,23 @@ This module provides the configuration and connection utilities for PesaDB,
 replacing the MongoDB connection used in the original application.
 """
 
+import asyncio
+import logging
 import os
-import json
-from typing import Any, Dict, List, Optional, Union
+import re
+from contextlib import asynccontextmanager
+from functools import lru_cache
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional, Sequence, Tuple, Union
 from datetime import datetime
 import aiohttp
+import orjson
 from dotenv import load_dotenv
 
 # Load environment variables
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 # PesaDB Configuration
 class PesaDBConfig:
     """Configuration class for PesaDB connection"""
@@ -23,7 +30,11 @@ class PesaDBConfig:
         self.api_url = os.environ.get('PESADB_API_URL')
         self.api_key = os.environ.get('PESADB_API_KEY')
         self.database = os.environ.get('PESADB_DATABASE')
+        # HTTP connection pool settings for the shared client session
+        self.pool_size = int(os.environ.get('PESADB_POOL_SIZE', '20'))
+        self.keepalive_timeout = float(os.environ.get('PESADB_KEEPALIVE_TIMEOUT', '30'))
         self._validated = False
+        self._headers: Optional[Dict[str, str]] = None
 
     def validate(self):
         """Validate configuration - call this before first use"""
@@ -55,27 +66,96 @@ class PesaDBConfig:
 
     def get_headers(self) -> Dict[str, str]:
         """Get headers for PesaDB API requests"""
-        self.validate()  # Ensure config is validated before use
-        return {
-            'Content-Type': 'application/json',
-            'X-API-Key': self.api_key
-        }
+        if self._headers is None:
+            self.validate()  # Ensure config is validated before use
+            self._headers = {
+                'Content-Type': 'application/json',
+                'X-API-Key': self.api_key
+            }
+        return self._headers
 
 
 # Global config instance (does not validate until first use)
 config = PesaDBConfig()
 
 
+class PesaDBError(Exception):
+    """Error reported by the PesaDB API (code is its error code, if given)"""
+
+    def __init__(self, message: str, code: Optional[str] = None):
+        super().__init__(message)
+        self.code = code
+
+
+class TableNotFoundError(PesaDBError):
+    """The statement referenced a table that doesn't exist"""
+
+
+class AlreadyExistsError(PesaDBError):
+    """The statement would create a table, index or row that already exists"""
+
+
+# PesaDB error messages meaning a table is missing (it reports no SQLSTATE)
+TABLE_MISSING_RE = re.compile(
+    r"tablenotfound|no such table|unknown table|table.*(?:does not exist|not found)|does not exist.*table",
+    re.IGNORECASE | re.DOTALL
+)
+
+# PesaDB error messages for creating something that is already there
+ALREADY_EXISTS_RE = re.compile(r"already exists|duplicate", re.IGNORECASE)
+
+
+# Per-request timeout for PesaDB API calls
+REQUEST_TIMEOUT = aiohttp.ClientTimeout(total=30)
+
+
 class PesaDBClient:
     """Async client for PesaDB operations"""
     
     def __init__(self, config: PesaDBConfig):
         self.config = config
         self.session: Optional[aiohttp.ClientSession] = None
+        # Request counters reported by pool_stats()
+        self.queries = 0
+        self.in_flight = 0
+        self.peak_in_flight = 0
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        """
+        Get the shared HTTP session, creating it on first use
+
+        The session owns a pooled connector with keep-alive, so every query
+        reuses open connections instead of paying TCP/TLS setup each time.
+        """
+        if self.session is None or self.session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.config.pool_size,
+                keepalive_timeout=self.config.keepalive_timeout
+            )
+            self.session = aiohttp.ClientSession(connector=connector, timeout=REQUEST_TIMEOUT)
+        return self.session
     
+    def pool_stats(self) -> Dict[str, Any]:
+        """
+        Get connection pool usage
+
+        Returns:
+            Dictionary with the pool size, whether the session is open, and
+            query counts: total sent, currently awaiting a response, and the
+            most ever in flight at once. A peak at pool_size means queries
+            have been waiting for a free connection.
+        """
+        return {
+            'pool_size': self.config.pool_size,
+            'session_open': self.session is not None and not self.session.closed,
+            'queries': self.queries,
+            'in_flight': self.in_flight,
+            'peak_in_flight': self.peak_in_flight
+        }
+
     async def __aenter__(self):
         """Async context manager entry"""
-        self.session = aiohttp.ClientSession()
+        self._get_session()
         return self
     
     async def __aexit__(self, exc_type, exc_val, exc_tb):
@@ -83,13 +163,19 @@ class PesaDBClient:
         if self.session:
             await self.session.close()
     
-    async def query(self, sql: str, database: Optional[str] = None) -> List[Dict[str, Any]]:
+    async def query(
+        self,
+        sql: str,
+        database: Optional[str] = None,
+        params: Optional[Sequence[Any]] = None
+    ) -> List[Dict[str, Any]]:
         """
         Execute a SQL query on PesaDB
 
         Args:
-            sql: SQL query string
+            sql: SQL query string, optionally with ? placeholders
             database: Optional database name (defaults to config database)
+            params: Values for the ? placeholders in sql
 
         Returns:
             List of result rows as dictionaries
@@ -100,8 +186,9 @@ class PesaDBClient:
         # Validate config before making requests
         self.config.validate()
 
-        if not self.session:
-            self.session = aiohttp.ClientSession()
+        sql = bind_params(sql, params)
+
+        session = self._get_session()
 
         db = database or self.config.database
         url = f"{self.config.api_url}/query"
@@ -111,26 +198,30 @@ class PesaDBClient:
             'db': db
         }
 
-        # DEBUG: Log the exact SQL being sent
-        import logging
-        logger = logging.getLogger(__name__)
-        logger.debug(f"🔍 PesaDB Query - SQL: {sql}")
-        logger.debug(f"🔍 PesaDB Query - Database: {db}")
-        logger.debug(f"🔍 PesaDB Query - Payload: {payload}")
-
+        # DEBUG: Log the exact SQL being sent (guarded - formatting the
+        # payload and response costs more than the request itself)
+        debug = logger.isEnabledFor(logging.DEBUG)
+        if debug:
+            logger.debug(f"🔍 PesaDB Query - SQL: {sql}")
+            logger.debug(f"🔍 PesaDB Query - Database: {db}")
+            logger.debug(f"🔍 PesaDB Query - Payload: {payload}")
+
+        self.queries += 1
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
         try:
-            async with self.session.post(
+            async with session.post(
                 url,
                 headers=self.config.get_headers(),
-                json=payload,
-                timeout=aiohttp.ClientTimeout(total=30)
+                data=orjson.dumps(payload)
             ) as response:
                 # Get HTTP status code
                 http_status = response.status
 
-                result = await response.json()
+                result = orjson.loads(await response.read())
 
-                logger.debug(f"🔍 PesaDB Response: {result}")
+                if debug:
+                    logger.debug(f"🔍 PesaDB Response: {result}")
 
                 if not result.get('success'):
                     error_msg = result.get('error', 'Database query failed')
@@ -170,7 +261,13 @@ class PesaDBClient:
                         logger.error("   PesaDB has specific SQL dialect requirements.")
                         logger.error("   Check the SQL statement for compatibility issues.")
 
-                    raise Exception(f"PesaDB Error: {error_msg}")
+                    if TABLE_MISSING_RE.search(error_msg):
+                        error_class = TableNotFoundError
+                    elif ALREADY_EXISTS_RE.search(error_msg):
+                        error_class = AlreadyExistsError
+                    else:
+                        error_class = PesaDBError
+                    raise error_class(f"PesaDB Error: {error_msg}", result.get('code'))
 
                 return result.get('data', [])
 
@@ -181,21 +278,32 @@ class PesaDBClient:
         except Exception as e:
             logger.error(f"❌ PesaDB Query Error - SQL: {sql}")
             logger.error(f"❌ PesaDB Query Error - Message: {str(e)}")
+            if isinstance(e, PesaDBError):
+                # Same message as other errors, but keep the type and code
+                raise type(e)(f"PesaDB Query Error: {str(e)}", e.code) from e
             raise Exception(f"PesaDB Query Error: {str(e)}")
+        finally:
+            self.in_flight -= 1
     
-    async def execute(self, sql: str, database: Optional[str] = None) -> bool:
+    async def execute(
+        self,
+        sql: str,
+        database: Optional[str] = None,
+        params: Optional[Sequence[Any]] = None
+    ) -> bool:
         """
         Execute a SQL command (INSERT, UPDATE, DELETE, CREATE, etc.)
         
         Args:
-            sql: SQL command string
+            sql: SQL command string, optionally with ? placeholders
             database: Optional database name
+            params: Values for the ? placeholders in sql
         
         Returns:
             True if successful
         """
         try:
-            await self.query(sql, database)
+            await self.query(sql, database, params)
             return True
         except Exception:
             raise
@@ -266,34 +374,298 @@ def get_client() -> PesaDBClient:
     return _client_instance
 
 
-async def query_db(sql: str, database: Optional[str] = None) -> List[Dict[str, Any]]:
+async def close_client():
+    """
+    Close the global client's HTTP session, if one was opened
+
+    Scripts share one client (and its pooled keep-alive connections) for
+    all their queries and call this once before exiting.
+    """
+    if _client_instance is not None:
+        await _client_instance.close()
+
+
+async def query_db(
+    sql: str,
+    database: Optional[str] = None,
+    params: Optional[Sequence[Any]] = None
+) -> List[Dict[str, Any]]:
     """
     Convenience function to execute a query
     
     Args:
-        sql: SQL query string
+        sql: SQL query string, optionally with ? placeholders
         database: Optional database name
+        params: Values for the ? placeholders in sql
     
     Returns:
         List of result rows
+
+    Example:
+        await query_db("SELECT * FROM users WHERE id = ?", params=[user_id])
+    """
+    client = get_client()
+    return await client.query(sql, database, params)
+
+
+async def query_db_stream(
+    sql: str,
+    database: Optional[str] = None,
+    params: Optional[Sequence[Any]] = None,
+    page_size: int = 500,
+    limit: Optional[int] = None
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Execute a query and yield its rows as they are fetched
+
+    PesaDB answers each request with a single JSON document, so the result
+    is fetched in LIMIT/OFFSET pages. The next page is requested while the
+    caller works through the current one, so the round trips overlap with
+    processing; at most two pages are held at a time, and a caller that
+    stops early may cause one page to be fetched unused. The query needs a
+    deterministic ORDER BY and no LIMIT of its own.
+
+    Args:
+        sql: SQL query string, optionally with ? placeholders
+        database: Optional database name
+        params: Values for the ? placeholders in sql
+        page_size: Rows fetched per request
+        limit: Maximum rows to yield (None for all); no page past it is fetched
+
+    Example:
+        async for row in query_db_stream("SELECT * FROM transactions ORDER BY id"):
+            ...
     """
     client = get_client()
-    return await client.query(sql, database)
+    page_size = int(page_size)
 
+    def fetch(offset: int) -> "asyncio.Task":
+        size = page_size if limit is None else min(page_size, limit - offset)
+        return asyncio.ensure_future(
+            client.query(f"{sql} LIMIT {size} OFFSET {offset}", database, params)
+        )
 
-async def execute_db(sql: str, database: Optional[str] = None) -> bool:
+    offset = 0
+    pending = fetch(offset)
+    try:
+        while True:
+            page = await pending
+            pending = None
+            if len(page) == page_size and (limit is None or offset + page_size < limit):
+                offset += page_size
+                pending = fetch(offset)
+            for row in page:
+                yield row
+            if pending is None:
+                return
+    finally:
+        # The caller stopped early - don't leave the prefetch running
+        if pending is not None and not pending.done():
+            pending.cancel()
+
+
+async def execute_db(
+    sql: str,
+    database: Optional[str] = None,
+    params: Optional[Sequence[Any]] = None
+) -> bool:
     """
     Convenience function to execute a command
 
     Args:
-        sql: SQL command string
+        sql: SQL command string, optionally with ? placeholders
         database: Optional database name
+        params: Values for the ? placeholders in sql
 
     Returns:
         True if successful
     """
     client = get_client()
-    return await client.execute(sql, database)
+    return await client.execute(sql, database, params)
+
+
+async def execute_batch(
+    statements: Iterable[str],
+    database: Optional[str] = None
+) -> int:
+    """
+    Execute several independent SQL commands, pipelined over the session pool
+
+    PesaDB's HTTP API takes one statement per request, so instead of
+    waiting for each round trip in turn the statements are sent
+    concurrently, at most config.pool_size at a time.
+
+    Args:
+        statements: Complete SQL commands (already bound)
+        database: Optional database name
+
+    Returns:
+        Number of statements executed
+
+    Raises:
+        Exception: The first failure, after all statements have finished
+    """
+    client = get_client()
+    limit = asyncio.Semaphore(max(1, config.pool_size))
+
+    async def run(sql: str) -> bool:
+        async with limit:
+            return await client.execute(sql, database)
+
+    results = await asyncio.gather(*(run(sql) for sql in statements), return_exceptions=True)
+    for result in results:
+        if isinstance(result, Exception):
+            raise result
+    return len(results)
+
+
+class Pipeline:
+    """
+    Collects independent SQL commands and sends them together on flush()
+
+    Use through pipeline(); statements run via execute_batch(), so they must
+    not depend on each other's effects or order.
+    """
+
+    def __init__(self, database: Optional[str] = None):
+        self.database = database
+        self._statements: List[str] = []
+
+    def execute(self, sql: str, params: Optional[Sequence[Any]] = None):
+        """Queue a command (bound now, sent on flush)"""
+        self._statements.append(bind_params(sql, params))
+
+    async def flush(self) -> int:
+        """Send all queued commands, returning how many were executed"""
+        statements, self._statements = self._statements, []
+        if not statements:
+            return 0
+        return await execute_batch(statements, self.database)
+
+
+@asynccontextmanager
+async def pipeline(database: Optional[str] = None) -> AsyncIterator[Pipeline]:
+    """
+    Queue commands in a block and send them together when it exits
+
+    Nothing is sent if the block raises.
+
+    Example:
+        async with pipeline() as p:
+            p.execute(build_insert('transactions', txn))
+            p.execute(build_insert('sms_import_logs', log))
+    """
+    batch = Pipeline(database)
+    yield batch
+    await batch.flush()
+
+
+class BatchedInserter:
+    """
+    Coalesces rows inserted into one table in bursts into multi-row INSERTs
+
+    While running, add() queues a row and returns at once; a background task
+    waits flush_delay seconds after the first queued row for others to
+    arrive, then writes up to batch_size rows per statement. Rows with the
+    same columns share an INSERT; if PesaDB rejects it, those rows are
+    inserted one by one. While stopped, add() inserts the row directly.
+
+    start() needs a running event loop (application startup); stop() writes
+    whatever is still queued, so call it before closing the client.
+    """
+
+    def __init__(self, table: str, batch_size: int = 100, flush_delay: float = 0.05):
+        self.table = table
+        self.batch_size = batch_size
+        self.flush_delay = flush_delay
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None
+
+    def start(self):
+        """Start the background writer (no-op if already running)"""
+        if self._task is not None:
+            return
+        self._queue = asyncio.Queue()
+        self._task = asyncio.create_task(self._run(self._queue))
+
+    async def stop(self):
+        """Write all queued rows, then stop the background writer"""
+        if self._task is None:
+            return
+        queue, task = self._queue, self._task
+        # Rows added from here on are written directly
+        self._queue = None
+        self._task = None
+
+        await queue.join()
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+    def add(self, row: Dict[str, Any]) -> "asyncio.Future":
+        """
+        Insert a row, batched with others while the writer is running
+
+        Returns:
+            Future resolved once the row is written; await it only if the
+            caller needs the row stored before it continues
+        """
+        if self._queue is None:
+            future = asyncio.ensure_future(execute_db(build_insert(self.table, row)))
+        else:
+            future = asyncio.get_running_loop().create_future()
+            self._queue.put_nowait((row, future))
+        # Fire-and-forget callers never look at the result, so failures are
+        # logged here instead of as "exception was never retrieved"
+        future.add_done_callback(self._log_failure)
+        return future
+
+    def _log_failure(self, future: "asyncio.Future"):
+        if not future.cancelled() and future.exception() is not None:
+            logger.error(f"❌ Failed to write a queued {self.table} row: {future.exception()}")
+
+    async def _run(self, queue: asyncio.Queue):
+        """Background loop writing queued rows in batches"""
+        while True:
+            batch = [await queue.get()]
+            await asyncio.sleep(self.flush_delay)
+            while len(batch) < self.batch_size and not queue.empty():
+                batch.append(queue.get_nowait())
+
+            try:
+                await self._write(batch)
+            finally:
+                for _ in batch:
+                    queue.task_done()
+
+    async def _write(self, batch: List[Tuple[Dict[str, Any], "asyncio.Future"]]):
+        """Insert one batch, settling each row's future"""
+        by_columns: Dict[Tuple[str, ...], List[Tuple[Dict[str, Any], "asyncio.Future"]]] = {}
+        for row, future in batch:
+            by_columns.setdefault(tuple(row), []).append((row, future))
+
+        for entries in by_columns.values():
+            try:
+                await execute_db(build_insert_many(self.table, [row for row, _ in entries]))
+                results = [True] * len(entries)
+            except Exception:
+                results = await asyncio.gather(
+                    *(execute_db(build_insert(self.table, row)) for row, _ in entries),
+                    return_exceptions=True
+                )
+            for (_, future), result in zip(entries, results):
+                if future.done():
+                    continue
+                if isinstance(result, Exception):
+                    future.set_exception(result)
+                else:
+                    future.set_result(result)
 
 
 async def create_database(database_name: str) -> bool:
@@ -341,6 +713,10 @@ def escape_string(value: Any) -> str:
     Returns:
         Escaped string ready for SQL
     """
+    # Plain strings are by far the most common value - check them first
+    if type(value) is str:
+        return "'" + value.replace("'", "''") + "'"
+
     if value is None:
         return 'NULL'
     
@@ -353,12 +729,8 @@ def escape_string(value: Any) -> str:
     if isinstance(value, datetime):
         return f"'{value.isoformat()}'"
     
-    if isinstance(value, dict):
-        json_str = json.dumps(value).replace("'", "''")
-        return f"'{json_str}'"
-
-    if isinstance(value, list):
-        json_str = json.dumps(value).replace("'", "''")
+    if isinstance(value, (dict, list)):
+        json_str = orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS).decode().replace("'", "''")
         return f"'{json_str}'"
     
     # String escaping - replace single quotes with double single quotes
@@ -366,6 +738,95 @@ def escape_string(value: Any) -> str:
     return f"'{str_value}'"
 
 
+def _bind_value(value: Any) -> str:
+    """Render one bound parameter: tuples become value lists, see bind_params"""
+    if isinstance(value, tuple):
+        if not value:
+            raise ValueError("Cannot bind an empty tuple")
+        return ', '.join(escape_string(item) for item in value)
+    return escape_string(value)
+
+
+# Splits SQL into alternating code / single-quoted literal segments
+_SQL_LITERAL_RE = re.compile(r"('(?:[^']|'')*')")
+
+
+@lru_cache(maxsize=512)
+def _prepare(sql: str) -> Tuple[str, ...]:
+    """
+    Split a SQL template into the text between its ? placeholders
+
+    The closest PesaDB gets to a prepared statement: each template is parsed
+    once and later calls only render and interleave the values.
+    """
+    segments = _SQL_LITERAL_RE.split(sql)
+    pieces = ['']
+    for i, segment in enumerate(segments):
+        # Even segments are SQL code, odd segments are string literals
+        if i % 2:
+            pieces[-1] += segment
+            continue
+        code = segment.split('?')
+        pieces[-1] += code[0]
+        pieces.extend(code[1:])
+    return tuple(pieces)
+
+
+def bind_params(sql: str, params: Optional[Sequence[Any]] = None) -> str:
+    """
+    Bind values to ? placeholders in a SQL statement
+
+    PesaDB's HTTP API only accepts complete SQL text, so parameters are bound
+    client-side: every value goes through escape_string(), which keeps
+    user-supplied data out of the SQL syntax. Question marks inside quoted
+    string literals are left untouched.
+
+    A tuple value binds as a comma-separated list of escaped values, so
+    "id IN (?)" takes any number of IDs with the same SQL template. The
+    parentheses are part of the template, not the bound value.
+
+    With no params the statement is returned unchanged, without checking
+    it for placeholders.
+
+    Args:
+        sql: SQL statement with ? placeholders
+        params: Values to bind, in placeholder order
+
+    Returns:
+        SQL statement with all placeholders replaced
+
+    Raises:
+        ValueError: If the number of placeholders and values don't match
+    """
+    if not params:
+        return sql
+
+    pieces = _prepare(sql)
+    placeholder_count = len(pieces) - 1
+    if placeholder_count != len(params):
+        raise ValueError(
+            f"SQL has {placeholder_count} placeholders but {len(params)} parameters were given"
+        )
+
+    return pieces[0] + ''.join(
+        _bind_value(value) + piece for value, piece in zip(params, pieces[1:])
+    )
+
+
+# Statement shapes repeat per call site, so the column lists are built once
+# per (table, columns) and only the values are rendered on each call
+@lru_cache(maxsize=256)
+def _insert_prefix(table: str, columns: Tuple[str, ...]) -> str:
+    """INSERT statement up to (not including) the VALUES tuples"""
+    return f"INSERT INTO {table} ({', '.join(columns)}) VALUES "
+
+
+@lru_cache(maxsize=256)
+def _update_assignments(columns: Tuple[str, ...]) -> Tuple[str, ...]:
+    """'column = ' fragments of an UPDATE SET clause, in column order"""
+    return tuple(f"{column} = " for column in columns)
+
+
 def build_insert(table: str, data: Dict[str, Any]) -> str:
     """
     Build an INSERT SQL statement
@@ -377,36 +838,64 @@ def build_insert(table: str, data: Dict[str, Any]) -> str:
     Returns:
         SQL INSERT statement
     """
-    columns = ', '.join(data.keys())
-    values = ', '.join(escape_string(v) for v in data.values())
-    return f"INSERT INTO {table} ({columns}) VALUES ({values})"
+    values = ', '.join([escape_string(v) for v in data.values()])
+    return f"{_insert_prefix(table, tuple(data))}({values})"
 
 
-def build_update(table: str, data: Dict[str, Any], where: str) -> str:
+def build_insert_many(table: str, rows: Sequence[Dict[str, Any]]) -> str:
+    """
+    Build a multi-row INSERT SQL statement
+    
+    Args:
+        table: Table name
+        rows: Dictionaries of column: value pairs, all with the same columns
+    
+    Returns:
+        SQL INSERT statement with one VALUES tuple per row
+    """
+    column_names = tuple(rows[0])
+    values = ', '.join([
+        '(' + ', '.join([escape_string(row[column]) for column in column_names]) + ')'
+        for row in rows
+    ])
+    return _insert_prefix(table, column_names) + values
+
+
+def build_update(
+    table: str,
+    data: Dict[str, Any],
+    where: str,
+    params: Optional[Sequence[Any]] = None
+) -> str:
     """
     Build an UPDATE SQL statement
     
     Args:
         table: Table name
         data: Dictionary of column: value pairs to update
-        where: WHERE clause (without 'WHERE' keyword)
+        where: WHERE clause (without 'WHERE' keyword), optionally with ? placeholders
+        params: Values for the ? placeholders in where
     
     Returns:
         SQL UPDATE statement
     """
-    set_clause = ', '.join(f"{k} = {escape_string(v)}" for k, v in data.items())
-    return f"UPDATE {table} SET {set_clause} WHERE {where}"
+    set_clause = ', '.join([
+        assignment + escape_string(value)
+        for assignment, value in zip(_update_assignments(tuple(data)), data.values())
+    ])
+    return f"UPDATE {table} SET {set_clause} WHERE {bind_params(where, params)}"
 
 
-def build_delete(table: str, where: str) -> str:
+def build_delete(table: str, where: str, params: Optional[Sequence[Any]] = None) -> str:
     """
     Build a DELETE SQL statement
     
     Args:
         table: Table name
-        where: WHERE clause (without 'WHERE' keyword)
+        where: WHERE clause (without 'WHERE' keyword), optionally with ? placeholders
+        params: Values for the ? placeholders in where
     
     Returns:
         SQL DELETE statement
     """
-    return f"DELETE FROM {table} WHERE {where}"
+    return f"DELETE FROM {table} WHERE {bind_params(where, params)}"
@@ -19,8 +19,9 @@ database is upgraded, they automatically benefit from native performance.
 """
 
 import logging
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 from collections import defaultdict
+from config.pesadb import bind_params
 
 logger = logging.getLogger(__name__)
 
@@ -28,7 +29,8 @@ logger = logging.getLogger(__name__)
 async def count_rows_safe(
     table: str,
     where: str = "",
-    query_func: callable = None
+    query_func: callable = None,
+    params: Optional[Sequence[Any]] = None
 ) -> int:
     """
     Count rows with automatic fallback for databases without COUNT support
@@ -42,8 +44,9 @@ async def count_rows_safe(
     
     Args:
         table: Table name
-        where: WHERE clause (without 'WHERE' keyword)
+        where: WHERE clause (without 'WHERE' keyword), may contain ? placeholders
         query_func: Query function to use (for dependency injection)
+        params: Values for the ? placeholders in where
     
     Returns:
         Row count
@@ -56,12 +59,14 @@ async def count_rows_safe(
     Example:
         count = await count_rows_safe('users')
         count = await count_rows_safe('categories', "is_default = TRUE")
+        count = await count_rows_safe('transactions', "user_id = ?", params=[user_id])
     """
     # Import here to avoid circular dependency
     if query_func is None:
         from config.pesadb import query_db
         query_func = query_db
     
+    where = bind_params(where, params)
     where_clause = f"WHERE {where}" if where else ""
     
     try:
@@ -161,7 +166,8 @@ async def sum_safe(
     table: str,
     column: str,
     where: str = "",
-    query_func: callable = None
+    query_func: callable = None,
+    params: Optional[Sequence[Any]] = None
 ) -> float:
     """
     Sum column values with automatic fallback
@@ -171,8 +177,9 @@ async def sum_safe(
     Args:
         table: Table name
         column: Column to sum
-        where: WHERE clause (without 'WHERE' keyword)
+        where: WHERE clause (without 'WHERE' keyword), may contain ? placeholders
         query_func: Query function to use
+        params: Values for the ? placeholders in where
     
     Returns:
         Sum of column values (0.0 if no rows)
@@ -181,6 +188,7 @@ async def sum_safe(
         from config.pesadb import query_db
         query_func = query_db
     
+    where = bind_params(where, params)
     where_clause = f"WHERE {where}" if where else ""
     
     try:
@@ -223,7 +231,8 @@ async def avg_safe(
     table: str,
     column: str,
     where: str = "",
-    query_func: callable = None
+    query_func: callable = None,
+    params: Optional[Sequence[Any]] = None
 ) -> Optional[float]:
     """
     Average column values with automatic fallback
@@ -237,6 +246,7 @@ async def avg_safe(
         from config.pesadb import query_db
         query_func = query_db
     
+    where = bind_params(where, params)
     where_clause = f"WHERE {where}" if where else ""
     
     try:
@@ -288,7 +298,8 @@ async def aggregate_safe(
     group_by: Optional[str] = None,
     having: str = "",
     order_by: str = "",
-    query_func: callable = None
+    query_func: callable = None,
+    params: Optional[Sequence[Any]] = None
 ) -> List[Dict[str, Any]]:
     """
     Perform multiple aggregations with automatic fallback
@@ -300,11 +311,12 @@ async def aggregate_safe(
         table: Table name
         aggregates: List of (function, column) tuples
                    e.g., [('COUNT', '*'), ('SUM', 'amount'), ('AVG', 'amount')]
-        where: WHERE clause (without 'WHERE' keyword)
+        where: WHERE clause (without 'WHERE' keyword), may contain ? placeholders
         group_by: Column to group by (single column only)
         having: HAVING clause (without 'HAVING' keyword)
         order_by: ORDER BY clause (without 'ORDER BY' keyword)
         query_func: Query function to use
+        params: Values for the ? placeholders in where
     
     Returns:
         List of aggregated result rows
@@ -313,14 +325,17 @@ async def aggregate_safe(
         results = await aggregate_safe(
             'transactions',
             [('COUNT', '*'), ('SUM', 'amount')],
-            where="user_id = 'user123' AND type = 'expense'",
-            group_by='category_id'
+            where="user_id = ? AND type = 'expense'",
+            group_by='category_id',
+            params=['user123']
         )
     """
     if query_func is None:
         from config.pesadb import query_db
         query_func = query_db
     
+    where = bind_params(where, params)
+
     try:
         # Try native aggregation
         agg_select = []
@@ -0,0 +1,241 @@
+"""
+Running multi-statement SQL scripts against PesaDB
+
+PesaDB's HTTP API takes one statement per request and has no batch
+endpoint, so a script like scripts/init_pesadb.sql can't be sent in one
+call. Instead its statements are grouped into waves of independent
+statements, and each wave is sent concurrently.
+"""
+import asyncio
+import re
+from functools import lru_cache
+from pathlib import Path
+from typing import AsyncIterator, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+from config.pesadb import execute_db
+
+# Schema statements sent at once; each one is its own HTTP request
+SCHEMA_PARALLELISM = 8
+
+# Largest multi-row INSERT built from a script's seed rows
+MAX_MERGED_INSERT_BYTES = 256 * 1024
+
+# String literals (kept whole), comments, or statement separators
+_SCRIPT_TOKEN_RE = re.compile(r"('(?:[^']|'')*')|(--[^\n]*|/\*.*?\*/)|(;)", re.DOTALL)
+
+_CREATE_TABLE_RE = re.compile(r'^CREATE\s+TABLE\s+(\w+)', re.IGNORECASE)
+_INSERT_RE = re.compile(r'^INSERT\s+INTO\s+(\w+)', re.IGNORECASE)
+_REFERENCES_RE = re.compile(r'REFERENCES\s+(\w+)', re.IGNORECASE)
+_INSERT_VALUES_RE = re.compile(
+    r'^(INSERT\s+INTO\s+\w+\s*\([^)]*\))\s*VALUES\s*(\(.*\))$',
+    re.IGNORECASE | re.DOTALL
+)
+
+
+def _scan_statements(text: str) -> Tuple[List[str], str]:
+    """
+    Take the complete statements off the front of some script text
+
+    Returns:
+        (statements ended by a semicolon, without comments and stripped,
+        the raw text after the last semicolon)
+    """
+    statements = []
+    current = []
+    position = start = 0
+    for match in _SCRIPT_TOKEN_RE.finditer(text):
+        current.append(text[position:match.start()])
+        position = match.end()
+        literal, _comment, separator = match.groups()
+        if literal:
+            current.append(literal)
+        elif separator:
+            statement = ''.join(current).strip()
+            if statement:
+                statements.append(statement)
+            current = []
+            start = position
+    return statements, text[start:]
+
+
+@lru_cache(maxsize=8)
+def split_sql_script(sql_content: str) -> Tuple[str, ...]:
+    """
+    Split a SQL script into statements, dropping comments
+
+    -- and /* */ comments are removed wherever they appear, including
+    before a statement and at the end of a line. Semicolons and comment
+    markers inside quoted literals are left alone.
+
+    Args:
+        sql_content: Script text
+
+    Returns:
+        Non-empty statements, stripped, in script order
+    """
+    # A final semicolon is optional
+    statements, _ = _scan_statements(sql_content + ';')
+    return tuple(statements)
+
+
+def iter_sql_statements(path: Union[str, Path]) -> Iterator[str]:
+    """
+    Read a SQL script file a statement at a time
+
+    Same rules as split_sql_script, but only the statement being read is
+    held in memory, not the whole file.
+
+    Args:
+        path: Script file (UTF-8)
+
+    Yields:
+        Non-empty statements, stripped, in script order
+    """
+    buffer = ''
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            buffer += line
+            # Only cut at a line end that is outside any literal or block comment
+            if ';' in line and buffer.count("'") % 2 == 0 and buffer.rfind('/*') <= buffer.rfind('*/'):
+                statements, buffer = _scan_statements(buffer)
+                yield from statements
+    statements, _ = _scan_statements(buffer + ';')
+    yield from statements
+
+
+def plan_schema_waves(statements: Sequence[str]) -> List[List[str]]:
+    """
+    Group schema statements into waves that can each run concurrently
+
+    Tables come first, a wave per foreign key depth, so a table is created
+    only after every table it references. Other DDL (indexes) follows, then
+    seed INSERTs one table at a time in script order, so the system user
+    exists before the categories that reference it.
+
+    Args:
+        statements: SQL statements in script order
+
+    Returns:
+        Waves of statements; statements within a wave are independent
+    """
+    tables: Dict[str, str] = {}
+    inserts: Dict[str, List[str]] = {}
+    other: List[str] = []
+
+    for statement in statements:
+        create = _CREATE_TABLE_RE.match(statement)
+        insert = _INSERT_RE.match(statement)
+        if create:
+            tables[create.group(1).lower()] = statement
+        elif insert:
+            inserts.setdefault(insert.group(1).lower(), []).append(statement)
+        else:
+            other.append(statement)
+
+    depths: Dict[str, int] = {}
+
+    def depth(table: str, seen: frozenset = frozenset()) -> int:
+        if table not in depths:
+            parents = {
+                parent.lower() for parent in _REFERENCES_RE.findall(tables[table])
+            } & tables.keys()
+            # Self references and cycles don't add a level
+            parents -= seen | {table}
+            depths[table] = 1 + max((depth(parent, seen | {table}) for parent in parents), default=-1)
+        return depths[table]
+
+    table_waves: Dict[int, List[str]] = {}
+    for table, statement in tables.items():
+        table_waves.setdefault(depth(table), []).append(statement)
+
+    waves = [table_waves[level] for level in sorted(table_waves)]
+    if other:
+        waves.append(other)
+    waves.extend(inserts.values())
+    return waves
+
+
+def merge_inserts(statements: Sequence[str]) -> List[Tuple[str, List[str]]]:
+    """
+    Combine INSERTs with the same table and columns into multi-row INSERTs
+
+    Each merged statement stays under MAX_MERGED_INSERT_BYTES. Other
+    statements are passed through on their own.
+
+    Args:
+        statements: Independent statements (one wave)
+
+    Returns:
+        (statement to send, the original statements it covers) pairs
+    """
+    merged: List[Tuple[str, List[str]]] = []
+    open_groups: Dict[str, int] = {}
+
+    for statement in statements:
+        match = _INSERT_VALUES_RE.match(statement)
+        if not match:
+            merged.append((statement, [statement]))
+            continue
+
+        head = ' '.join(match.group(1).split())
+        values = match.group(2)
+        index = open_groups.get(head)
+        if index is not None:
+            sql, originals = merged[index]
+            if len(sql) + len(values) + 2 <= MAX_MERGED_INSERT_BYTES:
+                merged[index] = (f"{sql}, {values}", originals + [statement])
+                continue
+        open_groups[head] = len(merged)
+        merged.append((f"{head} VALUES {values}", [statement]))
+
+    return merged
+
+
+async def run_schema_waves(
+    statements: Sequence[str],
+    parallelism: int = SCHEMA_PARALLELISM
+) -> AsyncIterator[Tuple[str, Optional[Exception]]]:
+    """
+    Execute script statements wave by wave (see plan_schema_waves)
+
+    Seed INSERTs into the same table go out as one multi-row INSERT (see
+    merge_inserts). A failed statement doesn't stop the script; its
+    exception is reported and the remaining statements still run.
+
+    When a multi-row INSERT fails, its rows are retried one by one. PesaDB
+    has no transactions, so if the failed INSERT had stored some rows
+    before failing, the retry reports those as already existing, or, in a
+    table without a primary key, stores them twice.
+
+    Args:
+        statements: SQL statements in script order
+        parallelism: Most statements in flight at once
+
+    Yields:
+        (statement, None on success or the exception it raised), a wave
+        at a time once the whole wave has finished
+    """
+    limit = asyncio.Semaphore(max(1, parallelism))
+
+    async def run(statement: str):
+        async with limit:
+            await execute_db(statement)
+
+    async def run_merged(sql: str, originals: List[str]) -> List[Optional[Exception]]:
+        try:
+            await run(sql)
+            return [None] * len(originals)
+        except Exception as e:
+            if len(originals) == 1:
+                return [e]
+        # One bad row (e.g. already seeded) fails the whole INSERT, so retry
+        # its rows separately to keep the others and report each one
+        results = await asyncio.gather(*(run(statement) for statement in originals), return_exceptions=True)
+        return [result if isinstance(result, Exception) else None for result in results]
+
+    for wave in plan_schema_waves(statements):
+        groups = merge_inserts(wave)
+        results = await asyncio.gather(*(run_merged(sql, originals) for sql, originals in groups))
+        for (_, originals), group_results in zip(groups, results):
+            for statement, error in zip(originals, group_results):
+                yield statement, error
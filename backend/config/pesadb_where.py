@@ -0,0 +1,80 @@
+"""
+WHERE clause builder for PesaDB queries
+
+Collects conditions with ? placeholders and their values, so filters with
+optional parts don't hand-assemble SQL. The result feeds the usual
+params= arguments (see bind_params in config.pesadb).
+
+Example:
+    where, params = (
+        Where()
+        .eq('user_id', user_id)
+        .eq('category_id', category_id, optional=True)
+        .gte('date', start_date, optional=True)
+        .build()
+    )
+    rows = await query_db(f"SELECT * FROM transactions WHERE {where}", params=params)
+"""
+from typing import Any, List, Tuple
+
+
+def _missing(value: Any) -> bool:
+    """Whether an optional filter value means "don't filter" (None or '')"""
+    return value is None or value == ''
+
+
+class Where:
+    """Chainable builder for an AND-ed WHERE clause with bound parameters"""
+
+    def __init__(self):
+        self._conditions: List[str] = []
+        self._params: List[Any] = []
+
+    def _add(self, condition: str, value: Any, optional: bool) -> "Where":
+        if not (optional and _missing(value)):
+            self._conditions.append(condition)
+            self._params.append(value)
+        return self
+
+    def eq(self, column: str, value: Any, optional: bool = False) -> "Where":
+        """column = value (skipped when optional and value is None or '')"""
+        return self._add(f"{column} = ?", value, optional)
+
+    def gte(self, column: str, value: Any, optional: bool = False) -> "Where":
+        """column >= value"""
+        return self._add(f"{column} >= ?", value, optional)
+
+    def lte(self, column: str, value: Any, optional: bool = False) -> "Where":
+        """column <= value"""
+        return self._add(f"{column} <= ?", value, optional)
+
+    def between(self, column: str, start: Any, end: Any) -> "Where":
+        """column BETWEEN start AND end (inclusive)"""
+        self._conditions.append(f"{column} BETWEEN ? AND ?")
+        self._params.extend([start, end])
+        return self
+
+    def is_in(self, column: str, values: List[Any]) -> "Where":
+        """column IN (values)"""
+        if not values:
+            # "IN ()" isn't valid SQL, and bind_params can't expand an empty tuple
+            raise ValueError(f"is_in({column!r}) needs at least one value")
+        self._conditions.append(f"{column} IN (?)")
+        self._params.append(tuple(values))
+        return self
+
+    def raw(self, condition: str, *params: Any) -> "Where":
+        """Any other condition, with values for its ? placeholders"""
+        self._conditions.append(condition)
+        self._params.extend(params)
+        return self
+
+    def build(self) -> Tuple[str, List[Any]]:
+        """
+        Get the clause and its parameters
+
+        Returns:
+            (conditions joined by AND without the WHERE keyword, params list).
+            The clause is empty when no condition was added.
+        """
+        return ' AND '.join(self._conditions), list(self._params)
@@ -1,15 +1,32 @@
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Header, Response
 from models.user import User, UserSignup, UserLogin, Category
 from services.categorization import CategorizationService
 from services.pesadb_service import db_service
 from utils.auth import create_access_token, get_current_user
+from typing import Optional
+import asyncio
 import bcrypt
+import hashlib
 import logging
-import json
+import orjson
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 logger = logging.getLogger(__name__)
 
+
+def _etag(body: dict) -> str:
+    """Strong ETag for a JSON response body"""
+    digest = hashlib.blake2b(orjson.dumps(body, option=orjson.OPT_SORT_KEYS), digest_size=16).hexdigest()
+    return f'"{digest}"'
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Whether an If-None-Match header lists the given ETag (or is *)"""
+    if not if_none_match:
+        return False
+    tags = [tag.strip().removeprefix('W/') for tag in if_none_match.split(',')]
+    return '*' in tags or etag in tags
+
 @router.post("/signup")
 async def signup(user_data: UserSignup):
     """Register a new user"""
@@ -152,8 +169,12 @@ async def login(login_data: UserLogin):
 async def get_user_status():
     """Check if any user exists"""
     try:
-        user_count = await db_service.get_user_count()
-        categories_count = await db_service.count_categories()
+        # Polled by the frontend - recent counts are fine (create_user
+        # refreshes the user count immediately)
+        user_count, categories_count = await asyncio.gather(
+            db_service.get_user_count(exact=False),
+            db_service.count_categories(exact=False)
+        )
 
         return {
             "has_user": user_count > 0,
@@ -165,15 +186,32 @@ async def get_user_status():
         raise HTTPException(status_code=500, detail=f"Error checking user status: {str(e)}")
 
 @router.get("/me")
-async def get_current_user_details(current_user: dict = Depends(get_current_user)):
-    """Get current authenticated user details"""
+async def get_current_user_details(
+    response: Response,
+    current_user: dict = Depends(get_current_user),
+    if_none_match: Optional[str] = Header(None)
+):
+    """
+    Get current authenticated user details
+
+    The response carries an ETag; a client sending it back in If-None-Match
+    gets an empty 304 while the details are unchanged.
+    """
     try:
-        return {
+        details = {
             "user_id": current_user["id"],
             "email": current_user["email"],
             "name": current_user.get("name"),
             "preferences": current_user.get("preferences", {})
         }
+
+        etag = _etag(details)
+        # User-specific, so only the client may store it - and must revalidate
+        headers = {"ETag": etag, "Cache-Control": "private, no-cache", "Vary": "Authorization"}
+        if _etag_matches(if_none_match, etag):
+            return Response(status_code=304, headers=headers)
+        response.headers.update(headers)
+        return details
     except Exception as e:
         logger.error(f"Error fetching user: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Error fetching user: {str(e)}")
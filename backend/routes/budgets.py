@@ -6,6 +6,7 @@ from services.pesadb_service import db_service
 from utils.auth import get_current_user
 from typing import List, Optional
 from datetime import datetime, timedelta
+import asyncio
 import calendar
 
 router = APIRouter(prefix="/budgets", tags=["budgets"])
@@ -45,6 +46,18 @@ async def get_budgets_with_progress(
         _, last_day = calendar.monthrange(year, month)
         end_date = datetime(year, month, last_day, 23, 59, 59)
         
+        # Spending and transaction counts for every budget category in one query each
+        budget_category_ids = [budget.category_id for budget in budgets]
+        spending_by_category, counts_by_category = await asyncio.gather(
+            db_service.get_spending_for_categories(
+                user_id,
+                budget_category_ids,
+                start_date.isoformat(),
+                end_date.isoformat()
+            ),
+            db_service.count_transactions_by_category(user_id, budget_category_ids)
+        )
+        
         # Get spending data for each budget category
         budget_progress = []
         
@@ -57,19 +70,11 @@ async def get_budgets_with_progress(
                 
             category = Category(**category_doc)
             
-            # Calculate spending for this category in the specified month
-            spent = await db_service.get_spending_by_category(
-                user_id,
-                budget.category_id,
-                start_date.isoformat(),
-                end_date.isoformat()
-            )
+            # Spending for this category in the specified month
+            spent = spending_by_category[budget.category_id]
             
             # Count transactions
-            transaction_count = await db_service.count_transactions(
-                user_id,
-                category_id=budget.category_id
-            )
+            transaction_count = counts_by_category[budget.category_id]
             
             # Calculate progress metrics
             remaining = budget.amount - spent
@@ -202,12 +207,21 @@ async def get_budget_summary(
         _, last_day = calendar.monthrange(year, month)
         end_date = datetime(year, month, last_day, 23, 59, 59)
         
-        # Get all budgets for the month
-        budgets_docs = await db_service.get_budgets(
-            user_id=user_id,
-            month=month,
-            year=year,
-            limit=100
+        # The month's budgets and its total expenses don't depend on each
+        # other - fetch them together
+        budgets_docs, total_expenses = await asyncio.gather(
+            db_service.get_budgets(
+                user_id=user_id,
+                month=month,
+                year=year,
+                limit=100
+            ),
+            db_service.get_total_by_type(
+                user_id,
+                'expense',
+                start_date.isoformat(),
+                end_date.isoformat()
+            )
         )
         
         total_budget = sum(doc["amount"] for doc in budgets_docs)
@@ -219,27 +233,22 @@ async def get_budget_summary(
         transaction_count = 0
         
         if category_ids:
-            # Sum spending across all budget categories
-            for category_id in category_ids:
-                spent = await db_service.get_spending_by_category(
+            # Sum spending across all budget categories - one grouped query each
+            spending_by_category, counts_by_category = await asyncio.gather(
+                db_service.get_spending_for_categories(
                     user_id,
-                    category_id,
+                    category_ids,
                     start_date.isoformat(),
                     end_date.isoformat()
-                )
-                total_spent += spent
-                count = await db_service.count_transactions(user_id, category_id=category_id)
-                transaction_count += count
+                ),
+                db_service.count_transactions_by_category(user_id, category_ids)
+            )
+            for category_id in category_ids:
+                total_spent += spending_by_category[category_id]
+                transaction_count += counts_by_category[category_id]
         
-        # Get spending on uncategorized expenses (simplified)
+        # Spending on uncategorized expenses (simplified)
         # This would need custom SQL to properly exclude budgeted categories
-        total_expenses = await db_service.get_total_by_type(
-            user_id,
-            'expense',
-            start_date.isoformat(),
-            end_date.isoformat()
-        )
-        
         uncategorized_spent = total_expenses - total_spent
         uncategorized_count = 0  # Simplified
         
@@ -103,6 +103,7 @@ async def import_sms_messages(
         transaction_groups_created = []
         total_monetary_movements = 0
         errors = []
+        pending_transactions = []
 
         # Create category mapping for enhanced parser
         category_mapping = {}
@@ -115,9 +116,8 @@ async def import_sms_messages(
 
                 # Check for duplicates first
                 message_hash = DuplicateDetector.hash_message(message)
-                existing_transaction = await db_service.get_transaction_by_message_hash(message_hash)
 
-                if existing_transaction:
+                if await DuplicateDetector.is_duplicate_by_hash(message_hash):
                     print(f"Duplicate found for message {i+1}")
                     duplicates_found += 1
                     continue
@@ -139,8 +139,9 @@ async def import_sms_messages(
                 analysis = EnhancedSMSParser.analyze_transaction_completeness(enhanced_transactions)
                 print(f"Transaction analysis: {analysis}")
 
-                # Insert all transactions from this SMS
+                # Queue all transactions from this SMS for the bulk insert
                 group_transaction_ids = []
+                group_transactions = []
                 for transaction_create in enhanced_transactions:
                     # Create transaction data
                     transaction_data = {
@@ -163,14 +164,20 @@ async def import_sms_messages(
                     if hasattr(transaction_create, 'transaction_group_id'):
                         transaction_data['transaction_group_id'] = transaction_create.transaction_group_id
 
-                    await db_service.create_transaction(transaction_data)
+                    group_transactions.append(transaction_data)
+
+                pending_transactions.extend(group_transactions)
+
+                for transaction_create, transaction_data in zip(enhanced_transactions, group_transactions):
+                    if transaction_create.sms_metadata:
+                        DuplicateDetector.remember_message_hash(transaction_create.sms_metadata.original_message_hash)
                     transaction_id = transaction_data["id"]
 
                     group_transaction_ids.append(transaction_id)
                     transactions_created.append(transaction_id)
                     total_monetary_movements += 1
 
-                    print(f"Created {transaction_create.transaction_role if hasattr(transaction_create, 'transaction_role') else 'transaction'} {transaction_id}: {transaction_create.description} - KSh {transaction_create.amount}")
+                    print(f"Queued {transaction_create.transaction_role if hasattr(transaction_create, 'transaction_role') else 'transaction'} {transaction_id}: {transaction_create.description} - KSh {transaction_create.amount}")
 
                 # Track the transaction group
                 if enhanced_transactions:
@@ -188,6 +195,42 @@ async def import_sms_messages(
                 parsing_errors += 1
                 errors.append(f"Error processing message: {str(e)}")
         
+        # Write every parsed transaction with bulk INSERTs. Message hashes
+        # were remembered as each message was queued, so duplicates within
+        # this import were already skipped.
+        if pending_transactions:
+            # bulk_create_transactions serializes rows in place, so keep
+            # unprepared copies for the row-by-row retry
+            unwritten = [dict(transaction_data) for transaction_data in pending_transactions]
+            try:
+                await db_service.bulk_create_transactions(pending_transactions)
+            except Exception as e:
+                # The hashes cached as stored may not be - forget them
+                DuplicateDetector.clear_lookup_cache()
+                print(f"Bulk insert failed, retrying row by row: {str(e)}")
+
+                for transaction_data in unwritten:
+                    transaction_id = transaction_data["id"]
+                    try:
+                        # Chunks before the failing one may already be stored
+                        if await db_service.get_transaction_by_id(transaction_id, user_id):
+                            continue
+                        await db_service.create_transaction(transaction_data)
+                    except Exception as row_error:
+                        transactions_created.remove(transaction_id)
+                        # Each group holds one message's rows; a message
+                        # with none of them stored wasn't imported
+                        for group in transaction_groups_created:
+                            if transaction_id in group["transaction_ids"]:
+                                group["transaction_ids"].remove(transaction_id)
+                                if not group["transaction_ids"]:
+                                    transaction_groups_created.remove(group)
+                                    successful_imports -= 1
+                                break
+                        total_monetary_movements -= 1
+                        parsing_errors += 1
+                        errors.append(f"Error saving transaction {transaction_data.get('description')}: {str(row_error)}")
+
         # Log import session - field names must match database schema
         import_log = {
             "id": import_session_id,
@@ -310,6 +353,7 @@ async def create_transaction_from_parsed_sms(
         }
         
         await db_service.create_transaction(transaction_data)
+        DuplicateDetector.remember_message_hash(sms_metadata["original_message_hash"])
         
         return transaction_data
         
@@ -1,14 +1,20 @@
 from fastapi import APIRouter, HTTPException, Query, Depends
+from fastapi.responses import StreamingResponse
 from models.transaction import Transaction, TransactionCreate, TransactionUpdate
 from models.user import Category
 from services.categorization import CategorizationService
 from services.frequency_analyzer import TransactionFrequencyAnalyzer, FrequentTransaction
+from services.duplicate_detector import DuplicateDetector
 from services.pesadb_service import db_service
 from utils.auth import get_current_user
 from typing import List, Optional, Literal
 from datetime import datetime, timedelta
 from pydantic import BaseModel
+import asyncio
 import json
+import logging
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/transactions", tags=["transactions"])
 
@@ -20,9 +26,16 @@ async def get_transactions(
     category_id: Optional[str] = None,
     start_date: Optional[datetime] = None,
     end_date: Optional[str] = None,
+    after_date: Optional[str] = None,
+    after_id: Optional[str] = None,
     current_user: dict = Depends(get_current_user)
 ):
-    """Get transactions with optional filters"""
+    """
+    Get transactions with optional filters
+
+    For the next page, pass the date and id of the last transaction received
+    as after_date/after_id instead of an offset; deep pages stay fast.
+    """
     try:
         # Use authenticated user
         user_id = current_user["id"]
@@ -41,7 +54,8 @@ async def get_transactions(
             start_date=start_date_str,
             end_date=end_date_str,
             sort_by='date',
-            sort_order='DESC'
+            sort_order='DESC',
+            after=(after_date, after_id) if after_date and after_id else None
         )
         
         transactions = []
@@ -52,6 +66,50 @@ async def get_transactions(
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching transactions: {str(e)}")
 
+@router.get("/export")
+async def export_transactions(
+    type_filter: Optional[Literal["expense", "income"]] = None,
+    category_id: Optional[str] = None,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Export all matching transactions as newline-delimited JSON
+
+    Rows are streamed as they are read from the database, so memory use
+    stays flat however many transactions the user has. If reading fails
+    after streaming has started, the export ends with an {"error": ...} line.
+    """
+    try:
+        rows = db_service.iter_transactions(
+            user_id=current_user["id"],
+            category_id=category_id,
+            transaction_type=type_filter,
+            start_date=start_date,
+            end_date=end_date
+        )
+        # Read the first page before the 200 is sent, so a failing query
+        # still becomes an error response
+        first = await anext(rows, None)
+        first_line = Transaction(**first).model_dump_json() + "\n" if first is not None else None
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error exporting transactions: {str(e)}")
+
+    async def ndjson():
+        if first_line is None:
+            return
+        yield first_line
+        try:
+            async for doc in rows:
+                yield Transaction(**doc).model_dump_json() + "\n"
+        except Exception as e:
+            # Too late for an error status - tell the client the export is incomplete
+            logger.error(f"❌ Transaction export failed part way: {str(e)}")
+            yield json.dumps({"error": f"Error exporting transactions: {str(e)}"}) + "\n"
+
+    return StreamingResponse(ndjson(), media_type="application/x-ndjson")
+
 @router.post("/", response_model=Transaction)
 async def create_transaction(
     transaction_data: TransactionCreate,
@@ -96,6 +154,8 @@ async def create_transaction(
             transaction_db['sms_metadata'] = metadata
         
         await db_service.create_transaction(transaction_db)
+        if transaction.sms_metadata:
+            DuplicateDetector.remember_message_hash(transaction.sms_metadata.original_message_hash)
         print(f"Transaction created with ID: {transaction.id}")
 
         return transaction
@@ -148,11 +208,13 @@ async def update_transaction(
         if update_dict.get('date') and hasattr(update_dict['date'], 'isoformat'):
             update_dict['date'] = update_dict['date'].isoformat()
         
+        # The stored row is now the existing one with these fields replaced,
+        # so build the response from values already in hand rather than
+        # re-reading (and re-parsing) it. update_transaction serializes its
+        # argument in place, hence the copy.
+        updated_doc = {**existing_doc, **update_dict}
         if update_dict:
-            await db_service.update_transaction(transaction_id, update_dict, user_id)
-        
-        # Return updated transaction
-        updated_doc = await db_service.get_transaction_by_id(transaction_id)
+            await db_service.update_transaction(transaction_id, dict(update_dict), user_id)
         
         # Parse date strings back to datetime
         if isinstance(updated_doc.get('date'), str):
@@ -178,6 +240,8 @@ async def delete_transaction(
         user_id = current_user["id"]
         
         await db_service.delete_transaction(transaction_id, user_id)
+        # A deleted transaction must no longer block re-importing its SMS
+        DuplicateDetector.clear_lookup_cache()
         
         return {"message": "Transaction deleted successfully"}
     except HTTPException:
@@ -212,22 +276,26 @@ async def get_analytics_summary(
         start_date_str = start_date.isoformat()
         end_date_str = end_date.isoformat()
 
-        # First, let's check if we have any transactions at all
-        total_transactions = await db_service.count_transactions(user_id)
-        print(f"Total transactions in database: {total_transactions}")
-        
-        # Get total income and expenses using service methods
-        total_income = await db_service.get_total_by_type(
-            user_id, 'income', start_date_str, end_date_str
-        )
-        total_expenses = await db_service.get_total_by_type(
-            user_id, 'expense', start_date_str, end_date_str
+        # The transaction count, dashboard aggregates (income/expense totals
+        # and category spending summary) and recent transactions don't depend
+        # on each other - fetch them together
+        total_transactions, summary, recent_transactions_docs = await asyncio.gather(
+            db_service.count_transactions(user_id, exact=False),
+            db_service.get_dashboard_summary(user_id, start_date_str, end_date_str),
+            db_service.get_transactions(
+                user_id=user_id,
+                limit=5,
+                start_date=start_date_str,
+                end_date=end_date_str,
+                sort_by='date',
+                sort_order='DESC'
+            )
         )
+        print(f"Total transactions in database: {total_transactions}")
 
-        # Get category spending summary (now includes category details via JOIN)
-        categories_summary = await db_service.get_category_spending_summary(
-            user_id, start_date_str, end_date_str
-        )
+        total_income = summary['totals']['income']
+        total_expenses = summary['totals']['expense']
+        categories_summary = summary['categories']
 
         # Build categories_by_category dict (no additional queries needed!)
         categories_by_category = {}
@@ -240,15 +308,6 @@ async def get_analytics_summary(
                 "count": cat_summary['transaction_count']
             }
 
-        # Get recent transactions
-        recent_transactions_docs = await db_service.get_transactions(
-            user_id=user_id,
-            limit=5,
-            start_date=start_date_str,
-            end_date=end_date_str,
-            sort_by='date',
-            sort_order='DESC'
-        )
         recent_transactions = []
 
         for doc in recent_transactions_docs:
@@ -324,11 +383,11 @@ async def get_transaction_charges_analytics(
 
         # Simplified charges analytics - would need custom implementation
         # for full MongoDB aggregation pipeline equivalent
-        transactions = await db_service.get_transactions(
+        transactions = db_service.iter_transactions(
             user_id=user_id,
             limit=1000,
-            start_date=start_date.isoformat(),
-            end_date=end_date.isoformat()
+            start_date=start_date,
+            end_date=end_date
         )
         
         # Calculate fees from transaction data
@@ -336,30 +395,24 @@ async def get_transaction_charges_analytics(
         total_access_fees = 0
         total_service_fees = 0
         total_sms_fees = 0
-        transaction_count = len(transactions)
+        transaction_count = 0
         expense_count = 0
         expense_amount = 0
         
-        for txn in transactions:
+        async for txn in transactions:
+            transaction_count += 1
             if txn.get('type') == 'expense':
                 expense_count += 1
                 expense_amount += txn.get('amount', 0)
             
-            # Parse mpesa_details if it's a string
+            # JSON columns arrive parsed from iter_transactions
             mpesa_details = txn.get('mpesa_details')
-            if mpesa_details and isinstance(mpesa_details, str):
-                mpesa_details = json.loads(mpesa_details)
-            
             if mpesa_details:
                 total_transaction_fees += mpesa_details.get('transaction_fee', 0) or 0
                 total_access_fees += mpesa_details.get('access_fee', 0) or 0
                 total_service_fees += mpesa_details.get('service_fee', 0) or 0
             
-            # Parse sms_metadata if it's a string
             sms_metadata = txn.get('sms_metadata')
-            if sms_metadata and isinstance(sms_metadata, str):
-                sms_metadata = json.loads(sms_metadata)
-            
             if sms_metadata:
                 total_sms_fees += sms_metadata.get('total_fees', 0) or 0
         
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Database Test Runner
+
+Runs the database diagnostic scripts in one process, sharing one event
+loop and one PesaDB client (and its open connections) instead of each
+script starting its own:
+
+1. test_database_connection.py - connection and schema creation
+2. test_database_init.py - initialization, tables and seed data
+3. test_count_query.py - COUNT query probes
+
+The scripts run one after the other, not concurrently: the connection
+and initialization tests both initialize the schema and would race on
+table creation, and the count probes read what initialization seeded.
+
+Usage:
+    python backend/run_all_tests.py
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+
+# Add backend directory to path
+backend_dir = Path(__file__).parent
+sys.path.insert(0, str(backend_dir))
+
+from config.pesadb import close_client
+from test_database_connection import test_connection, test_schema_creation
+from test_database_init import run_tests as run_init_tests
+
+
+async def run_connection_tests() -> bool:
+    """Connection test, then schema creation if the connection works"""
+    return await test_connection() and await test_schema_creation()
+
+
+async def main():
+    """Run every database test script, then report which ones failed"""
+    results = {}
+
+    try:
+        for name, run in (
+            ("Connection", run_connection_tests),
+            ("Initialization", run_init_tests),
+        ):
+            try:
+                results[name] = await run()
+            except Exception as e:
+                print(f"\n❌ {name} tests raised: {str(e)}")
+                results[name] = False
+
+        # Diagnostic only - prints its findings but has no pass/fail result.
+        # Imported here because it switches logging to DEBUG on import.
+        from test_count_query import test_count_queries
+        await test_count_queries()
+    except KeyboardInterrupt:
+        print("\n\n⚠️  Tests cancelled by user.")
+        sys.exit(1)
+    finally:
+        await close_client()
+
+    print("\n" + "=" * 60)
+    for name, passed in results.items():
+        print(f"{'✅' if passed else '❌'} {name} tests")
+    print("=" * 60 + "\n")
+
+    sys.exit(0 if all(results.values()) else 1)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -18,6 +18,7 @@ backend_dir = Path(__file__).parent.parent
 sys.path.insert(0, str(backend_dir))
 
 from config.pesadb import query_db, execute_db
+from config.pesadb_script import iter_sql_statements, run_schema_waves
 from config.pesadb_fallbacks import count_rows_safe
 
 
@@ -33,31 +34,25 @@ async def init_database():
         print(f"❌ Error: SQL file not found at {sql_file}")
         sys.exit(1)
     
-    with open(sql_file, 'r') as f:
-        sql_content = f.read()
-    
-    # Split SQL statements (simple split by semicolon)
-    # Note: This is a basic split and may not handle all SQL edge cases
-    statements = [stmt.strip() for stmt in sql_content.split(';') if stmt.strip()]
+    # Read statement by statement, without comments, in a worker thread so
+    # the file reads don't block the event loop
+    statements = await asyncio.to_thread(list, iter_sql_statements(sql_file))
     
     print(f"📝 Found {len(statements)} SQL statements to execute")
     
     success_count = 0
     error_count = 0
     
-    for i, statement in enumerate(statements, 1):
-        # Skip comments and empty lines
-        if statement.startswith('--') or not statement:
-            continue
-        
-        try:
-            print(f"⏳ Executing statement {i}/{len(statements)}...")
-            await execute_db(statement)
+    # Independent statements are sent together; see run_schema_waves
+    i = 0
+    async for statement, error in run_schema_waves(statements):
+        i += 1
+        if error is None:
             success_count += 1
             print(f"✅ Statement {i} executed successfully")
-        except Exception as e:
+        else:
             error_count += 1
-            print(f"⚠️  Warning: Statement {i} failed: {str(e)}")
+            print(f"⚠️  Warning: Statement {i} failed: {str(error)}")
             # Continue with other statements even if one fails
     
     print("\n" + "="*60)
@@ -57,7 +57,10 @@ CREATE TABLE transactions (
     created_at STRING,
     transaction_group_id STRING,
     transaction_role STRING,
-    parent_transaction_id STRING
+    parent_transaction_id STRING,
+    message_hash STRING,
+    mpesa_transaction_id STRING,
+    date_day STRING
 );
 
 -- ========================================
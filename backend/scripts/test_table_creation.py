@@ -20,7 +20,7 @@ from pathlib import Path
 project_root = Path(__file__).parent.parent.parent
 sys.path.insert(0, str(project_root))
 
-from backend.services.database_initializer import DatabaseInitializer
+from backend.services.database_initializer import REQUIRED_TABLES, DatabaseInitializer
 from backend.config.pesadb import query_db
 
 # Configure logging
@@ -37,10 +37,7 @@ async def test_table_existence():
     logger.info("CHECKING EXISTING TABLES")
     logger.info("=" * 80)
     
-    required_tables = [
-        'users', 'categories', 'transactions', 'budgets',
-        'sms_import_logs', 'duplicate_logs', 'status_checks'
-    ]
+    required_tables = REQUIRED_TABLES
     
     existing = []
     missing = []
@@ -95,10 +92,7 @@ async def test_table_queries():
     logger.info("TESTING TABLE QUERIES")
     logger.info("=" * 80)
     
-    tables = [
-        'users', 'categories', 'transactions', 'budgets',
-        'sms_import_logs', 'duplicate_logs', 'status_checks'
-    ]
+    tables = REQUIRED_TABLES
     
     query_results = {}
     
@@ -46,7 +46,8 @@ class SchemaVerifier:
         'transactions': [
             'id', 'user_id', 'amount', 'type', 'category_id', 'description',
             'date', 'source', 'mpesa_details', 'sms_metadata', 'created_at',
-            'transaction_group_id', 'transaction_role', 'parent_transaction_id'
+            'transaction_group_id', 'transaction_role', 'parent_transaction_id',
+            'message_hash', 'mpesa_transaction_id', 'date_day'
         ],
         'budgets': ['id', 'user_id', 'category_id', 'amount', 'period', 'month', 'year', 'created_at'],
         'sms_import_logs': [
@@ -54,7 +54,10 @@ EXPECTED_SCHEMA = {
         'created_at',
         'transaction_group_id',
         'transaction_role',
-        'parent_transaction_id'
+        'parent_transaction_id',
+        'message_hash',
+        'mpesa_transaction_id',
+        'date_day'
     ],
     'budgets': [
         'id',
@@ -16,8 +16,9 @@ load_dotenv(ROOT_DIR / '.env')
 # PesaDB configuration (replaces MongoDB)
 from config.pesadb import get_client, query_db
 from config.pesadb_fallbacks import detect_pesadb_capabilities
-from services.pesadb_service import db_service
-from services.database_initializer import db_initializer
+from services.pesadb_service import db_service, request_scope, start_write_batching, stop_write_batching
+from services.database_initializer import CORE_TABLES, db_initializer
+from services.duplicate_detector import DuplicateDetector
 
 # Create the main app without a prefix
 app = FastAPI()
@@ -39,6 +40,12 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Repeated user/category lookups within one request hit the database once
+@app.middleware("http")
+async def memoize_lookups_per_request(request, call_next):
+    with request_scope():
+        return await call_next(request)
+
 # Create a router with the /api prefix
 api_router = APIRouter(prefix="/api")
 
@@ -84,7 +91,7 @@ async def health_check():
     # Check database connectivity and tables
     try:
         # Test basic connectivity by checking each required table
-        required_tables = ['users', 'categories', 'transactions', 'budgets']
+        required_tables = CORE_TABLES
         table_status = {}
 
         for table in required_tables:
@@ -111,6 +118,7 @@ async def health_check():
                     table_status[table] = {"exists": False, "error": str(table_error)[:100]}
 
         health_data["database"]["tables"] = table_status
+        health_data["database"]["pool"] = get_client().pool_stats()
 
         # Consider database initialized if all required tables exist
         all_tables_exist = all(table_status[t].get("exists", False) for t in required_tables)
@@ -142,7 +150,8 @@ async def manual_database_initialization():
     try:
         result = await db_initializer.initialize_database(
             seed_categories=True,
-            create_default_user=True
+            create_default_user=True,
+            force=True
         )
 
         return {
@@ -151,6 +160,7 @@ async def manual_database_initialization():
             "details": {
                 "tables_created": result['tables_created'],
                 "tables_skipped": result['tables_skipped'],
+                "indexes_created": result.get('indexes_created', 0),
                 "categories_seeded": result['categories_seeded'],
                 "user_created": result.get('user_created', False),
                 "verified": result['verified'],
@@ -255,9 +265,24 @@ async def startup_db_initialization():
     except Exception as e:
         logger.warning(f"Could not detect database capabilities: {e}")
 
+    # Load stored SMS hashes so duplicate checks can skip the database for new messages
+    try:
+        hashes_loaded = await DuplicateDetector.load_message_hash_filter()
+        logger.info(f"✅ Duplicate filter loaded with {hashes_loaded} message hashes")
+    except Exception as e:
+        logger.warning(f"Could not load duplicate filter - hash checks will query the database: {e}")
+
+    # Write duplicate detection logs and status checks in batches
+    DuplicateDetector.start_log_writer()
+    start_write_batching()
+
 @app.on_event("shutdown")
 async def shutdown_db_client():
     """Close PesaDB client connection"""
+    # Flush queued duplicate logs and status checks while the client is still open
+    await DuplicateDetector.stop_log_writer()
+    await stop_write_batching()
+
     client = get_client()
     await client.close()
     logger.info("PesaDB client connection closed")
@@ -1,3 +1,4 @@
+import asyncio
 from typing import List, Dict, Optional, Tuple
 from services.pesadb_service import db_service
 from config.pesadb import query_db
@@ -132,15 +133,13 @@ class BudgetMonitoringService:
             limit=100
         )
         
-        budgets_with_spending = []
-        
-        for budget_data in budgets_data:
+        async def with_spending(budget_data: Dict) -> Optional[Dict]:
             budget = Budget(**budget_data)
             
             # Get category info using PesaDBService
             category_data = await db_service.get_category_by_id(budget.category_id)
             if not category_data:
-                continue
+                return None
             
             category = Category(**{**category_data, "id": category_data.get("id")})
             
@@ -149,11 +148,16 @@ class BudgetMonitoringService:
                 user_id, budget.category_id, start_date, end_date, current_day, last_day
             )
             
-            budgets_with_spending.append({
+            return {
                 "budget": budget,
                 "category": category,
                 **spending_data
-            })
+            }
+        
+        # Each budget's queries are independent, so all budgets are analysed
+        # concurrently instead of one round trip after another
+        results = await asyncio.gather(*(with_spending(budget_data) for budget_data in budgets_data))
+        budgets_with_spending = [result for result in results if result is not None]
         
         return budgets_with_spending
     
@@ -168,11 +172,10 @@ class BudgetMonitoringService:
     ) -> Dict:
         """Get detailed spending analysis for a category using SQL queries"""
         
-        start_str = start_date.isoformat()
-        end_str = end_date.isoformat()
-        
         # Overall spending aggregation using SQL with fallback support
-        where = f"user_id = '{user_id}' AND category_id = '{category_id}' AND type = 'expense' AND date BETWEEN '{start_str}' AND '{end_str}'"
+        # (the datetimes bind in the ISO format dates are stored in)
+        where = "user_id = ? AND category_id = ? AND type = 'expense' AND date BETWEEN ? AND ?"
+        params = [user_id, category_id, start_date, end_date]
 
         total_result = await aggregate_safe(
             'transactions',
@@ -184,7 +187,8 @@ class BudgetMonitoringService:
                 ('MIN', 'amount')
             ],
             where=where,
-            query_func=query_db
+            query_func=query_db,
+            params=params
         )
 
         if total_result and len(total_result) > 0:
@@ -201,57 +205,27 @@ class BudgetMonitoringService:
             max_transaction = 0
             min_transaction = 0
         
-        # Daily spending pattern using SQL GROUP BY
-        # Extract day from date (SQL syntax may vary by database)
-        daily_query = f"""
-        SELECT
-            date,
-            SUM(amount) as daily_amount,
-            COUNT(*) as daily_count
-        FROM transactions
-        WHERE user_id = '{user_id}'
-          AND category_id = '{category_id}'
-          AND type = 'expense'
-          AND date BETWEEN '{start_str}' AND '{end_str}'
-        GROUP BY date
-        ORDER BY date ASC
-        """
-        
-        daily_result = await query_db(daily_query)
-        
-        # Process daily results to extract day of month
+        # Daily spending pattern, grouped by calendar day in the database
+        daily_result = await db_service.get_daily_spending(user_id, start_date, end_date, category_id)
+        
         daily_pattern = []
+        weekly_totals = defaultdict(lambda: {"weekly_amount": 0, "weekly_count": 0})
         for row in daily_result:
-            date_val = row.get('date')
-            # Parse date string to get day
-            if isinstance(date_val, str):
-                try:
-                    date_obj = datetime.fromisoformat(date_val.replace('Z', '+00:00'))
-                    day_of_month = date_obj.day
-                except:
-                    day_of_month = 1
-            else:
-                day_of_month = 1
+            try:
+                day_of_month = int(row['date'][8:10])
+            except ValueError:
+                continue
             
             daily_pattern.append({
                 "_id": day_of_month,
-                "daily_amount": float(row.get("daily_amount") or 0),
-                "daily_count": int(row.get("daily_count") or 0)
+                "daily_amount": row['total'],
+                "daily_count": row['count']
             })
-        
-        # Weekly spending (simplified - group by week ranges)
-        # Since SQL date functions vary, we'll calculate weeks in Python
-        weekly_totals = defaultdict(lambda: {"weekly_amount": 0, "weekly_count": 0})
-        for row in daily_result:
-            date_val = row.get('date')
-            if isinstance(date_val, str):
-                try:
-                    date_obj = datetime.fromisoformat(date_val.replace('Z', '+00:00'))
-                    week_num = (date_obj.day - 1) // 7 + 1  # Week 1-5 of month
-                    weekly_totals[week_num]["weekly_amount"] += float(row.get("daily_amount") or 0)
-                    weekly_totals[week_num]["weekly_count"] += int(row.get("daily_count") or 0)
-                except:
-                    pass
+            
+            # Weekly spending (simplified - week 1-5 of the month)
+            week_num = (day_of_month - 1) // 7 + 1
+            weekly_totals[week_num]["weekly_amount"] += row['total']
+            weekly_totals[week_num]["weekly_count"] += row['count']
         
         weekly_pattern = [
             {"_id": week, **data} 
@@ -410,16 +384,15 @@ class BudgetMonitoringService:
     ) -> Dict[str, SpendingTrend]:
         """Analyze spending trends for each budget category"""
         
-        trends = {}
+        category_ids = [budget_data["budget"].category_id for budget_data in budgets]
         
-        for budget_data in budgets:
-            category_id = budget_data["budget"].category_id
-            
-            # Get historical data for trend analysis
-            trend = await self._calculate_category_trend(user_id, category_id, month, year)
-            trends[category_id] = trend
+        # Get historical data for trend analysis, all categories at once
+        trends = await asyncio.gather(*(
+            self._calculate_category_trend(user_id, category_id, month, year)
+            for category_id in category_ids
+        ))
         
-        return trends
+        return dict(zip(category_ids, trends))
     
     async def _calculate_category_trend(
         self, 
@@ -445,22 +418,22 @@ class BudgetMonitoringService:
             month_start = datetime(prev_year, prev_month, 1)
             _, last_day = calendar.monthrange(prev_year, prev_month)
             month_end = datetime(prev_year, prev_month, last_day, 23, 59, 59)
-            months_data.append((month_start.isoformat(), month_end.isoformat()))
+            months_data.append((month_start, month_end))
         
         # Get spending for each month using SQL
         monthly_spending = []
         for start_date, end_date in months_data:
-            spending_query = f"""
+            spending_query = """
             SELECT SUM(amount) as total
             FROM transactions
-            WHERE user_id = '{user_id}'
-            AND category_id = '{category_id}'
+            WHERE user_id = ?
+            AND category_id = ?
             AND type = 'expense'
-            AND date >= '{start_date}'
-            AND date <= '{end_date}'
+            AND date >= ?
+            AND date <= ?
             """
             
-            result = await query_db(spending_query)
+            result = await query_db(spending_query, params=[user_id, category_id, start_date, end_date])
             spending = float(result[0]["total"] or 0) if result and result[0].get("total") else 0
             monthly_spending.append(spending)
         
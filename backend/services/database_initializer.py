@@ -5,16 +5,105 @@ This module handles automatic database initialization on server startup,
 ensuring all tables exist and optionally seeding default data.
 """
 
+import asyncio
 import logging
+import orjson
 import os
 from pathlib import Path
-from typing import List, Tuple, Dict
-from config.pesadb import query_db, execute_db, create_database, database_exists
+from typing import List, Tuple, Dict, Optional
+from config.pesadb import AlreadyExistsError, query_db, execute_db, execute_batch, bind_params, build_update, create_database, database_exists
 from config.pesadb_fallbacks import count_rows_safe
+from services.pesadb_service import clear_count_estimates, clear_reference_cache, is_column_not_found_error, is_table_not_found_error, reset_lookup_column_check, transaction_date_day
 
 logger = logging.getLogger(__name__)
 
 
+# Every table the app needs, parents before the tables referencing them
+REQUIRED_TABLES = (
+    'users', 'categories', 'transactions', 'budgets',
+    'sms_import_logs', 'duplicate_logs', 'status_checks'
+)
+# The main tables checked by the health endpoint and setup scripts
+CORE_TABLES = REQUIRED_TABLES[:4]
+
+
+# Fallback seed data for default categories - must match init_pesadb.sql
+# (id, name, icon, color, keywords JSON)
+_DEFAULT_CATEGORIES = (
+    ('cat-food', 'Food & Dining', '🍔', '#FF6B6B', '["food", "restaurant", "dining", "lunch", "dinner", "breakfast", "nyama", "choma"]'),
+    ('cat-transport', 'Transport', '🚗', '#4ECDC4', '["taxi", "bus", "matatu", "uber", "fuel", "transport", "travel"]'),
+    ('cat-shopping', 'Shopping', '🛍️', '#95E1D3', '["shop", "store", "mall", "clothing", "electronics", "supermarket"]'),
+    ('cat-bills', 'Bills & Utilities', '📱', '#F38181', '["bill", "electricity", "water", "internet", "phone", "utility", "kplc", "nairobi water"]'),
+    ('cat-entertainment', 'Entertainment', '🎬', '#AA96DA', '["movie", "cinema", "game", "entertainment", "music", "showmax", "netflix"]'),
+    ('cat-health', 'Health & Fitness', '⚕️', '#FCBAD3', '["hospital", "pharmacy", "doctor", "medicine", "gym", "health", "clinic"]'),
+    ('cat-education', 'Education', '📚', '#A8D8EA', '["school", "books", "tuition", "education", "course", "university"]'),
+    ('cat-airtime', 'Airtime & Data', '📞', '#FFFFD2', '["airtime", "data", "bundles", "safaricom", "airtel", "telkom"]'),
+    ('cat-transfers', 'Money Transfer', '💸', '#FEC8D8', '["transfer", "send money", "mpesa", "paybill", "till"]'),
+    ('cat-savings', 'Savings & Investments', '💰', '#957DAD', '["savings", "investment", "deposit", "savings account", "mshwari", "kcb mpesa"]'),
+    ('cat-income', 'Income', '💵', '#90EE90', '["salary", "income", "payment", "received"]'),
+    ('cat-other', 'Other', '📌', '#D4A5A5', '[]'),
+)
+
+
+def _category_values_sql(cat_id: str, name: str, icon: str, color: str, keywords: str) -> str:
+    """Build the VALUES tuple for a default category row"""
+    return bind_params("(?, 'system', ?, ?, ?, ?, TRUE)", [cat_id, name, icon, color, keywords])
+
+
+# Pre-built once at import time so seeding does no per-row work
+_CATEGORY_INSERT_PREFIX = "INSERT INTO categories (id, user_id, name, icon, color, keywords, is_default) VALUES "
+_DEFAULT_CATEGORIES_SQL = _CATEGORY_INSERT_PREFIX + ", ".join(
+    _category_values_sql(*category) for category in _DEFAULT_CATEGORIES
+)
+_DEFAULT_CATEGORY_INSERTS = tuple(
+    _CATEGORY_INSERT_PREFIX + _category_values_sql(*category) for category in _DEFAULT_CATEGORIES
+)
+
+
+# Secondary indexes for hot lookup paths: (name, CREATE statement)
+# - duplicate detection: similar-amount lookups per user within a time window,
+#   newest first (time window before amount, so the index also gives the order)
+# - duplicate statistics: SMS transaction counts and blocked-duplicate logs
+# - duplicate detection: exact message hash / M-Pesa transaction ID matches
+# - transaction list pages: per user by date, optionally per category
+# - category list: ordered by name
+# - daily spending: per user and type, grouped by calendar day
+# - budgets: a user's budgets for a month, optionally for one category
+#   (all equality filters, so one index serves both lookups)
+_INDEX_STATEMENTS = (
+    ('idx_transactions_user_created_amount',
+     "CREATE INDEX idx_transactions_user_created_amount ON transactions (user_id, created_at, amount)"),
+    ('idx_transactions_user_source_created',
+     "CREATE INDEX idx_transactions_user_source_created ON transactions (user_id, source, created_at)"),
+    ('idx_duplicate_logs_user_detected_action',
+     "CREATE INDEX idx_duplicate_logs_user_detected_action ON duplicate_logs (user_id, detected_at, action_taken)"),
+    ('idx_transactions_message_hash',
+     "CREATE INDEX idx_transactions_message_hash ON transactions (message_hash)"),
+    ('idx_transactions_mpesa_transaction_id',
+     "CREATE INDEX idx_transactions_mpesa_transaction_id ON transactions (mpesa_transaction_id)"),
+    ('idx_transactions_user_date',
+     "CREATE INDEX idx_transactions_user_date ON transactions (user_id, date)"),
+    ('idx_transactions_user_category_date',
+     "CREATE INDEX idx_transactions_user_category_date ON transactions (user_id, category_id, date)"),
+    ('idx_categories_name',
+     "CREATE INDEX idx_categories_name ON categories (name)"),
+    ('idx_transactions_user_type_day',
+     "CREATE INDEX idx_transactions_user_type_day ON transactions (user_id, type, date_day)"),
+    ('idx_budgets_user_year_month_category',
+     "CREATE INDEX idx_budgets_user_year_month_category ON budgets (user_id, year, month, category_id)"),
+)
+
+
+# Derived columns added to transactions after the original schema
+_TRANSACTION_LOOKUP_COLUMNS = ('message_hash', 'mpesa_transaction_id', 'date_day')
+# Transactions whose JSON columns are read per backfill query
+_BACKFILL_BATCH_SIZE = 500
+
+
+# Databases already confirmed to exist by this process (name -> True)
+_db_exists_cache: Dict[str, bool] = {}
+
+
 class DatabaseInitializer:
     """Service for automatic database initialization"""
 
@@ -23,6 +112,11 @@ class DatabaseInitializer:
     # Previous: 2.0.0 = Email/Password authentication
     # Previous: 1.0.0 = PIN-based authentication (deprecated)
 
+    # Guards initialize_database against concurrent runs within this process
+    _init_lock = asyncio.Lock()
+    # Successful initialization results keyed by (seed_categories, create_default_user)
+    _init_results: Dict[Tuple[bool, bool], dict] = {}
+
     @staticmethod
     async def ensure_database_exists() -> bool:
         """
@@ -31,18 +125,29 @@ class DatabaseInitializer:
         IMPORTANT: PesaDB databases must be pre-created via dashboard.
         This method validates configuration but doesn't create databases.
 
+        The result is cached per database name for the lifetime of the
+        process, so repeated initialization calls skip the check.
+
         Returns:
             True (assumes database is pre-created in PesaDB dashboard)
         """
         database_name = os.environ.get('PESADB_DATABASE', 'mpesa_tracker')
 
+        # Skip the check entirely once this process has confirmed the database
+        if _db_exists_cache.get(database_name):
+            logger.debug(f"Database '{database_name}' already confirmed in this process")
+            return True
+
         logger.info(f"📝 Using PesaDB database: '{database_name}'")
         logger.info(f"   ℹ️  Ensure this database exists in your PesaDB dashboard")
         logger.info(f"   ℹ️  PesaDB databases cannot be created via API")
 
         # Database should already exist in PesaDB dashboard
         # We'll verify connectivity by attempting a simple query later
-        return True
+        exists = await database_exists(database_name)
+        if exists:
+            _db_exists_cache[database_name] = True
+        return exists
 
     @staticmethod
     async def table_exists(table_name: str) -> bool:
@@ -55,16 +160,7 @@ class DatabaseInitializer:
             logger.debug(f"✅ Table '{table_name}' exists")
             return True
         except Exception as e:
-            error_msg = str(e).lower()
-            # Check for various "table doesn't exist" error messages
-            if any(phrase in error_msg for phrase in [
-                'does not exist',
-                'no such table',
-                'table not found',
-                'unknown table',
-                'tablenotfound',
-                'not found'
-            ]):
+            if is_table_not_found_error(e):
                 logger.debug(f"Table '{table_name}' does not exist: {str(e)}")
                 return False
             else:
@@ -74,10 +170,81 @@ class DatabaseInitializer:
                 return False
 
     @staticmethod
-    async def check_users_table_schema() -> dict:
+    async def list_tables() -> Optional[set]:
+        """
+        Get the names of all tables with one catalog query
+
+        Returns:
+            Set of lowercase table names, or None if the catalog can't be
+            queried and tables must be probed one at a time
+        """
+        try:
+            rows = await query_db("SHOW TABLES")
+        except Exception as e:
+            logger.debug(f"Catalog query not available, using per-table probes: {str(e)}")
+            return None
+
+        tables = set()
+        for row in rows or []:
+            for value in row.values():
+                if isinstance(value, str):
+                    tables.add(value.lower())
+        return tables
+
+    @staticmethod
+    async def snapshot_schema() -> Optional[dict]:
+        """
+        Fetch table and users-column metadata in at most two catalog queries
+
+        The snapshot is threaded through the schema check, table creation and
+        verification phases so they don't each probe every table separately.
+
+        Returns:
+            dict with 'tables' (set of table names) and 'users_columns'
+            (set of column names, or None if unavailable), or None if the
+            catalog can't be queried and per-table probes must be used
+        """
+        tables = await DatabaseInitializer.list_tables()
+        if tables is None:
+            return None
+
+        users_columns = None
+        if 'users' in tables:
+            try:
+                rows = await query_db("DESCRIBE users")
+                users_columns = set()
+                for row in rows or []:
+                    column = row.get('Field') or row.get('field') or row.get('column_name') or row.get('name')
+                    if column:
+                        users_columns.add(str(column).lower())
+                users_columns = users_columns or None
+            except Exception as e:
+                logger.debug(f"Could not describe users table: {str(e)}")
+
+        logger.debug(f"Schema snapshot: {len(tables)} tables found")
+        return {'tables': tables, 'users_columns': users_columns}
+
+    @staticmethod
+    async def _table_exists_in(table_name: str, schema: Optional[dict] = None) -> bool:
+        """Check table existence against a schema snapshot, probing if none is available"""
+        if schema is not None:
+            return table_name.lower() in schema['tables']
+        return await DatabaseInitializer.table_exists(table_name)
+
+    @staticmethod
+    def _record_table_created(table_name: str, schema: Optional[dict] = None):
+        """Keep a schema snapshot in sync after a table has been created"""
+        if schema is not None:
+            schema['tables'].add(table_name.lower())
+
+    @staticmethod
+    async def check_users_table_schema(schema: Optional[dict] = None) -> dict:
         """
         Check if the users table has the correct schema for email/password authentication
 
+        Args:
+            schema: Optional snapshot from snapshot_schema() to avoid probe queries
+
         Returns:
             dict with schema check results
         """
@@ -92,13 +259,23 @@ class DatabaseInitializer:
 
         try:
             # Check if table exists first
-            exists = await DatabaseInitializer.table_exists('users')
+            exists = await DatabaseInitializer._table_exists_in('users', schema)
             result['exists'] = exists
 
             if not exists:
                 logger.debug("Users table does not exist yet - will be created with correct schema")
                 return result
 
+            users_columns = schema.get('users_columns') if schema else None
+            if users_columns:
+                # Column list already known from the catalog - no probes needed
+                result['has_email'] = 'email' in users_columns
+                result['has_password_hash'] = 'password_hash' in users_columns
+                result['has_correct_schema'] = result['has_email'] and result['has_password_hash']
+                result['is_old_schema'] = not result['has_correct_schema']
+                result['needs_migration'] = not result['has_correct_schema']
+                return result
+
             # Try to query with email column
             try:
                 await query_db("SELECT id, email FROM users LIMIT 1")
@@ -266,10 +443,13 @@ class DatabaseInitializer:
         return 'unknown'
     
     @staticmethod
-    async def create_tables() -> Tuple[int, int, List[str]]:
+    async def create_tables(schema: Optional[dict] = None) -> Tuple[int, int, List[str]]:
         """
         Create all required tables if they don't exist using the SQL file
 
+        Args:
+            schema: Optional snapshot from snapshot_schema() to avoid probe queries
+
         Returns:
             Tuple of (tables_created, tables_skipped, errors)
         """
@@ -308,7 +488,7 @@ class DatabaseInitializer:
 
                 try:
                     # Check if table already exists
-                    exists = await DatabaseInitializer.table_exists(table_name)
+                    exists = await DatabaseInitializer._table_exists_in(table_name, schema)
 
                     if exists:
                         logger.info(f"✅ Table '{table_name}' already exists, skipping creation")
@@ -326,6 +506,7 @@ class DatabaseInitializer:
 
                     if exists:
                         logger.info(f"✅ Table '{table_name}' created successfully")
+                        DatabaseInitializer._record_table_created(table_name, schema)
                         tables_created += 1
                     else:
                         # FIXED: Do NOT assume success when verification fails
@@ -351,6 +532,7 @@ class DatabaseInitializer:
                         'exist'
                     ]):
                         logger.info(f"✅ Table '{table_name}' already exists (detected from error)")
+                        DatabaseInitializer._record_table_created(table_name, schema)
                         tables_skipped += 1
                     else:
                         error_msg = f"Error creating table '{table_name}': {str(e)}"
@@ -377,21 +559,21 @@ class DatabaseInitializer:
             errors.append(error_msg)
             # Fall back to inline schema if file not found
             logger.warning("⚠️  Falling back to inline schema definitions...")
-            return await DatabaseInitializer.create_tables_inline()
+            return await DatabaseInitializer.create_tables_inline(schema)
 
         except ValueError as e:
             error_msg = f"SQL parsing error: {str(e)}"
             logger.error(f"❌ {error_msg}")
             errors.append(error_msg)
             logger.warning("⚠️  Falling back to inline schema definitions...")
-            return await DatabaseInitializer.create_tables_inline()
+            return await DatabaseInitializer.create_tables_inline(schema)
 
         except Exception as e:
             error_msg = f"Error loading SQL schema: {str(e)}"
             logger.error(f"❌ {error_msg}")
             errors.append(error_msg)
             logger.warning("⚠️  Falling back to inline schema definitions...")
-            return await DatabaseInitializer.create_tables_inline()
+            return await DatabaseInitializer.create_tables_inline(schema)
 
         # After tables are created, execute INSERT statements
         logger.info("📦 Now executing INSERT statements for seed data...")
@@ -445,10 +627,13 @@ class DatabaseInitializer:
         return tables_created, tables_skipped, errors
     
     @staticmethod
-    async def create_tables_inline() -> Tuple[int, int, List[str]]:
+    async def create_tables_inline(schema: Optional[dict] = None) -> Tuple[int, int, List[str]]:
         """
         Fallback method: Create tables using inline SQL (legacy method)
 
+        Args:
+            schema: Optional snapshot from snapshot_schema() to avoid probe queries
+
         Returns:
             Tuple of (tables_created, tables_skipped, errors)
         """
@@ -508,7 +693,10 @@ class DatabaseInitializer:
     created_at STRING,
     transaction_group_id STRING,
     transaction_role STRING,
-    parent_transaction_id STRING
+    parent_transaction_id STRING,
+    message_hash STRING,
+    mpesa_transaction_id STRING,
+    date_day STRING
 )"""
             ),
             # Budgets table (references users and categories)
@@ -574,7 +762,7 @@ class DatabaseInitializer:
         for table_name, create_statement in table_statements:
             try:
                 # Check if table already exists first
-                exists = await DatabaseInitializer.table_exists(table_name)
+                exists = await DatabaseInitializer._table_exists_in(table_name, schema)
 
                 if exists:
                     logger.info(f"✅ Table '{table_name}' already exists, skipping (inline)")
@@ -592,6 +780,7 @@ class DatabaseInitializer:
 
                 if exists:
                     logger.info(f"✅ Table '{table_name}' created successfully")
+                    DatabaseInitializer._record_table_created(table_name, schema)
                     tables_created += 1
                 else:
                     # FIXED: Do NOT assume success when verification fails
@@ -617,6 +806,7 @@ class DatabaseInitializer:
                     'exist'
                 ]):
                     logger.info(f"✅ Table '{table_name}' already exists (detected from error)")
+                    DatabaseInitializer._record_table_created(table_name, schema)
                     tables_skipped += 1
                 else:
                     error_msg = f"Error creating table '{table_name}': {str(e)}"
@@ -677,35 +867,27 @@ class DatabaseInitializer:
                 return 0
 
             # This is now a fallback - the SQL file should handle seeding
-            default_categories = [
-                ('cat-food', 'Food & Dining', '🍔', '#FF6B6B', '["food", "restaurant", "dining", "lunch", "dinner", "breakfast", "nyama", "choma"]'),
-                ('cat-transport', 'Transport', '🚗', '#4ECDC4', '["taxi", "bus", "matatu", "uber", "fuel", "transport", "travel"]'),
-                ('cat-shopping', 'Shopping', '🛍️', '#95E1D3', '["shop", "store", "mall", "clothing", "electronics", "supermarket"]'),
-                ('cat-bills', 'Bills & Utilities', '📱', '#F38181', '["bill", "electricity", "water", "internet", "phone", "utility", "kplc", "nairobi water"]'),
-                ('cat-entertainment', 'Entertainment', '🎬', '#AA96DA', '["movie", "cinema", "game", "entertainment", "music", "showmax", "netflix"]'),
-                ('cat-health', 'Health & Fitness', '⚕️', '#FCBAD3', '["hospital", "pharmacy", "doctor", "medicine", "gym", "health", "clinic"]'),
-                ('cat-education', 'Education', '📚', '#A8D8EA', '["school", "books", "tuition", "education", "course", "university"]'),
-                ('cat-airtime', 'Airtime & Data', '📞', '#FFFFD2', '["airtime", "data", "bundles", "safaricom", "airtel", "telkom"]'),
-                ('cat-transfers', 'Money Transfer', '💸', '#FEC8D8', '["transfer", "send money", "mpesa", "paybill", "till"]'),
-                ('cat-savings', 'Savings & Investments', '💰', '#957DAD', '["savings", "investment", "deposit", "savings account", "mshwari", "kcb mpesa"]'),
-                ('cat-income', 'Income', '💵', '#90EE90', '["salary", "income", "payment", "received"]'),
-                ('cat-other', 'Other', '📌', '#D4A5A5', '[]'),
-            ]
-
-            seeded_count = 0
-            for cat_id, name, icon, color, keywords in default_categories:
-                try:
-                    # Escape single quotes in name for SQL safety
-                    safe_name = name.replace("'", "''")
-                    sql = f"""
-                    INSERT INTO categories (id, user_id, name, icon, color, keywords, is_default)
-                    VALUES ('{cat_id}', 'system', '{safe_name}', '{icon}', '{color}', '{keywords}', TRUE)
-                    """
-                    await execute_db(sql)
-                    seeded_count += 1
-                    logger.info(f"✅ Seeded category: {name}")
-                except Exception as e:
-                    logger.warning(f"⚠️  Category '{name}' may already exist: {str(e)}")
+            # Try all categories in a single multi-row INSERT first
+            try:
+                await execute_db(_DEFAULT_CATEGORIES_SQL)
+                seeded_count = len(_DEFAULT_CATEGORIES)
+                logger.info(f"✅ Seeded {seeded_count} categories in a single statement")
+            except Exception as e:
+                # Fall back to row-by-row inserts so existing rows don't block the rest
+                logger.warning(f"⚠️  Multi-row category insert failed, inserting one by one: {str(e)}")
+                # Rows are independent, so send them all at once
+                results = await asyncio.gather(
+                    *(execute_db(sql) for sql in _DEFAULT_CATEGORY_INSERTS),
+                    return_exceptions=True
+                )
+                seeded_count = 0
+                for category, result in zip(_DEFAULT_CATEGORIES, results):
+                    name = category[1]
+                    if isinstance(result, Exception):
+                        logger.warning(f"⚠️  Category '{name}' may already exist: {str(result)}")
+                    else:
+                        seeded_count += 1
+                        logger.info(f"✅ Seeded category: {name}")
 
             if seeded_count > 0:
                 logger.info(f"✅ Fallback seeded {seeded_count} default categories")
@@ -716,17 +898,17 @@ class DatabaseInitializer:
             return 0
     
     @staticmethod
-    async def verify_database() -> bool:
+    async def verify_database(schema: Optional[dict] = None) -> bool:
         """
         Verify that all required tables exist and are accessible
 
+        Args:
+            schema: Optional snapshot from snapshot_schema() to avoid probe queries
+
         Returns:
             True if database is properly initialized, False otherwise
         """
-        required_tables = [
-            'users', 'categories', 'transactions', 'budgets',
-            'sms_import_logs', 'duplicate_logs', 'status_checks'
-        ]
+        required_tables = REQUIRED_TABLES
 
         try:
             missing_tables = []
@@ -735,7 +917,7 @@ class DatabaseInitializer:
             logger.info(f"🔍 Verifying {len(required_tables)} required tables...")
 
             for table in required_tables:
-                exists = await DatabaseInitializer.table_exists(table)
+                exists = await DatabaseInitializer._table_exists_in(table, schema)
                 if not exists:
                     logger.error(f"❌ Required table '{table}' does not exist")
                     missing_tables.append(table)
@@ -755,6 +937,106 @@ class DatabaseInitializer:
             logger.error(f"❌ Database verification failed with exception: {str(e)}")
             return False
     
+    @staticmethod
+    async def migrate_transaction_lookup_columns() -> int:
+        """
+        Add and backfill the derived lookup columns of the transactions table
+
+        Tables created before message_hash / mpesa_transaction_id / date_day
+        existed get the columns added. Every run then backfills rows whose
+        lookup columns are still NULL or empty from sms_metadata /
+        mpesa_details / date, so a backfill that failed part way is finished
+        on the next startup. Rows without a hash or M-Pesa ID are stored as
+        'null' and so are not revisited.
+
+        Returns:
+            Number of existing transactions backfilled
+
+        Raises:
+            Exception: A probe failing for any reason other than a missing
+                column, or any backfill UPDATE failing
+        """
+        missing = []
+        for column in _TRANSACTION_LOOKUP_COLUMNS:
+            try:
+                await query_db(f"SELECT {column} FROM transactions LIMIT 1")
+            except Exception as e:
+                if not is_column_not_found_error(e):
+                    raise
+                missing.append(column)
+
+        for column in missing:
+            await execute_db(f"ALTER TABLE transactions ADD COLUMN {column} STRING")
+            logger.info(f"✅ Added column 'transactions.{column}'")
+        if missing:
+            reset_lookup_column_check()
+
+        # Find the unfilled rows with a narrow scan; NULL / empty matching is
+        # done here since PesaDB's IS NULL support varies between builds
+        rows = await query_db(f"SELECT id, {', '.join(_TRANSACTION_LOOKUP_COLUMNS)} FROM transactions")
+        unfilled = [
+            row['id'] for row in rows
+            if any(row.get(column) in (None, '') for column in _TRANSACTION_LOOKUP_COLUMNS)
+        ]
+        if not unfilled:
+            return 0
+
+        statements = []
+        for start in range(0, len(unfilled), _BACKFILL_BATCH_SIZE):
+            ids = tuple(unfilled[start:start + _BACKFILL_BATCH_SIZE])
+            sources = await query_db(
+                "SELECT id, date, mpesa_details, sms_metadata FROM transactions WHERE id IN (?)",
+                params=[ids]
+            )
+            for row in sources:
+                values = {'date_day': transaction_date_day(row.get('date'))}
+                for column, field, key in (
+                    ('message_hash', 'sms_metadata', 'original_message_hash'),
+                    ('mpesa_transaction_id', 'mpesa_details', 'transaction_id'),
+                ):
+                    raw = row.get(field)
+                    try:
+                        parsed = orjson.loads(raw) if isinstance(raw, str) else raw
+                    except ValueError:
+                        parsed = None
+                    value = parsed.get(key) if isinstance(parsed, dict) else None
+                    values[column] = value or 'null'
+                statements.append(build_update('transactions', values, "id = ?", [row['id']]))
+
+        # Raises after the whole batch if any UPDATE failed; those rows stay
+        # unfilled and are picked up again next startup
+        await execute_batch(statements)
+        logger.info(f"✅ Backfilled lookup columns for {len(statements)} transactions")
+        return len(statements)
+
+    @staticmethod
+    async def create_indexes() -> Tuple[int, int]:
+        """
+        Create secondary indexes for hot query paths
+
+        Indexes are an optimization only: failures (unsupported syntax,
+        index already present) are logged and never fail initialization.
+
+        Returns:
+            Tuple of (indexes_created, indexes_skipped)
+        """
+        created = 0
+        skipped = 0
+
+        for index_name, statement in _INDEX_STATEMENTS:
+            try:
+                await execute_db(statement)
+                created += 1
+                logger.info(f"✅ Created index '{index_name}'")
+            except AlreadyExistsError:
+                skipped += 1
+                logger.debug(f"Index '{index_name}' already exists")
+            except Exception as e:
+                skipped += 1
+                logger.warning(f"⚠️  Could not create index '{index_name}': {str(e)}")
+
+        return created, skipped
+
     @staticmethod
     async def create_default_user() -> dict:
         """
@@ -816,17 +1098,44 @@ class DatabaseInitializer:
             }
 
     @staticmethod
-    async def initialize_database(seed_categories: bool = True, create_default_user: bool = True) -> dict:
+    async def initialize_database(
+        seed_categories: bool = True,
+        create_default_user: bool = True,
+        force: bool = False
+    ) -> dict:
         """
         Main initialization function - creates database, tables and optionally seeds data
 
+        Concurrent callers in the same process are serialized; once a run has
+        succeeded, later calls with the same options return its result
+        without touching the database again.
+
         Args:
             seed_categories: Whether to seed default categories
             create_default_user: Whether to create a default user if none exists
+            force: Run initialization even if it already succeeded in this process
 
         Returns:
             Dictionary with initialization results
         """
+        options = (seed_categories, create_default_user)
+
+        async with DatabaseInitializer._init_lock:
+            cached = DatabaseInitializer._init_results.get(options)
+            if cached is not None and not force:
+                logger.info("✅ Database already initialized in this process, reusing result")
+                return cached
+
+            result = await DatabaseInitializer._run_initialization(seed_categories, create_default_user)
+
+            # Only cache successful runs so failures can be retried
+            if result['success']:
+                DatabaseInitializer._init_results[options] = result
+            return result
+
+    @staticmethod
+    async def _run_initialization(seed_categories: bool, create_default_user: bool) -> dict:
+        """Run the initialization steps - see initialize_database()"""
         logger.info("🚀 Starting automatic database initialization...")
 
         result = {
@@ -835,6 +1144,7 @@ class DatabaseInitializer:
             'tables_created': 0,
             'tables_skipped': 0,
             'categories_seeded': 0,
+            'indexes_created': 0,
             'user_created': False,
             'verified': False,
             'migrated': False,
@@ -855,8 +1165,10 @@ class DatabaseInitializer:
                 # Continue anyway - database might exist
 
             # Step 0.5: Check for schema migration needs
+            # One catalog snapshot feeds the schema check, creation and verification steps
             logger.info("📝 Step 0.5: Checking users table schema...")
-            schema_check = await DatabaseInitializer.check_users_table_schema()
+            schema = await DatabaseInitializer.snapshot_schema()
+            schema_check = await DatabaseInitializer.check_users_table_schema(schema)
 
             if schema_check['needs_migration']:
                 logger.warning("⚠️  OLD SCHEMA DETECTED - Users table needs migration!")
@@ -870,6 +1182,8 @@ class DatabaseInitializer:
                     error_msg = 'Users table migration failed - signup/login will not work'
                     result['errors'].append(error_msg)
                     logger.error(f"❌ {error_msg}")
+                    # The snapshot no longer reflects the users table - probe instead
+                    schema = None
                 else:
                     logger.info("✅ Users table migrated successfully to email/password schema")
             elif schema_check['exists'] and schema_check['has_correct_schema']:
@@ -879,7 +1193,7 @@ class DatabaseInitializer:
 
             # Step 1: Create tables
             logger.info("📝 Step 1: Creating tables...")
-            tables_created, tables_skipped, table_errors = await DatabaseInitializer.create_tables()
+            tables_created, tables_skipped, table_errors = await DatabaseInitializer.create_tables(schema)
             result['tables_created'] = tables_created
             result['tables_skipped'] = tables_skipped
             result['errors'].extend(table_errors)
@@ -893,7 +1207,7 @@ class DatabaseInitializer:
 
             # Step 2: Verify database
             logger.info("📝 Step 2: Verifying database...")
-            verified = await DatabaseInitializer.verify_database()
+            verified = await DatabaseInitializer.verify_database(schema)
             result['verified'] = verified
 
             if not verified:
@@ -904,13 +1218,13 @@ class DatabaseInitializer:
                 # If verification failed, try inline creation as a fallback
                 if tables_created == 0:
                     logger.warning("⚠️  No tables were created, attempting fallback inline creation...")
-                    tables_created, tables_skipped, inline_errors = await DatabaseInitializer.create_tables_inline()
+                    tables_created, tables_skipped, inline_errors = await DatabaseInitializer.create_tables_inline(schema)
                     result['tables_created'] = tables_created
                     result['tables_skipped'] = tables_skipped
                     result['errors'].extend(inline_errors)
 
                     # Re-verify after inline creation
-                    verified = await DatabaseInitializer.verify_database()
+                    verified = await DatabaseInitializer.verify_database(schema)
                     result['verified'] = verified
 
                     if not verified:
@@ -923,19 +1237,52 @@ class DatabaseInitializer:
                     result['message'] = error_msg
                     return result
 
+            # Step 2.5: Add lookup columns to transactions tables that predate them
+            logger.info("📝 Step 2.5: Checking transaction lookup columns...")
+            try:
+                await DatabaseInitializer.migrate_transaction_lookup_columns()
+            except Exception as e:
+                # Unfilled rows are missed by the hash / M-Pesa ID lookups
+                # until a later startup finishes the backfill
+                logger.error(f"❌ Could not migrate transaction lookup columns, retrying on next startup: {str(e)}")
+
+            # Step 2.6: Create indexes (best effort)
+            logger.info("📝 Step 2.6: Creating indexes...")
+            indexes_created, indexes_skipped = await DatabaseInitializer.create_indexes()
+            result['indexes_created'] = indexes_created
+            logger.info(f"📊 Indexes: {indexes_created} created, {indexes_skipped} skipped")
+
             # Step 3: Seed default categories if requested
             if seed_categories:
                 logger.info("📝 Step 3: Seeding default categories...")
-                categories_seeded = await DatabaseInitializer.seed_default_categories()
-                result['categories_seeded'] = categories_seeded
+                try:
+                    result['categories_seeded'] = await DatabaseInitializer.seed_default_categories()
+                except Exception as e:
+                    error_msg = f'Error seeding default categories: {str(e)}'
+                    result['errors'].append(error_msg)
+                    logger.error(f"❌ {error_msg}")
 
-            # Step 4: Create default user if requested
+            # Step 4: Create default user if requested. This runs after
+            # seeding on purpose: seeding inserts the 'system' user that owns
+            # the default categories, and create_default_user skips creation
+            # whenever any user exists - so a database seeded here gets no
+            # admin account. Running the two concurrently made that depend on
+            # which request landed first.
             if create_default_user:
                 logger.info("📝 Step 4: Creating default user if needed...")
-                user_result = await DatabaseInitializer.create_default_user()
-                result['user_created'] = user_result['created']
-                if user_result.get('user_id'):
-                    result['user_id'] = user_result['user_id']
+                try:
+                    user_result = await DatabaseInitializer.create_default_user()
+                    result['user_created'] = user_result['created']
+                    if user_result.get('user_id'):
+                        result['user_id'] = user_result['user_id']
+                except Exception as e:
+                    error_msg = f'Error creating default user: {str(e)}'
+                    result['errors'].append(error_msg)
+                    logger.error(f"❌ {error_msg}")
+
+            # Seeding writes rows directly, bypassing the service's caches
+            clear_count_estimates()
+            clear_reference_cache()
 
             # Print detailed summary
             logger.info("=" * 80)
@@ -943,6 +1290,7 @@ class DatabaseInitializer:
             logger.info("=" * 80)
             logger.info(f"Tables Created: {result['tables_created']}")
             logger.info(f"Tables Skipped (already exist): {result['tables_skipped']}")
+            logger.info(f"Indexes Created: {result['indexes_created']}")
             logger.info(f"Categories Seeded: {result['categories_seeded']}")
             logger.info(f"Default User Created: {result.get('user_created', False)}")
             logger.info(f"Database Verified: {result['verified']}")
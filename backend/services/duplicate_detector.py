@@ -1,264 +1,560 @@
-from typing import List, Optional, Dict, Any
-from datetime import datetime, timedelta
+import asyncio
+import logging
+from collections import Counter
+from typing import List, Optional, Dict, Any, Tuple
+from datetime import datetime, timezone
+from config.pesadb import BatchedInserter
 from services.pesadb_service import db_service
 from config.pesadb_fallbacks import count_rows_safe, aggregate_safe
+from utils.cache import LRUCache, ScalableBloomFilter
 import hashlib
+import os
+import secrets
+import time
+from functools import lru_cache
+from rapidfuzz import fuzz
+from rapidfuzz.utils import default_process
 
-class DuplicateDetector:
+logger = logging.getLogger(__name__)
+
+# Confirmed duplicates by message hash / M-Pesa transaction ID.
+# Only positive results are cached: a "not a duplicate" answer goes stale as
+# soon as the transaction is inserted, while a match stays valid until the
+# transaction is deleted (see clear_lookup_cache).
+_hash_lookup_cache = LRUCache(maxsize=10_000)
+_transaction_id_lookup_cache = LRUCache(maxsize=10_000)
+
+# Per-user duplicate statistics keyed by (user_id, days). The stats endpoint
+# runs three counting queries over transactions/duplicate_logs; a minute of
+# staleness is fine for a dashboard figure.
+_statistics_cache = LRUCache(maxsize=1024, ttl=60)
+
+# Bloom filter over every stored SMS message hash, built at startup by
+# load_message_hash_filter(). Most incoming SMS are new, and
+# a filter miss proves it without the LIKE scan over sms_metadata. Until the
+# filter is loaded every hash lookup goes to the database. Inserts must be
+# reported through remember_message_hash().
+#
+# The filter only learns the hashes this process stores. Another writer (the
+# old instance during a rolling deploy, a second replica, a script) can store
+# hashes it never sees, and no unique constraint rejects a repeated hash. A
+# miss is therefore only trusted while the filter is younger than
+# HASH_FILTER_MAX_AGE seconds; after that misses are checked against the
+# database while the filter is rebuilt in the background. That bounds how
+# long another writer's hash can go unnoticed. Set
+# DUPLICATE_HASH_FILTER_MAX_AGE to 0 to always check the database, or raise
+# it when this process is known to be the only writer.
+HASH_FILTER_MAX_AGE = float(os.environ.get('DUPLICATE_HASH_FILTER_MAX_AGE', '300'))
+_hash_filter: Optional[ScalableBloomFilter] = None
+# time.monotonic() when the current filter's load started
+_hash_filter_loaded_at = 0.0
+# Filter being built by a load in progress - also receives new hashes
+_hash_filter_loading: Optional[ScalableBloomFilter] = None
+_hash_filter_rebuild: Optional[asyncio.Task] = None
+
+
+# Writes duplicate logs in bulk while running (see start_log_writer);
+# otherwise log_duplicate_attempt writes each log directly. The writer waits
+# half a second after the first queued log for others to arrive.
+_log_writer = BatchedInserter('duplicate_logs', batch_size=200, flush_delay=0.5)
+
+
+@lru_cache(maxsize=16384)
+def _parse_timestamp(value: str) -> float:
+    """Parse an ISO-8601 timestamp to Unix seconds (naive values are UTC)"""
+    return _datetime_to_timestamp(datetime.fromisoformat(value))
+
+
+def _datetime_to_timestamp(value: datetime) -> float:
+    """Convert a datetime to Unix seconds (naive values are UTC)"""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+# Columns read by check_comprehensive_duplicate and the similarity scorer,
+# plus enough to identify a candidate for review. sms_metadata and the
+# grouping columns are never needed here.
+_SIMILAR_TRANSACTION_COLUMNS = ['id', 'amount', 'type', 'description', 'date', 'created_at', 'mpesa_details']
+
+
+def _utc_iso(seconds_ago: float = 0) -> str:
+    """Naive UTC ISO timestamp, in the format created_at/detected_at are stored"""
+    return datetime.fromtimestamp(time.time() - seconds_ago, timezone.utc).replace(tzinfo=None).isoformat()
+
+
+async def _resolved(value):
+    """Awaitable stand-in for a lookup that doesn't need to run"""
+    return value
+
+
+async def is_duplicate_by_hash(message_hash: str) -> bool:
     """
-    Service to detect and prevent duplicate M-Pesa transactions from SMS parsing
-    Migrated to use PesaDBService instead of MongoDB
+    Check if a transaction with the same message hash already exists
     """
-    
-    @staticmethod
-    async def is_duplicate_by_hash(message_hash: str) -> bool:
-        """
-        Check if a transaction with the same message hash already exists
-        """
-        existing = await db_service.get_transaction_by_message_hash(message_hash)
-        return existing is not None
-    
-    @staticmethod
-    async def is_duplicate_by_transaction_id(transaction_id: str) -> bool:
-        """
-        Check if a transaction with the same M-Pesa transaction ID already exists
-        """
-        if not transaction_id:
+    if _hash_lookup_cache.get(message_hash):
+        return True
+
+    # Definitely never stored by this process - while the filter is recent
+    # enough to cover other writers too, no need to ask the database
+    if _hash_filter is not None and message_hash not in _hash_filter:
+        if time.monotonic() - _hash_filter_loaded_at < HASH_FILTER_MAX_AGE:
             return False
-            
-        existing = await db_service.get_transaction_by_mpesa_id(transaction_id)
-        return existing is not None
+        _schedule_hash_filter_rebuild()
+
+    existing = await db_service.get_transaction_by_message_hash(message_hash, columns=['id'])
+    if existing is not None:
+        _hash_lookup_cache.set(message_hash, True)
+        return True
+    return False
+
+
+async def is_duplicate_by_transaction_id(transaction_id: str) -> bool:
+    """
+    Check if a transaction with the same M-Pesa transaction ID already exists
+    """
+    if not transaction_id:
+        return False
+
+    if _transaction_id_lookup_cache.get(transaction_id):
+        return True
+
+    existing = await db_service.get_transaction_by_mpesa_id(transaction_id, columns=['id'])
+    if existing is not None:
+        _transaction_id_lookup_cache.set(transaction_id, True)
+        return True
+    return False
+
+
+async def load_message_hash_filter() -> int:
+    """
+    Build the message hash Bloom filter from stored transactions
+
+    Returns:
+        Number of message hashes loaded
+    """
+    global _hash_filter, _hash_filter_loaded_at, _hash_filter_loading
+
+    if HASH_FILTER_MAX_AGE <= 0:
+        # Disabled - every hash lookup goes to the database
+        return 0
+
+    bloom = ScalableBloomFilter(initial_capacity=100_000, error_rate=0.001)
+    started = time.monotonic()
+    _hash_filter_loading = bloom
+    try:
+        for message_hash in await db_service.get_message_hashes():
+            bloom.add(message_hash)
+        _hash_filter = bloom
+        _hash_filter_loaded_at = started
+    finally:
+        _hash_filter_loading = None
+
+    return len(bloom)
+
+
+def _schedule_hash_filter_rebuild():
+    """Start rebuilding an expired hash filter, unless a load is already running"""
+    global _hash_filter_rebuild
+    if _hash_filter_loading is not None:
+        return
+    if _hash_filter_rebuild is not None and not _hash_filter_rebuild.done():
+        return
+    _hash_filter_rebuild = asyncio.get_running_loop().create_task(_rebuild_hash_filter())
+
+
+async def _rebuild_hash_filter():
+    """Reload the hash filter in the background; misses query the database meanwhile"""
+    try:
+        hashes_loaded = await load_message_hash_filter()
+        logger.info(f"✅ Duplicate filter rebuilt with {hashes_loaded} message hashes")
+    except Exception as e:
+        logger.warning(f"Could not rebuild duplicate filter - hash checks will query the database: {e}")
+
+
+def remember_message_hash(message_hash: Optional[str]):
+    """
+    Record the message hash of a newly stored transaction
+
+    Must be called after every transaction insert that carries an
+    original_message_hash, or the filter would report it as new. Bulk
+    imports call it before their deferred insert, so later messages in the
+    same import are matched without reading the database.
+    """
+    if not message_hash:
+        return
+    _hash_lookup_cache.set(message_hash, True)
+    for bloom in (_hash_filter, _hash_filter_loading):
+        if bloom is not None:
+            bloom.add(message_hash)
+
+
+def clear_lookup_cache():
+    """
+    Forget cached duplicate matches - call after transactions are deleted
+    """
+    _hash_lookup_cache.clear()
+    _transaction_id_lookup_cache.clear()
+
+
+def lookup_cache_info() -> Dict[str, Dict[str, int]]:
+    """
+    Get hit/miss statistics for the duplicate lookup caches
+    """
+    return {
+        "message_hash": _hash_lookup_cache.info(),
+        "transaction_id": _transaction_id_lookup_cache.info()
+    }
+
+
+async def find_similar_transactions(
+    amount: float, 
+    user_id: str,
+    time_window_hours: int = 24,
+    columns: Optional[List[str]] = None
+) -> List[Dict[str, Any]]:
+    """
+    Find transactions with similar amount within a time window
+
+    Args:
+        columns: Columns to fetch (default: all)
+    """
+    cutoff_str = _utc_iso(time_window_hours * 3600)
     
-    @staticmethod
-    async def find_similar_transactions(
-        amount: float, 
-        user_id: str,
-        time_window_hours: int = 24
-    ) -> List[Dict[str, Any]]:
-        """
-        Find transactions with similar amount within a time window
-        """
-        cutoff_time = datetime.utcnow() - timedelta(hours=time_window_hours)
-        cutoff_str = cutoff_time.isoformat()
-        
-        # Find transactions with same amount (+/- 1 KSh for rounding)
-        similar_transactions = await db_service.get_similar_transactions(
-            user_id=user_id,
-            amount=amount,
-            cutoff_time=cutoff_str,
-            limit=50
-        )
-        
-        return similar_transactions
+    # Find transactions with same amount (+/- 1 KSh for rounding)
+    similar_transactions = await db_service.get_similar_transactions(
+        user_id=user_id,
+        amount=amount,
+        cutoff_time=cutoff_str,
+        limit=50,
+        columns=columns
+    )
     
-    @staticmethod
-    async def check_comprehensive_duplicate(
-        user_id: str,
-        amount: float,
-        transaction_id: Optional[str] = None,
-        message_hash: Optional[str] = None,
-        recipient: Optional[str] = None,
-        time_window_hours: int = 24
-    ) -> Dict[str, Any]:
-        """
-        Comprehensive duplicate check using multiple criteria
-        """
-        duplicate_reasons = []
-        confidence = 0.0
-        
-        # Check by message hash (highest confidence)
-        if message_hash and await DuplicateDetector.is_duplicate_by_hash(message_hash):
-            duplicate_reasons.append("exact_message_match")
-            confidence = 1.0
-        
-        # Check by transaction ID (high confidence)
-        if transaction_id and await DuplicateDetector.is_duplicate_by_transaction_id(transaction_id):
-            duplicate_reasons.append("transaction_id_match")
-            confidence = max(confidence, 0.9)
-        
-        # Check for similar transactions (lower confidence)
-        similar_transactions = await DuplicateDetector.find_similar_transactions(
-            amount, user_id, time_window_hours
-        )
-        
-        if similar_transactions:
-            # Check for exact amount and recipient match
-            for transaction in similar_transactions:
-                mpesa_details = transaction.get("mpesa_details", {})
-                if isinstance(mpesa_details, dict):
-                    if (transaction.get("amount") == amount and 
-                        mpesa_details.get("recipient") == recipient):
-                        duplicate_reasons.append("amount_recipient_match")
-                        confidence = max(confidence, 0.7)
-                        break
-            
-            # If no exact match, but similar amounts exist
-            if not duplicate_reasons and len(similar_transactions) > 0:
-                duplicate_reasons.append("similar_amount_recent")
-                confidence = max(confidence, 0.3)
-        
+    return similar_transactions
+
+
+async def check_comprehensive_duplicate(
+    user_id: str,
+    amount: float,
+    transaction_id: Optional[str] = None,
+    message_hash: Optional[str] = None,
+    recipient: Optional[str] = None,
+    time_window_hours: int = 24
+) -> Dict[str, Any]:
+    """
+    Comprehensive duplicate check using multiple criteria
+    """
+    # An exact message match is definitive - skip the remaining lookups
+    if message_hash and await is_duplicate_by_hash(message_hash):
         return {
-            "is_duplicate": len(duplicate_reasons) > 0 and confidence >= 0.7,
-            "confidence": confidence,
-            "reasons": duplicate_reasons,
-            "similar_transactions": similar_transactions[:5]  # Return top 5 for review
+            "is_duplicate": True,
+            "confidence": 1.0,
+            "reasons": ["exact_message_match"],
+            "similar_transactions": []
         }
+
+    duplicate_reasons = []
+    confidence = 0.0
+
+    # The remaining lookups are independent - run them concurrently
+    transaction_id_match, similar_transactions = await asyncio.gather(
+        is_duplicate_by_transaction_id(transaction_id) if transaction_id else _resolved(False),
+        find_similar_transactions(
+            amount, user_id, time_window_hours, columns=_SIMILAR_TRANSACTION_COLUMNS
+        )
+    )
     
-    @staticmethod
-    def calculate_similarity_score(transaction1: Dict[str, Any], transaction2: Dict[str, Any]) -> float:
-        """
-        Calculate similarity score between two transactions (0.0 - 1.0)
-        """
-        score = 0.0
-        
-        # Amount similarity (40% weight)
-        amount1 = transaction1.get("amount", 0)
-        amount2 = transaction2.get("amount", 0)
-        if amount1 > 0 and amount2 > 0:
-            amount_diff = abs(amount1 - amount2)
-            amount_similarity = max(0, 1 - (amount_diff / max(amount1, amount2)))
-            score += amount_similarity * 0.4
-        
-        # Recipient similarity (30% weight)
-        mpesa1 = transaction1.get("mpesa_details", {})
-        mpesa2 = transaction2.get("mpesa_details", {})
-        recipient1 = mpesa1.get("recipient", "") if isinstance(mpesa1, dict) else ""
-        recipient2 = mpesa2.get("recipient", "") if isinstance(mpesa2, dict) else ""
-        if recipient1 and recipient2:
-            recipient_similarity = DuplicateDetector._string_similarity(recipient1, recipient2)
-            score += recipient_similarity * 0.3
-        
-        # Time proximity (20% weight)
-        time1 = transaction1.get("created_at")
-        time2 = transaction2.get("created_at")
-        if time1 and time2:
-            # Convert to datetime if string
-            if isinstance(time1, str):
-                time1 = datetime.fromisoformat(time1.replace('Z', '+00:00'))
-            if isinstance(time2, str):
-                time2 = datetime.fromisoformat(time2.replace('Z', '+00:00'))
-            
-            time_diff = abs((time1 - time2).total_seconds())
-            time_similarity = max(0, 1 - (time_diff / (24 * 3600)))  # 24 hour window
-            score += time_similarity * 0.2
-        
-        # Transaction ID similarity (10% weight)
-        txn_id1 = mpesa1.get("transaction_id", "") if isinstance(mpesa1, dict) else ""
-        txn_id2 = mpesa2.get("transaction_id", "") if isinstance(mpesa2, dict) else ""
-        if txn_id1 and txn_id2:
-            id_similarity = 1.0 if txn_id1 == txn_id2 else 0.0
-            score += id_similarity * 0.1
-        
-        return score
+    # Check by transaction ID (high confidence)
+    if transaction_id_match:
+        duplicate_reasons.append("transaction_id_match")
+        confidence = max(confidence, 0.9)
     
-    @staticmethod
-    def _string_similarity(str1: str, str2: str) -> float:
-        """
-        Calculate string similarity using simple character overlap
-        """
-        if not str1 or not str2:
-            return 0.0
-        
-        str1 = str1.lower().strip()
-        str2 = str2.lower().strip()
-        
-        if str1 == str2:
-            return 1.0
-        
-        # Simple Jaccard similarity
-        set1 = set(str1.split())
-        set2 = set(str2.split())
+    # Check for similar transactions (lower confidence)
+    if similar_transactions:
+        # Check for exact amount and recipient match
+        for transaction in similar_transactions:
+            mpesa_details = transaction.get("mpesa_details", {})
+            if isinstance(mpesa_details, dict):
+                if (transaction.get("amount") == amount and 
+                    mpesa_details.get("recipient") == recipient):
+                    duplicate_reasons.append("amount_recipient_match")
+                    confidence = max(confidence, 0.7)
+                    break
         
-        if not set1 or not set2:
-            return 0.0
-        
-        intersection = len(set1.intersection(set2))
-        union = len(set1.union(set2))
-        
-        return intersection / union if union > 0 else 0.0
+        # If no exact match, but similar amounts exist
+        if not duplicate_reasons and len(similar_transactions) > 0:
+            duplicate_reasons.append("similar_amount_recent")
+            confidence = max(confidence, 0.3)
     
-    @staticmethod
-    async def log_duplicate_attempt(
-        user_id: str,
-        message_hash: str,
-        duplicate_info: Dict[str, Any],
-        original_transaction_id: Optional[str] = None,
-        duplicate_transaction_id: Optional[str] = None,
-        mpesa_transaction_id: Optional[str] = None
-    ):
-        """
-        Log duplicate detection attempt for analysis
-        """
-        reasons_str = ",".join(duplicate_info["reasons"])  # Store as comma-separated string
-
-        log_entry = {
-            "id": f"dup_{datetime.utcnow().timestamp()}_{message_hash[:8]}",
-            "user_id": user_id,
-            "original_transaction_id": original_transaction_id or "",
-            "duplicate_transaction_id": duplicate_transaction_id or "",
-            "message_hash": message_hash,
-            "mpesa_transaction_id": mpesa_transaction_id or "",
-            "reason": reasons_str,  # Legacy field - same as duplicate_reasons
-            "duplicate_reasons": reasons_str,  # New field for clarity
-            "duplicate_confidence": duplicate_info["confidence"],
-            "similarity_score": duplicate_info.get("similarity_score", duplicate_info["confidence"]),
-            "detected_at": datetime.utcnow().isoformat(),
-            "action_taken": "blocked" if duplicate_info["is_duplicate"] else "allowed"
-        }
+    return {
+        "is_duplicate": len(duplicate_reasons) > 0 and confidence >= 0.7,
+        "confidence": confidence,
+        "reasons": duplicate_reasons,
+        "similar_transactions": similar_transactions[:5]  # Return 5 most recent for review
+    }
+
+
+def calculate_similarity_score(transaction1: Dict[str, Any], transaction2: Dict[str, Any]) -> float:
+    """
+    Calculate similarity score between two transactions (0.0 - 1.0)
+    """
+    return _score_features(
+        _similarity_features(transaction1),
+        _similarity_features(transaction2)
+    )
+
+
+def _similarity_features(transaction: Dict[str, Any]) -> Tuple[float, str, Optional[float], str]:
+    """
+    Extract (amount, recipient, created_at timestamp, M-Pesa transaction ID) for scoring
+    """
+    mpesa = transaction.get("mpesa_details", {})
+    if not isinstance(mpesa, dict):
+        mpesa = {}
+
+    # Compare times as Unix seconds; string parsing is memoized since the
+    # same stored rows are scored against every incoming SMS
+    created_at = transaction.get("created_at")
+    if isinstance(created_at, str) and created_at:
+        created_ts = _parse_timestamp(created_at)
+    elif isinstance(created_at, datetime):
+        created_ts = _datetime_to_timestamp(created_at)
+    else:
+        created_ts = None
+
+    return (
+        transaction.get("amount", 0),
+        mpesa.get("recipient", ""),
+        created_ts,
+        mpesa.get("transaction_id", "")
+    )
+
+
+def _score_features(
+    features1: Tuple[float, str, Optional[float], str],
+    features2: Tuple[float, str, Optional[float], str]
+) -> float:
+    """
+    Weighted similarity of two feature tuples from _similarity_features()
+    """
+    amount1, recipient1, time1, txn_id1 = features1
+    amount2, recipient2, time2, txn_id2 = features2
+
+    recipient_similarity = _string_similarity(recipient1, recipient2) if recipient1 and recipient2 else None
+
+    return _score_full(amount1, amount2, recipient_similarity, time1, time2, txn_id1, txn_id2)
+
+
+# Per-second decay of the time-proximity weight over the 24 hour window
+_TIME_WEIGHT_PER_SECOND = 0.2 / (24 * 3600)
+
+
+def _score_full(
+    amount1: float,
+    amount2: float,
+    recipient_similarity: Optional[float],
+    time1: Optional[float],
+    time2: Optional[float],
+    txn_id1: str,
+    txn_id2: str
+) -> float:
+    """
+    Weighted similarity from already-extracted fields
+
+    Takes plain values so callers holding normalized fields skip the tuple
+    and dict handling. recipient_similarity is None when either side has
+    no recipient.
+    """
+    score = 0.0
+    
+    # Amount similarity (40% weight)
+    if amount1 > 0 and amount2 > 0:
+        score += max(0.0, 0.4 - 0.4 * abs(amount1 - amount2) / max(amount1, amount2))
+    
+    # Recipient similarity (30% weight)
+    if recipient_similarity is not None:
+        score += recipient_similarity * 0.3
+    
+    # Time proximity (20% weight)
+    if time1 is not None and time2 is not None:
+        score += max(0.0, 0.2 - abs(time1 - time2) * _TIME_WEIGHT_PER_SECOND)
+    
+    # Transaction ID similarity (10% weight)
+    if txn_id1 and txn_id2 and txn_id1 == txn_id2:
+        score += 0.1
+    
+    return score
+
+
+def _string_similarity(str1: str, str2: str) -> float:
+    """
+    Calculate typo-tolerant string similarity (0.0 - 1.0)
+
+    Uses RapidFuzz's token-set ratio, so word order and SMS spelling
+    variations in recipient names don't hide a match.
+    """
+    if not str1 or not str2:
+        return 0.0
+
+    return fuzz.token_set_ratio(str1, str2, processor=default_process) / 100.0
+
+
+async def log_duplicate_attempt(
+    user_id: str,
+    message_hash: str,
+    duplicate_info: Dict[str, Any],
+    original_transaction_id: Optional[str] = None,
+    duplicate_transaction_id: Optional[str] = None,
+    mpesa_transaction_id: Optional[str] = None
+):
+    """
+    Log duplicate detection attempt for analysis
+
+    While the background writer is running the log is queued and written
+    in bulk, keeping the INSERT off the request path.
+    """
+    reasons_str = ",".join(duplicate_info["reasons"])  # Store as comma-separated string
 
+    log_entry = {
+        "id": f"dup_{time.time_ns() // 1000}_{secrets.token_hex(4)}",
+        "user_id": user_id,
+        "original_transaction_id": original_transaction_id or "",
+        "duplicate_transaction_id": duplicate_transaction_id or "",
+        "message_hash": message_hash,
+        "mpesa_transaction_id": mpesa_transaction_id or "",
+        "reason": reasons_str,  # Legacy field - same as duplicate_reasons
+        "duplicate_reasons": reasons_str,  # New field for clarity
+        "duplicate_confidence": duplicate_info["confidence"],
+        "similarity_score": duplicate_info.get("similarity_score", duplicate_info["confidence"]),
+        "detected_at": _utc_iso(),
+        "action_taken": "blocked" if duplicate_info["is_duplicate"] else "allowed"
+    }
+
+    if _log_writer.running:
+        _log_writer.add(log_entry)
+    else:
         await db_service.create_duplicate_log(log_entry)
+
+
+def start_log_writer():
+    """
+    Start writing duplicate logs in batches from a background task
+
+    Must be called from a running event loop (application startup).
+    """
+    _log_writer.start()
+
+
+async def stop_log_writer():
+    """
+    Flush any queued duplicate logs and stop the background writer
+    """
+    await _log_writer.stop()
+
+
+async def get_duplicate_statistics(
+    user_id: str,
+    days: int = 30
+) -> Dict[str, Any]:
+    """
+    Get duplicate detection statistics for a user
+
+    Results are cached per (user_id, days) for up to a minute.
+    """
+    cached = _statistics_cache.get((user_id, days))
+    if cached is not None:
+        return {**cached, "lookup_cache": lookup_cache_info()}
+
+    cutoff_str = _utc_iso(days * 86400)
     
-    @staticmethod
-    async def get_duplicate_statistics(
-        user_id: str,
-        days: int = 30
-    ) -> Dict[str, Any]:
-        """
-        Get duplicate detection statistics for a user
-        """
-        cutoff_date = datetime.utcnow() - timedelta(days=days)
-        cutoff_str = cutoff_date.isoformat()
-        
+    from config.pesadb import query_db
+
+    # The three statistics queries are independent - issue them together
+    # so the endpoint waits for one round trip instead of three
+    duplicates_blocked, sms_transactions, reasons_result = await asyncio.gather(
         # Count duplicates blocked
-        duplicates_blocked = await db_service.count_duplicate_logs(user_id)
-        
+        db_service.count_duplicate_logs(user_id),
         # Count SMS transactions processed using fallback-safe count
-        from config.pesadb import query_db
-        where_sms = f"user_id = '{user_id}' AND source = 'sms' AND created_at >= '{cutoff_str}'"
-        sms_transactions = await count_rows_safe('transactions', where_sms, query_func=query_db)
-
+        count_rows_safe(
+            'transactions',
+            "user_id = ? AND source = 'sms' AND created_at >= ?",
+            query_func=query_db,
+            params=[user_id, cutoff_str]
+        ),
         # Get common duplicate reasons using fallback-safe aggregation
-        where_reasons = f"user_id = '{user_id}' AND detected_at >= '{cutoff_str}' AND action_taken = 'blocked'"
-        reasons_result = await aggregate_safe(
+        aggregate_safe(
             'duplicate_logs',
             [('COUNT', '*')],
-            where=where_reasons,
+            where="user_id = ? AND detected_at >= ? AND action_taken = 'blocked'",
             group_by='duplicate_reasons',
             order_by='count_all DESC',
-            query_func=query_db
+            query_func=query_db,
+            params=[user_id, cutoff_str]
         )
-        # Limit to 10 results manually since LIMIT is in the query part
-        reasons_result = reasons_result[:10] if reasons_result else []
-        
-        # Parse comma-separated reasons
-        duplicate_reasons = []
-        for row in reasons_result:
-            reasons_str = row.get('duplicate_reasons', '')
-            count = row.get('count_all', 0)  # Updated to match aggregate_safe output
-            if reasons_str:
-                for reason in reasons_str.split(','):
-                    duplicate_reasons.append({"_id": reason.strip(), "count": count})
-        
-        return {
-            "duplicates_blocked": duplicates_blocked,
-            "sms_transactions_processed": sms_transactions,
-            "duplicate_rate": duplicates_blocked / max(sms_transactions + duplicates_blocked, 1),
-            "common_duplicate_reasons": duplicate_reasons
-        }
+    )
+    # Rows are grouped by the stored reason combination (a comma-separated
+    # STRING - PesaDB has no array columns), so total each individual
+    # reason across combinations before picking the top 10
+    reason_counts = Counter()
+    for row in reasons_result or []:
+        reasons_str = row.get('duplicate_reasons', '')
+        count = row.get('count_all', 0)  # Updated to match aggregate_safe output
+        if reasons_str:
+            for reason in reasons_str.split(','):
+                reason_counts[reason.strip()] += count
+
+    duplicate_reasons = [
+        {"_id": reason, "count": count}
+        for reason, count in reason_counts.most_common(10)
+    ]
     
-    @staticmethod
-    def hash_message(message: str) -> str:
-        """
-        Create a hash of the message for duplicate detection
-        """
-        return hashlib.sha256(message.encode()).hexdigest()
+    statistics = {
+        "duplicates_blocked": duplicates_blocked,
+        "sms_transactions_processed": sms_transactions,
+        "duplicate_rate": duplicates_blocked / max(sms_transactions + duplicates_blocked, 1),
+        "common_duplicate_reasons": duplicate_reasons
+    }
+    _statistics_cache.set((user_id, days), statistics)
+
+    return {**statistics, "lookup_cache": lookup_cache_info()}
+
+
+# Empty SHA-256 state; copying it is cheaper than constructing a new hasher
+_SHA256_PROTOTYPE = hashlib.sha256()
+
+
+@lru_cache(maxsize=4096)
+def hash_message(message: str) -> str:
+    """
+    Create a hash of the message for duplicate detection
+
+    Results are memoized since re-sent SMS bodies hash identically.
+    Must stay SHA-256: stored message hashes are compared against it.
+    """
+    hasher = _SHA256_PROTOTYPE.copy()
+    hasher.update(message.encode())
+    return hasher.hexdigest()
+
+
+class DuplicateDetector:
+    """
+    Service to detect and prevent duplicate M-Pesa transactions from SMS parsing
+    Migrated to use PesaDBService instead of MongoDB
+
+    Thin facade over the module-level functions, kept for existing callers.
+    """
+
+    is_duplicate_by_hash = staticmethod(is_duplicate_by_hash)
+    is_duplicate_by_transaction_id = staticmethod(is_duplicate_by_transaction_id)
+    load_message_hash_filter = staticmethod(load_message_hash_filter)
+    remember_message_hash = staticmethod(remember_message_hash)
+    clear_lookup_cache = staticmethod(clear_lookup_cache)
+    lookup_cache_info = staticmethod(lookup_cache_info)
+    find_similar_transactions = staticmethod(find_similar_transactions)
+    check_comprehensive_duplicate = staticmethod(check_comprehensive_duplicate)
+    calculate_similarity_score = staticmethod(calculate_similarity_score)
+    log_duplicate_attempt = staticmethod(log_duplicate_attempt)
+    start_log_writer = staticmethod(start_log_writer)
+    stop_log_writer = staticmethod(stop_log_writer)
+    get_duplicate_statistics = staticmethod(get_duplicate_statistics)
+    hash_message = staticmethod(hash_message)
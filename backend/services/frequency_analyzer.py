@@ -1,6 +1,5 @@
 from typing import List, Dict, Optional
 from services.pesadb_service import db_service
-from models.transaction import Transaction
 from models.user import Category
 from datetime import datetime, timedelta
 import re
@@ -23,6 +22,18 @@ class FrequentTransaction:
     confidence_score: float
     suggested_category: Optional[str]
 
+@dataclass(slots=True)
+class PatternTransaction:
+    """The transaction fields pattern analysis reads (lighter than a Transaction model)"""
+    id: str
+    amount: float
+    description: str
+    date: datetime
+    category_id: Optional[str]
+
+# Only these columns are fetched for analysis - the JSON blobs are never read
+_PATTERN_COLUMNS = ['id', 'amount', 'description', 'date', 'category_id']
+
 class TransactionFrequencyAnalyzer:
     """Analyzes transaction patterns to identify frequently occurring transactions"""
     
@@ -48,25 +59,30 @@ class TransactionFrequencyAnalyzer:
         end_date = datetime.now()
         start_date = end_date - timedelta(days=days_back)
         
-        # Get transactions for analysis using PesaDBService
-        transactions_data = await db_service.get_transactions(
-            user_id=user_id,
-            start_date=start_date.isoformat(),
-            end_date=end_date.isoformat(),
-            limit=1000
-        )
-        
-        if not transactions_data:
-            return []
-        
-        # Convert to Transaction objects
+        # Stream transactions for analysis, keeping only the fields used below
         transactions = []
-        for txn_data in transactions_data:
+        async for txn_data in db_service.iter_transactions(
+            user_id=user_id,
+            start_date=start_date,
+            end_date=end_date,
+            limit=1000,
+            columns=_PATTERN_COLUMNS
+        ):
             # Parse date string to datetime
-            if isinstance(txn_data.get('date'), str):
-                txn_data['date'] = datetime.fromisoformat(txn_data['date'].replace('Z', '+00:00'))
+            date = txn_data.get('date')
+            if isinstance(date, str):
+                date = datetime.fromisoformat(date.replace('Z', '+00:00'))
             
-            transactions.append(Transaction(**txn_data))
+            transactions.append(PatternTransaction(
+                id=txn_data['id'],
+                amount=float(txn_data['amount']),
+                description=txn_data.get('description') or '',
+                date=date,
+                category_id=txn_data.get('category_id')
+            ))
+        
+        if not transactions:
+            return []
         
         # Group transactions by similarity patterns
         patterns = self._group_by_similarity(transactions)
@@ -84,7 +100,7 @@ class TransactionFrequencyAnalyzer:
         
         return frequent_patterns
     
-    def _group_by_similarity(self, transactions: List[Transaction]) -> Dict[str, List[Transaction]]:
+    def _group_by_similarity(self, transactions: List[PatternTransaction]) -> Dict[str, List[PatternTransaction]]:
         """Group transactions by similarity patterns"""
         patterns = defaultdict(list)
         
@@ -123,7 +139,7 @@ class TransactionFrequencyAnalyzer:
         
         return desc
     
-    async def _analyze_pattern(self, pattern: str, transactions: List[Transaction]) -> Optional[FrequentTransaction]:
+    async def _analyze_pattern(self, pattern: str, transactions: List[PatternTransaction]) -> Optional[FrequentTransaction]:
         """Analyze a group of similar transactions"""
         if not transactions:
             return None
@@ -182,7 +198,7 @@ class TransactionFrequencyAnalyzer:
             suggested_category=suggested_category
         )
     
-    def _calculate_confidence(self, transactions: List[Transaction], pattern: str) -> float:
+    def _calculate_confidence(self, transactions: List[PatternTransaction], pattern: str) -> float:
         """Calculate confidence score for the pattern"""
         base_score = min(len(transactions) / 10.0, 1.0)  # More transactions = higher confidence
         
@@ -209,7 +225,7 @@ class TransactionFrequencyAnalyzer:
         confidence = (base_score * 0.4 + amount_consistency * 0.3 + date_regularity * 0.3)
         return min(confidence, 1.0)
     
-    async def _suggest_category(self, pattern: str, transactions: List[Transaction]) -> Optional[str]:
+    async def _suggest_category(self, pattern: str, transactions: List[PatternTransaction]) -> Optional[str]:
         """Suggest a category for the transaction pattern"""
         # Get all categories using PesaDBService
         categories_data = await db_service.get_categories(limit=100)
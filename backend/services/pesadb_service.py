@@ -5,20 +5,410 @@ This module provides a service layer for all database operations,
 replacing MongoDB operations with PesaDB SQL queries.
 """
 
-import json
+import asyncio
 import hashlib
-from typing import Any, Dict, List, Optional, Union
+import logging
+import orjson
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Hashable, Iterable, List, Optional, Tuple, Union
 from datetime import datetime, timedelta
-from config.pesadb import query_db, execute_db, escape_string, build_insert, build_update, build_delete
+from config.pesadb import TABLE_MISSING_RE, BatchedInserter, TableNotFoundError, bind_params, query_db, query_db_stream, execute_db, execute_batch, pipeline, build_insert, build_insert_many, build_update, build_delete
+from config.pesadb_where import Where
 from config.pesadb_fallbacks import count_rows_safe, sum_safe, avg_safe, aggregate_safe
+from utils.cache import LRUCache
+
+logger = logging.getLogger(__name__)
 
 
 def is_table_not_found_error(error: Exception) -> bool:
     """Check if an error is related to a missing table"""
-    error_msg = str(error).lower()
-    return (
-        "table" in error_msg and "does not exist" in error_msg
-    ) or "tablenotfound" in error_msg or "no such table" in error_msg
+    if isinstance(error, TableNotFoundError):
+        return True
+    # Errors re-raised as plain exceptions (e.g. by the fallback helpers)
+    return TABLE_MISSING_RE.search(str(error)) is not None
+
+
+def is_column_not_found_error(error: Exception) -> bool:
+    """Check if an error means a selected column doesn't exist"""
+    message = str(error).lower()
+    return 'column' in message and any(
+        phrase in message for phrase in ('not found', 'no such', 'unknown', 'does not exist')
+    )
+
+
+# Dates are stored as ISO-8601 strings and compared as strings. Filters also
+# take datetime values, which bind_params renders in that same format.
+DateParam = Union[str, datetime]
+
+
+# ORDER BY fragments for transaction listings, keyed by (sort_by, sort_order).
+# Identifiers can't be bound as parameters, so only these literals are ever
+# placed in the SQL.
+_ORDER_FRAGMENTS = {
+    (column, direction): f"{column} {direction}"
+    for column in ('date', 'amount', 'created_at', 'description', 'type', 'category_id')
+    for direction in ('ASC', 'DESC')
+}
+
+
+# Columns holding JSON documents, and optional transaction STRING columns
+# stored as 'null' (PesaDB STRING columns don't accept SQL NULL)
+_JSON_FIELDS = ('mpesa_details', 'sms_metadata')
+_CATEGORY_JSON_FIELDS = ('keywords',)
+_IMPORT_LOG_JSON_FIELDS = ('transactions_created', 'errors')
+_NULLABLE_STRING_FIELDS = ('transaction_group_id', 'parent_transaction_id')
+
+
+# Maximum IDs per UPDATE ... WHERE id IN (?) statement
+_UPDATE_BATCH_SIZE = 500
+
+
+# Maximum rows per multi-row INSERT in bulk_create_transactions
+_INSERT_BATCH_SIZE = 500
+
+
+# Values derived from other fields and stored in their own indexed columns:
+# the duplicate-check keys from the JSON columns, and the calendar day of
+# `date`. Databases created before these existed are detected lazily and
+# fall back to LIKE scans / grouping in Python until the initializer adds them.
+_LOOKUP_COLUMNS = ('message_hash', 'mpesa_transaction_id', 'date_day')
+_lookup_columns_available: Optional[bool] = None
+
+
+async def _has_lookup_columns() -> bool:
+    """Check (once per process) whether transactions has the lookup columns"""
+    global _lookup_columns_available
+    if _lookup_columns_available is None:
+        try:
+            await query_db(f"SELECT {', '.join(_LOOKUP_COLUMNS)} FROM transactions LIMIT 1")
+            _lookup_columns_available = True
+        except Exception as e:
+            if not is_column_not_found_error(e):
+                # Unrelated failure (timeout, 5xx) - writing the row without
+                # its lookup columns would hide it from the lookups for good
+                raise
+            _lookup_columns_available = False
+    return _lookup_columns_available
+
+
+# Approximate row counts for dashboard widgets, keyed by (table, filters...).
+# PesaDB exposes no planner statistics to estimate from, so an "estimate" is
+# an exact count up to a minute old. Writes through this service drop the
+# users/categories entries and keep cached transaction counts in step (see
+# _count_new_transactions); anything else just ages out.
+_estimated_counts = LRUCache(maxsize=1024, ttl=60)
+
+
+async def _count(key: tuple, exact: bool, count_func) -> int:
+    """Run count_func, or reuse a recent result for it when exact is False"""
+    if not exact:
+        cached = _estimated_counts.get(key)
+        if cached is not None:
+            return cached
+    count = await count_func()
+    _estimated_counts.set(key, count)
+    return count
+
+
+def _count_new_transactions(transactions: List[Dict[str, Any]]):
+    """Add inserted transactions to the cached per-user and per-category counts"""
+    added: Dict[tuple, int] = {}
+    for txn in transactions:
+        user_id = txn.get('user_id')
+        for key in (('transactions', user_id, None), ('transactions', user_id, txn.get('category_id'))):
+            added[key] = added.get(key, 0) + 1
+    for key, n in added.items():
+        cached = _estimated_counts.get(key)
+        if cached is not None:
+            # Only live entries change, so a count still can't outlast its TTL
+            _estimated_counts.replace(key, cached + n)
+
+
+def _forget_transaction_counts(user_id: Optional[str], category_id: Optional[str] = None):
+    """Drop cached transaction counts a write may have changed"""
+    _estimated_counts.invalidate(('transactions', user_id, None))
+    if category_id:
+        _estimated_counts.invalidate(('transactions', user_id, category_id))
+
+
+def clear_count_estimates():
+    """Drop all cached approximate counts, e.g. after seeding data directly"""
+    _estimated_counts.clear()
+
+
+# Reference data (user rows, the category list) changes rarely but is read
+# on most requests - every authenticated request loads its user. Entries live
+# up to a minute; writes through this service drop them. Callers get copies,
+# so mutating a result can't touch the cache.
+_reference_cache = LRUCache(maxsize=256, ttl=60)
+
+# Bumped on every clear, so a fetch that started before a write doesn't
+# cache what it read
+_reference_generation = 0
+
+# In-flight reference fetches: concurrent cache misses for the same key
+# share one query instead of each sending their own
+_inflight: Dict[Hashable, "asyncio.Future"] = {}
+
+
+# Point lookups (user by ID, category by ID) memoized for one HTTP request,
+# see request_scope. Outside a request scope every lookup is sent.
+_request_memo: ContextVar[Optional[Dict[Hashable, Any]]] = ContextVar('pesadb_request_memo', default=None)
+
+
+@contextmanager
+def request_scope():
+    """Memoize point lookups made inside the block (one HTTP request)"""
+    token = _request_memo.set({})
+    try:
+        yield
+    finally:
+        _request_memo.reset(token)
+
+
+async def _memoized(key: Hashable, fetch: Callable[[], Awaitable[Optional[Dict[str, Any]]]]) -> Optional[Dict[str, Any]]:
+    """Get a row fetched earlier in this request, or fetch it; returns a copy"""
+    memo = _request_memo.get()
+    if memo is None:
+        return await fetch()
+    if key not in memo:
+        memo[key] = await fetch()
+    value = memo[key]
+    return dict(value) if value is not None else None
+
+
+def clear_reference_cache():
+    """Drop cached users and categories, e.g. after seeding data directly"""
+    global _reference_generation
+    _reference_generation += 1
+    _reference_cache.clear()
+    memo = _request_memo.get()
+    if memo:
+        memo.clear()
+
+
+async def _single_flight(key: Hashable, fetch: Callable[[], Awaitable[Any]]) -> Any:
+    """Run fetch() once for all concurrent callers with the same key"""
+    task = _inflight.get(key)
+    if task is None:
+        task = asyncio.ensure_future(fetch())
+        _inflight[key] = task
+        task.add_done_callback(lambda _: _inflight.pop(key, None))
+    # Shielded so one caller being cancelled doesn't cancel the others' query
+    return await asyncio.shield(task)
+
+
+async def _fetch_reference(key: Hashable, fetch: Callable[[], Awaitable[Any]]) -> Any:
+    """Get reference data from the cache, or fetch it (once) and cache it"""
+    cached = _reference_cache.get(key)
+    if cached is not None:
+        return cached
+
+    async def load():
+        generation = _reference_generation
+        value = await fetch()
+        if value is not None and generation == _reference_generation:
+            _reference_cache.set(key, value)
+        return value
+
+    return await _single_flight(key, load)
+
+
+def reset_lookup_column_check():
+    """Forget the cached lookup column check, e.g. after a schema migration"""
+    global _lookup_columns_available
+    _lookup_columns_available = None
+
+
+def _lookup_column_values(mpesa_details: Any, sms_metadata: Any) -> Dict[str, str]:
+    """Extract the lookup column values from unserialized JSON fields"""
+    message_hash = sms_metadata.get('original_message_hash') if isinstance(sms_metadata, dict) else None
+    mpesa_transaction_id = mpesa_details.get('transaction_id') if isinstance(mpesa_details, dict) else None
+    return {
+        'message_hash': message_hash or 'null',
+        'mpesa_transaction_id': mpesa_transaction_id or 'null'
+    }
+
+
+def transaction_date_day(date: Any) -> str:
+    """The YYYY-MM-DD day of a transaction date (datetime or ISO string), for date_day"""
+    if isinstance(date, datetime):
+        return date.date().isoformat()
+    if isinstance(date, str) and len(date) >= 10:
+        return date[:10]
+    return 'null'
+
+
+# Grouped (type, category_id) totals per user and date range. Dashboard and
+# budget views ask for several slices of the same range, so they share one
+# query. Entries live briefly and every transaction write through this
+# service drops them all.
+_totals_cache = LRUCache(maxsize=256, ttl=30)
+
+# Bumped on every clear, as for _reference_generation
+_totals_generation = 0
+
+
+def clear_totals_cache():
+    """Drop cached spending totals, e.g. after writing transactions directly"""
+    global _totals_generation
+    _totals_generation += 1
+    _totals_cache.clear()
+
+
+# Status checks arrive in bursts from monitors; concurrent ones are written
+# with one INSERT while the writer runs (see start_write_batching)
+_status_check_writer = BatchedInserter('status_checks')
+
+
+def start_write_batching():
+    """Start batching status check inserts (call from application startup)"""
+    _status_check_writer.start()
+
+
+async def stop_write_batching():
+    """Write queued status checks and stop batching (call before closing the client)"""
+    await _status_check_writer.stop()
+
+
+def _copy_category(category: Dict[str, Any]) -> Dict[str, Any]:
+    """Copy a cached category, including its keywords list, for a caller to mutate"""
+    copy = dict(category)
+    if isinstance(copy.get('keywords'), list):
+        copy['keywords'] = list(copy['keywords'])
+    return copy
+
+
+def _transaction_filters(
+    user_id: str,
+    category_id: Optional[str],
+    transaction_type: Optional[str],
+    start_date: Optional[DateParam],
+    end_date: Optional[DateParam],
+    sort_by: str,
+    sort_order: str
+) -> Tuple[str, str, List[Any]]:
+    """Build the WHERE clause, ORDER BY fragment and params for a transaction listing"""
+    order_sql = _ORDER_FRAGMENTS.get((sort_by, sort_order.upper()))
+    if order_sql is None:
+        raise ValueError(f"Invalid sort: {sort_by} {sort_order}")
+
+    where_clause, params = (
+        Where()
+        .eq('user_id', user_id)
+        .eq('category_id', category_id, optional=True)
+        .eq('type', transaction_type, optional=True)
+        .gte('date', start_date, optional=True)
+        .lte('date', end_date, optional=True)
+        .build()
+    )
+    return where_clause, order_sql, params
+
+
+def _select_list(columns: Optional[List[str]], referenced: Iterable[Optional[str]]) -> str:
+    """
+    Build the select list for a query that only needs some columns
+
+    PesaDB fails with "Column '<name>' not found in row" when a WHERE or
+    ORDER BY column is not also selected (see count_rows_safe), so every
+    referenced column is added to the requested ones.
+
+    Args:
+        columns: Columns the caller reads (None or empty for all)
+        referenced: Columns used in WHERE / ORDER BY; None entries are skipped
+    """
+    if not columns:
+        return '*'
+    selected = list(columns)
+    for column in referenced:
+        if column and column not in selected:
+            selected.append(column)
+    return ', '.join(selected)
+
+
+def _parse_json_columns(row: Dict[str, Any], fields: Tuple[str, ...]) -> Dict[str, Any]:
+    """Parse the given JSON STRING columns of a row in place"""
+    for field in fields:
+        value = row.get(field)
+        # Values that are already parsed (dicts, lists) are left as they are
+        if value and isinstance(value, (str, bytes)):
+            # Handle 'null' string or valid JSON
+            row[field] = None if value == 'null' else orjson.loads(value)
+    return row
+
+
+def _parse_json_fields(row: Dict[str, Any]) -> Dict[str, Any]:
+    """Parse a transaction row's JSON columns and 'null' strings in place"""
+    _parse_json_columns(row, _JSON_FIELDS)
+    for field in _NULLABLE_STRING_FIELDS:
+        if row.get(field) == 'null':
+            row[field] = None
+    return row
+
+
+def _dump_json(value: Any) -> str:
+    """
+    Serialize a value for a JSON STRING column
+
+    Strings are assumed to be serialized already and pass through as-is.
+    orjson writes compact JSON ("key":"value"), unlike the stdlib's
+    "key": "value" in rows stored before it was used.
+    """
+    if isinstance(value, str):
+        return value
+    return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS).decode()
+
+
+def _coerce_json_columns(data: Dict[str, Any], columns: Tuple[str, ...], drop_empty: bool = False):
+    """
+    Serialize JSON columns of a row in place
+
+    Args:
+        data: Row being written
+        columns: JSON column names
+        drop_empty: Remove empty columns that are present (for UPDATE)
+            instead of storing 'null' for empty or missing ones (for INSERT)
+    """
+    for column in columns:
+        value = data.get(column)
+        if value:
+            data[column] = _dump_json(value)
+        elif not drop_empty:
+            data[column] = 'null'
+        elif column in data:
+            del data[column]
+
+
+async def _prepare_transaction(transaction_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Fill defaults and serialize a new transaction's columns in place for INSERT"""
+    # Ensure all required columns exist with proper defaults
+    # PesaDB requires ALL columns to be present in INSERT statements
+    # IMPORTANT: PesaDB STRING columns don't accept NULL - use 'null' (JSON null) instead
+
+    if await _has_lookup_columns():
+        transaction_data.update(_lookup_column_values(
+            transaction_data.get('mpesa_details'),
+            transaction_data.get('sms_metadata')
+        ))
+        transaction_data['date_day'] = transaction_date_day(transaction_data.get('date'))
+
+    # Nested objects become JSON strings; empty or missing ones become JSON
+    # null, since PesaDB STRING columns don't accept SQL NULL
+    _coerce_json_columns(transaction_data, _JSON_FIELDS)
+
+    # Handle optional STRING columns - must use 'null' instead of None/NULL
+    if 'transaction_group_id' not in transaction_data or transaction_data.get('transaction_group_id') is None:
+        transaction_data['transaction_group_id'] = 'null'
+
+    if 'parent_transaction_id' not in transaction_data or transaction_data.get('parent_transaction_id') is None:
+        transaction_data['parent_transaction_id'] = 'null'
+
+    # Ensure transaction_role has a default value
+    if 'transaction_role' not in transaction_data or not transaction_data.get('transaction_role'):
+        transaction_data['transaction_role'] = 'primary'
+
+    return transaction_data
 
 
 class PesaDBService:
@@ -27,11 +417,16 @@ class PesaDBService:
     # ==================== USER OPERATIONS ====================
     
     @staticmethod
-    async def get_user_count() -> int:
-        """Get total number of users"""
+    async def get_user_count(exact: bool = True) -> int:
+        """
+        Get total number of users
+
+        Args:
+            exact: False to accept a count up to a minute old
+        """
         try:
             # Use safe count with automatic fallback
-            return await count_rows_safe('users', query_func=query_db)
+            return await _count(('users',), exact, lambda: count_rows_safe('users', query_func=query_db))
         except Exception as e:
             if is_table_not_found_error(e):
                 return 0
@@ -40,9 +435,13 @@ class PesaDBService:
     @staticmethod
     async def get_user() -> Optional[Dict[str, Any]]:
         """Get the first user (single-user app)"""
-        try:
+        async def fetch():
             result = await query_db("SELECT * FROM users LIMIT 1")
             return result[0] if result else None
+
+        try:
+            user = await _fetch_reference('user', fetch)
+            return dict(user) if user is not None else None
         except Exception as e:
             if is_table_not_found_error(e):
                 # Table doesn't exist yet - return None
@@ -62,10 +461,17 @@ class PesaDBService:
 
     @staticmethod
     async def get_user_by_id(user_id: str) -> Optional[Dict[str, Any]]:
-        """Get user by ID"""
-        try:
-            result = await query_db(f"SELECT * FROM users WHERE id = '{user_id}' LIMIT 1")
+        """Get user by ID (cached as reference data, memoized for the current request)"""
+        async def fetch():
+            result = await query_db("SELECT * FROM users WHERE id = ? LIMIT 1", params=[user_id])
             return result[0] if result else None
+
+        async def cached():
+            user = await _fetch_reference(('user', user_id), fetch)
+            return dict(user) if user is not None else None
+
+        try:
+            return await _memoized(('user', user_id), cached)
         except Exception as e:
             if is_table_not_found_error(e):
                 return None
@@ -82,10 +488,9 @@ class PesaDBService:
         try:
             # Normalize email to lowercase (emails are stored lowercase)
             normalized_email = email.lower()
-            email_escaped = escape_string(normalized_email)
 
             # Simple equality check (no LOWER function needed since stored lowercase)
-            result = await query_db(f"SELECT * FROM users WHERE email = {email_escaped} LIMIT 1")
+            result = await query_db("SELECT * FROM users WHERE email = ? LIMIT 1", params=[normalized_email])
             return result[0] if result else None
         except Exception as e:
             if is_table_not_found_error(e):
@@ -97,13 +502,16 @@ class PesaDBService:
         """Create a new user"""
         sql = build_insert('users', user_data)
         await execute_db(sql)
+        _estimated_counts.invalidate(('users',))
+        clear_reference_cache()
         return user_data
     
     @staticmethod
     async def update_user_password(user_id: str, new_password_hash: str) -> bool:
         """Update user's password hash"""
-        sql = build_update('users', {'password_hash': new_password_hash}, f"id = '{user_id}'")
+        sql = build_update('users', {'password_hash': new_password_hash}, "id = ?", [user_id])
         await execute_db(sql)
+        clear_reference_cache()
         return True
     
     # ==================== CATEGORY OPERATIONS ====================
@@ -111,47 +519,67 @@ class PesaDBService:
     @staticmethod
     async def get_categories(limit: int = 100) -> List[Dict[str, Any]]:
         """Get all categories"""
-        result = await query_db(f"SELECT * FROM categories LIMIT {limit}")
-        # Parse JSON fields
-        for cat in result:
-            if 'keywords' in cat and isinstance(cat['keywords'], str):
-                cat['keywords'] = json.loads(cat['keywords'])
-        return result
+        async def fetch():
+            # ORDER BY so the LIMIT picks a stable set of rows
+            result = await query_db("SELECT * FROM categories ORDER BY name, id LIMIT ?", params=[int(limit)])
+            for cat in result:
+                _parse_json_columns(cat, _CATEGORY_JSON_FIELDS)
+            return result
+
+        result = await _fetch_reference(('categories', int(limit)), fetch)
+        return [_copy_category(cat) for cat in result]
     
     @staticmethod
     async def get_category_by_id(category_id: str) -> Optional[Dict[str, Any]]:
         """Get a category by ID"""
-        result = await query_db(f"SELECT * FROM categories WHERE id = '{category_id}' LIMIT 1")
-        if result:
-            cat = result[0]
-            if 'keywords' in cat and isinstance(cat['keywords'], str):
-                cat['keywords'] = json.loads(cat['keywords'])
-            return cat
-        return None
+        # Served from the cached category list when it's loaded
+        categories = _reference_cache.get(('categories', 100))
+        if categories is not None:
+            for cat in categories:
+                if cat.get('id') == category_id:
+                    return _copy_category(cat)
+
+        async def fetch():
+            result = await query_db("SELECT * FROM categories WHERE id = ? LIMIT 1", params=[category_id])
+            if not result:
+                return None
+            return _parse_json_columns(result[0], _CATEGORY_JSON_FIELDS)
+
+        # Otherwise fetched once per request
+        return await _memoized(('category', category_id), fetch)
     
     @staticmethod
     async def create_category(category_data: Dict[str, Any]) -> Dict[str, Any]:
         """Create a new category"""
         # Ensure keywords is JSON string
         if 'keywords' in category_data and isinstance(category_data['keywords'], list):
-            category_data['keywords'] = json.dumps(category_data['keywords'])
+            category_data['keywords'] = _dump_json(category_data['keywords'])
         
         sql = build_insert('categories', category_data)
         await execute_db(sql)
+        _estimated_counts.invalidate(('categories',))
+        clear_reference_cache()
         return category_data
     
     @staticmethod
     async def delete_category(category_id: str) -> bool:
         """Delete a category"""
-        sql = build_delete('categories', f"id = '{category_id}'")
+        sql = build_delete('categories', "id = ?", [category_id])
         await execute_db(sql)
+        _estimated_counts.invalidate(('categories',))
+        clear_reference_cache()
         return True
     
     @staticmethod
-    async def count_categories() -> int:
-        """Count total categories"""
+    async def count_categories(exact: bool = True) -> int:
+        """
+        Count total categories
+
+        Args:
+            exact: False to accept a count up to a minute old
+        """
         try:
-            return await count_rows_safe('categories', query_func=query_db)
+            return await _count(('categories',), exact, lambda: count_rows_safe('categories', query_func=query_db))
         except Exception as e:
             if is_table_not_found_error(e):
                 return 0
@@ -166,284 +594,399 @@ class PesaDBService:
         skip: int = 0,
         category_id: Optional[str] = None,
         transaction_type: Optional[str] = None,
-        start_date: Optional[str] = None,
-        end_date: Optional[str] = None,
+        start_date: Optional[DateParam] = None,
+        end_date: Optional[DateParam] = None,
         sort_by: str = 'date',
-        sort_order: str = 'DESC'
+        sort_order: str = 'DESC',
+        after: Optional[Tuple[Any, str]] = None
     ) -> List[Dict[str, Any]]:
-        """Get transactions with filters"""
-        
-        where_clauses = [f"user_id = '{user_id}'"]
-        
-        if category_id:
-            where_clauses.append(f"category_id = '{category_id}'")
-        
-        if transaction_type:
-            where_clauses.append(f"type = '{transaction_type}'")
-        
-        if start_date:
-            where_clauses.append(f"date >= '{start_date}'")
-        
-        if end_date:
-            where_clauses.append(f"date <= '{end_date}'")
-        
-        where_clause = ' AND '.join(where_clauses)
-        
+        """
+        Get transactions with filters
+
+        Rows are ordered by sort_by, then id, so every row has a stable
+        position. Pass the (sort_by value, id) of the last row of a page as
+        `after` to get the next page: the query seeks past it instead of
+        having the database scan and discard `skip` rows, so deep pages cost
+        the same as the first. `skip` is ignored when `after` is given.
+        """
+        # Date-ordered pages seek on idx_transactions_user_date, or
+        # idx_transactions_user_category_date with a category filter
+        where_clause, order_sql, params = _transaction_filters(
+            user_id, category_id, transaction_type, start_date, end_date, sort_by, sort_order
+        )
+        direction = sort_order.upper()
+
+        if after is not None:
+            cmp = '<' if direction == 'DESC' else '>'
+            where_clause += f" AND ({sort_by} {cmp} ? OR ({sort_by} = ? AND id {cmp} ?))"
+            params.extend([after[0], after[0], after[1], int(limit)])
+            page_sql = "LIMIT ?"
+        else:
+            params.extend([int(limit), int(skip)])
+            page_sql = "LIMIT ? OFFSET ?"
+
         sql = f"""
         SELECT * FROM transactions
         WHERE {where_clause}
-        ORDER BY {sort_by} {sort_order}
-        LIMIT {limit} OFFSET {skip}
+        ORDER BY {order_sql}, id {direction}
+        {page_sql}
         """
-        
-        result = await query_db(sql)
 
-        # Parse JSON fields and 'null' strings
+        result = await query_db(sql, params=params)
         for txn in result:
-            if 'mpesa_details' in txn and txn['mpesa_details'] and isinstance(txn['mpesa_details'], str):
-                # Handle 'null' string or valid JSON
-                if txn['mpesa_details'] == 'null':
-                    txn['mpesa_details'] = None
-                else:
-                    txn['mpesa_details'] = json.loads(txn['mpesa_details'])
-            if 'sms_metadata' in txn and txn['sms_metadata'] and isinstance(txn['sms_metadata'], str):
-                # Handle 'null' string or valid JSON
-                if txn['sms_metadata'] == 'null':
-                    txn['sms_metadata'] = None
-                else:
-                    txn['sms_metadata'] = json.loads(txn['sms_metadata'])
-            # Handle optional STRING fields
-            if txn.get('transaction_group_id') == 'null':
-                txn['transaction_group_id'] = None
-            if txn.get('parent_transaction_id') == 'null':
-                txn['parent_transaction_id'] = None
-
+            _parse_json_fields(txn)
         return result
+
+    @staticmethod
+    async def iter_transactions(
+        user_id: str,
+        limit: Optional[int] = None,
+        category_id: Optional[str] = None,
+        transaction_type: Optional[str] = None,
+        start_date: Optional[DateParam] = None,
+        end_date: Optional[DateParam] = None,
+        sort_by: str = 'date',
+        sort_order: str = 'DESC',
+        columns: Optional[List[str]] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Stream transactions matching the filters, one page in memory at a time
+
+        Args:
+            user_id: Owner of the transactions
+            limit: Maximum rows to yield (None for all)
+            category_id, transaction_type, start_date, end_date: Optional filters
+            sort_by, sort_order: Ordering, as for get_transactions
+            columns: Columns to select (default: all). Leaving out
+                mpesa_details/sms_metadata skips transferring and parsing
+                the JSON blobs for scans that never read them. Filter and
+                sort columns are added as needed (see _select_list).
+
+        Yields:
+            Parsed transaction rows
+        """
+        where_clause, order_sql, params = _transaction_filters(
+            user_id, category_id, transaction_type, start_date, end_date, sort_by, sort_order
+        )
+        select_list = _select_list(columns, [
+            'user_id',
+            category_id is not None and 'category_id',
+            transaction_type is not None and 'type',
+            (start_date is not None or end_date is not None) and 'date',
+            sort_by,
+            'id'
+        ])
+        sql = f"""
+        SELECT {select_list} FROM transactions
+        WHERE {where_clause}
+        ORDER BY {order_sql}, id ASC
+        """
+
+        async for txn in query_db_stream(sql, params=params, limit=limit):
+            yield _parse_json_fields(txn)
     
     @staticmethod
     async def get_transaction_by_id(transaction_id: str, user_id: Optional[str] = None) -> Optional[Dict[str, Any]]:
         """Get a single transaction by ID"""
-        where_clause = f"id = '{transaction_id}'"
-        if user_id:
-            where_clause += f" AND user_id = '{user_id}'"
+        where_clause, params = Where().eq('id', transaction_id).eq('user_id', user_id, optional=True).build()
         
-        result = await query_db(f"SELECT * FROM transactions WHERE {where_clause} LIMIT 1")
+        result = await query_db(f"SELECT * FROM transactions WHERE {where_clause} LIMIT 1", params=params)
         
         if result:
-            txn = result[0]
-            if 'mpesa_details' in txn and txn['mpesa_details'] and isinstance(txn['mpesa_details'], str):
-                # Handle 'null' string or valid JSON
-                if txn['mpesa_details'] == 'null':
-                    txn['mpesa_details'] = None
-                else:
-                    txn['mpesa_details'] = json.loads(txn['mpesa_details'])
-            if 'sms_metadata' in txn and txn['sms_metadata'] and isinstance(txn['sms_metadata'], str):
-                # Handle 'null' string or valid JSON
-                if txn['sms_metadata'] == 'null':
-                    txn['sms_metadata'] = None
-                else:
-                    txn['sms_metadata'] = json.loads(txn['sms_metadata'])
-            # Handle optional STRING fields
-            if txn.get('transaction_group_id') == 'null':
-                txn['transaction_group_id'] = None
-            if txn.get('parent_transaction_id') == 'null':
-                txn['parent_transaction_id'] = None
-            return txn
+            return _parse_json_fields(result[0])
         return None
     
     @staticmethod
     async def create_transaction(transaction_data: Dict[str, Any]) -> Dict[str, Any]:
         """Create a new transaction"""
-        # Ensure all required columns exist with proper defaults
-        # PesaDB requires ALL columns to be present in INSERT statements
-        # IMPORTANT: PesaDB STRING columns don't accept NULL - use 'null' (JSON null) instead
-
-        # Convert nested objects to JSON strings or set to 'null' for empty values
-        if 'mpesa_details' in transaction_data:
-            if transaction_data['mpesa_details']:
-                transaction_data['mpesa_details'] = json.dumps(transaction_data['mpesa_details'])
-            else:
-                # Use JSON null value as string (PesaDB STRING columns don't accept SQL NULL)
-                transaction_data['mpesa_details'] = 'null'
-        else:
-            # If not provided, use JSON null value as string
-            transaction_data['mpesa_details'] = 'null'
-
-        if 'sms_metadata' in transaction_data:
-            if transaction_data['sms_metadata']:
-                transaction_data['sms_metadata'] = json.dumps(transaction_data['sms_metadata'])
-            else:
-                # Use JSON null value as string (PesaDB STRING columns don't accept SQL NULL)
-                transaction_data['sms_metadata'] = 'null'
-        else:
-            # If not provided, use JSON null value as string
-            transaction_data['sms_metadata'] = 'null'
+        await _prepare_transaction(transaction_data)
+        sql = build_insert('transactions', transaction_data)
+        await execute_db(sql)
+        clear_totals_cache()
+        _count_new_transactions([transaction_data])
+        return transaction_data
 
-        # Handle optional STRING columns - must use 'null' instead of None/NULL
-        if 'transaction_group_id' not in transaction_data or transaction_data.get('transaction_group_id') is None:
-            transaction_data['transaction_group_id'] = 'null'
+    @staticmethod
+    async def bulk_create_transactions(transactions: List[Dict[str, Any]]) -> int:
+        """
+        Insert many transactions for a bulk import with as few statements as possible
 
-        if 'parent_transaction_id' not in transaction_data or transaction_data.get('parent_transaction_id') is None:
-            transaction_data['parent_transaction_id'] = 'null'
+        Rows are written with multi-row INSERTs of up to _INSERT_BATCH_SIZE
+        rows. If PesaDB rejects one, that chunk falls back to pipelined
+        single-row INSERTs. There is no enclosing transaction: a failure
+        part way can leave earlier chunks stored.
 
-        # Ensure transaction_role has a default value
-        if 'transaction_role' not in transaction_data or not transaction_data.get('transaction_role'):
-            transaction_data['transaction_role'] = 'primary'
+        Args:
+            transactions: Transaction dicts, prepared in place as for create_transaction
+
+        Returns:
+            Number of transactions inserted
+        """
+        # Multi-row INSERTs need one column list, so group rows by their columns
+        by_columns: Dict[Tuple[str, ...], List[Dict[str, Any]]] = {}
+        for transaction_data in transactions:
+            await _prepare_transaction(transaction_data)
+            by_columns.setdefault(tuple(transaction_data), []).append(transaction_data)
+
+        try:
+            for rows in by_columns.values():
+                for start in range(0, len(rows), _INSERT_BATCH_SIZE):
+                    chunk = rows[start:start + _INSERT_BATCH_SIZE]
+                    try:
+                        await execute_db(build_insert_many('transactions', chunk))
+                    except Exception:
+                        async with pipeline() as batch:
+                            for transaction_data in chunk:
+                                batch.execute(build_insert('transactions', transaction_data))
+                    _count_new_transactions(chunk)
+        except Exception:
+            # A chunk may be partly stored - recount these users next time
+            for transaction_data in transactions:
+                _forget_transaction_counts(transaction_data.get('user_id'), transaction_data.get('category_id'))
+            raise
+        finally:
+            # Earlier chunks may be stored even if a later one failed
+            clear_totals_cache()
+        return len(transactions)
 
-        sql = build_insert('transactions', transaction_data)
-        await execute_db(sql)
-        return transaction_data
-    
     @staticmethod
     async def update_transaction(transaction_id: str, update_data: Dict[str, Any], user_id: Optional[str] = None) -> bool:
         """Update a transaction"""
-        # Convert nested objects to JSON strings or remove None values
-        if 'mpesa_details' in update_data:
-            if update_data['mpesa_details']:
-                update_data['mpesa_details'] = json.dumps(update_data['mpesa_details'])
-            else:
-                # Remove None/null values - PesaDB doesn't handle None well for JSON columns
-                del update_data['mpesa_details']
-
-        if 'sms_metadata' in update_data:
-            if update_data['sms_metadata']:
-                update_data['sms_metadata'] = json.dumps(update_data['sms_metadata'])
-            else:
-                # Remove None/null values - PesaDB doesn't handle None well for JSON columns
-                del update_data['sms_metadata']
-
-        where_clause = f"id = '{transaction_id}'"
-        if user_id:
-            where_clause += f" AND user_id = '{user_id}'"
-
-        sql = build_update('transactions', update_data, where_clause)
+        # Keep the lookup columns in step with the JSON fields they mirror
+        if update_data.get('mpesa_details') and await _has_lookup_columns():
+            update_data['mpesa_transaction_id'] = _lookup_column_values(update_data['mpesa_details'], None)['mpesa_transaction_id']
+        if update_data.get('sms_metadata') and await _has_lookup_columns():
+            update_data['message_hash'] = _lookup_column_values(None, update_data['sms_metadata'])['message_hash']
+        if update_data.get('date') and await _has_lookup_columns():
+            update_data['date_day'] = transaction_date_day(update_data['date'])
+
+        # Nested objects become JSON strings; empty ones are left unchanged
+        # rather than written, as PesaDB doesn't handle None for JSON columns
+        _coerce_json_columns(update_data, _JSON_FIELDS, drop_empty=True)
+
+        where_clause, params = Where().eq('id', transaction_id).eq('user_id', user_id, optional=True).build()
+
+        sql = build_update('transactions', update_data, where_clause, params)
         await execute_db(sql)
+        clear_totals_cache()
+        if update_data.get('category_id'):
+            _forget_transaction_counts(user_id, update_data['category_id'])
         return True
     
     @staticmethod
     async def delete_transaction(transaction_id: str, user_id: Optional[str] = None) -> bool:
         """Delete a transaction"""
-        where_clause = f"id = '{transaction_id}'"
-        if user_id:
-            where_clause += f" AND user_id = '{user_id}'"
+        where_clause, params = Where().eq('id', transaction_id).eq('user_id', user_id, optional=True).build()
         
-        sql = build_delete('transactions', where_clause)
+        sql = build_delete('transactions', where_clause, params)
         await execute_db(sql)
+        clear_totals_cache()
+        _forget_transaction_counts(user_id)
         return True
     
     @staticmethod
-    async def count_transactions(user_id: str, category_id: Optional[str] = None) -> int:
-        """Count transactions"""
-        where_clause = f"user_id = '{user_id}'"
-        if category_id:
-            where_clause += f" AND category_id = '{category_id}'"
+    async def count_transactions(user_id: str, category_id: Optional[str] = None, exact: bool = True) -> int:
+        """
+        Count transactions
+
+        Args:
+            user_id: Owner of the transactions
+            category_id: Optional category filter
+            exact: False to accept a count up to a minute old
+        """
+        where_clause, params = Where().eq('user_id', user_id).eq('category_id', category_id, optional=True).build()
 
         try:
-            return await count_rows_safe('transactions', where_clause, query_func=query_db)
+            return await _count(
+                ('transactions', user_id, category_id),
+                exact,
+                lambda: count_rows_safe('transactions', where_clause, query_func=query_db, params=params)
+            )
         except Exception as e:
             if is_table_not_found_error(e):
                 return 0
             raise
     
     @staticmethod
-    async def get_transaction_by_message_hash(message_hash: str) -> Optional[Dict[str, Any]]:
-        """Find transaction by SMS message hash (for duplicate detection)"""
-        # Note: This requires JSON querying which may vary by SQL dialect
-        # For PesaDB, we'll use a simple LIKE query
-        result = await query_db(f"""
-        SELECT * FROM transactions
-        WHERE sms_metadata LIKE '%"original_message_hash": "{message_hash}"%'
-        LIMIT 1
-        """)
+    async def count_transactions_by_category(user_id: str, category_ids: List[str]) -> Dict[str, int]:
+        """
+        Count transactions for several categories with one grouped query
+
+        Returns:
+            Dict of category_id -> transaction count (0 for categories with none)
+        """
+        counts = {category_id: 0 for category_id in category_ids}
+        if not category_ids:
+            return counts
+
+        try:
+            rows = await aggregate_safe(
+                'transactions',
+                [('COUNT', '*')],
+                where="user_id = ? AND category_id IN (?)",
+                group_by='category_id',
+                query_func=query_db,
+                params=[user_id, tuple(category_ids)]
+            )
+        except Exception as e:
+            if is_table_not_found_error(e):
+                return counts
+            raise
+
+        for row in rows:
+            if row.get('category_id') in counts:
+                counts[row['category_id']] = int(row.get('count_all') or 0)
+        return counts
+    
+    @staticmethod
+    async def get_transaction_by_message_hash(
+        message_hash: str,
+        columns: Optional[List[str]] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Find transaction by SMS message hash (for duplicate detection)
+
+        Args:
+            columns: Columns to select (default: all). Existence checks only
+                need the id, which skips transferring the JSON blobs; the
+                filtered column is always selected too (see _select_list).
+        """
+        if await _has_lookup_columns():
+            result = await query_db(f"""
+            SELECT {_select_list(columns, ['message_hash'])} FROM transactions
+            WHERE message_hash = ?
+            LIMIT 1
+            """, params=[message_hash])
+        else:
+            # Older schema without the lookup column - scan the JSON text
+            # (with or without a space after the colon, see _dump_json)
+            result = await query_db(f"""
+            SELECT {_select_list(columns, ['sms_metadata'])} FROM transactions
+            WHERE sms_metadata LIKE ?
+            LIMIT 1
+            """, params=[f'%"original_message_hash":%"{message_hash}"%'])
         
         if result:
-            txn = result[0]
-            if 'sms_metadata' in txn and txn['sms_metadata'] and isinstance(txn['sms_metadata'], str):
-                # Handle 'null' string or valid JSON
-                if txn['sms_metadata'] == 'null':
-                    txn['sms_metadata'] = None
-                else:
-                    txn['sms_metadata'] = json.loads(txn['sms_metadata'])
-            return txn
+            return _parse_json_fields(result[0])
         return None
     
     @staticmethod
-    async def get_transaction_by_mpesa_id(mpesa_transaction_id: str) -> Optional[Dict[str, Any]]:
-        """Find transaction by M-Pesa transaction ID"""
-        result = await query_db(f"""
-        SELECT * FROM transactions
-        WHERE mpesa_details LIKE '%"transaction_id": "{mpesa_transaction_id}"%'
-        LIMIT 1
+    async def get_message_hashes() -> List[str]:
+        """Get the SMS message hash of every stored transaction that has one"""
+        if await _has_lookup_columns():
+            result = await query_db("SELECT message_hash FROM transactions WHERE message_hash != 'null'")
+            return [row['message_hash'] for row in result if row.get('message_hash')]
+
+        result = await query_db("""
+        SELECT sms_metadata FROM transactions
+        WHERE sms_metadata LIKE '%"original_message_hash":%'
         """)
+
+        hashes = []
+        for row in result:
+            metadata = row.get('sms_metadata')
+            if not metadata or not isinstance(metadata, str) or metadata == 'null':
+                continue
+            try:
+                message_hash = orjson.loads(metadata).get('original_message_hash')
+            except (ValueError, AttributeError):
+                continue
+            if message_hash:
+                hashes.append(message_hash)
+        return hashes
+    
+    @staticmethod
+    async def get_transaction_by_mpesa_id(
+        mpesa_transaction_id: str,
+        columns: Optional[List[str]] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Find transaction by M-Pesa transaction ID
+
+        Args:
+            columns: Columns to select (default: all), as for
+                get_transaction_by_message_hash
+        """
+        if await _has_lookup_columns():
+            result = await query_db(f"""
+            SELECT {_select_list(columns, ['mpesa_transaction_id'])} FROM transactions
+            WHERE mpesa_transaction_id = ?
+            LIMIT 1
+            """, params=[mpesa_transaction_id])
+        else:
+            # Older schema without the lookup column - scan the JSON text
+            # (with or without a space after the colon, see _dump_json)
+            result = await query_db(f"""
+            SELECT {_select_list(columns, ['mpesa_details'])} FROM transactions
+            WHERE mpesa_details LIKE ?
+            LIMIT 1
+            """, params=[f'%"transaction_id":%"{mpesa_transaction_id}"%'])
         
         if result:
-            txn = result[0]
-            if 'mpesa_details' in txn and txn['mpesa_details'] and isinstance(txn['mpesa_details'], str):
-                # Handle 'null' string or valid JSON
-                if txn['mpesa_details'] == 'null':
-                    txn['mpesa_details'] = None
-                else:
-                    txn['mpesa_details'] = json.loads(txn['mpesa_details'])
-            return txn
+            return _parse_json_fields(result[0])
         return None
     
     @staticmethod
     async def get_similar_transactions(
         user_id: str,
         amount: float,
-        cutoff_time: str,
-        limit: int = 50
+        cutoff_time: DateParam,
+        limit: int = 50,
+        columns: Optional[List[str]] = None
     ) -> List[Dict[str, Any]]:
-        """Find similar transactions (for duplicate detection)"""
+        """
+        Find similar transactions (for duplicate detection)
+
+        Args:
+            columns: Columns to select (default: all). Duplicate checks only
+                need a few, and skipping the JSON blobs shrinks each row.
+                The filter columns are always selected too (see _select_list).
+        """
         amount_min = amount - 1
         amount_max = amount + 1
+        select_list = _select_list(columns, ['user_id', 'created_at', 'amount'])
 
+        # Range scan on idx_transactions_user_created_amount, already in
+        # created_at order
         result = await query_db(f"""
-        SELECT * FROM transactions
-        WHERE user_id = '{user_id}'
-          AND amount BETWEEN {amount_min} AND {amount_max}
-          AND created_at >= '{cutoff_time}'
-        LIMIT {limit}
-        """)
+        SELECT {select_list} FROM transactions
+        WHERE user_id = ?
+          AND created_at >= ?
+          AND amount BETWEEN ? AND ?
+        ORDER BY created_at DESC
+        LIMIT ?
+        """, params=[user_id, cutoff_time, amount_min, amount_max, int(limit)])
         
-        # Parse JSON fields and 'null' strings
         for txn in result:
-            if 'mpesa_details' in txn and txn['mpesa_details'] and isinstance(txn['mpesa_details'], str):
-                # Handle 'null' string or valid JSON
-                if txn['mpesa_details'] == 'null':
-                    txn['mpesa_details'] = None
-                else:
-                    txn['mpesa_details'] = json.loads(txn['mpesa_details'])
-            if 'sms_metadata' in txn and txn['sms_metadata'] and isinstance(txn['sms_metadata'], str):
-                # Handle 'null' string or valid JSON
-                if txn['sms_metadata'] == 'null':
-                    txn['sms_metadata'] = None
-                else:
-                    txn['sms_metadata'] = json.loads(txn['sms_metadata'])
-            # Handle optional STRING fields
-            if txn.get('transaction_group_id') == 'null':
-                txn['transaction_group_id'] = None
-            if txn.get('parent_transaction_id') == 'null':
-                txn['parent_transaction_id'] = None
+            _parse_json_fields(txn)
 
         return result
     
     @staticmethod
     async def update_many_transactions(transaction_ids: List[str], update_data: Dict[str, Any], user_id: str) -> bool:
-        """Update multiple transactions"""
+        """
+        Update multiple transactions
+
+        IDs are split into chunks of _UPDATE_BATCH_SIZE so each UPDATE keeps a
+        bounded IN list; the chunk statements are sent together.
+        """
         if not transaction_ids:
             return True
         
-        # Convert nested objects to JSON strings
+        # Convert nested objects to JSON strings (once, shared by every chunk)
         if 'sms_metadata' in update_data and update_data['sms_metadata']:
-            update_data['sms_metadata'] = json.dumps(update_data['sms_metadata'])
+            update_data['sms_metadata'] = _dump_json(update_data['sms_metadata'])
         
-        # Build update for multiple IDs
-        ids_str = "', '".join(transaction_ids)
-        where_clause = f"id IN ('{ids_str}') AND user_id = '{user_id}'"
+        # The SET clause is rendered once; each chunk only binds its IDs
+        template = build_update('transactions', update_data, "id IN (?) AND user_id = ?")
+        statements = [
+            bind_params(template, [tuple(transaction_ids[start:start + _UPDATE_BATCH_SIZE]), user_id])
+            for start in range(0, len(transaction_ids), _UPDATE_BATCH_SIZE)
+        ]
         
-        sql = build_update('transactions', update_data, where_clause)
-        await execute_db(sql)
+        await execute_batch(statements)
+        clear_totals_cache()
+        _forget_transaction_counts(user_id, update_data.get('category_id'))
         return True
     
     # ==================== BUDGET OPERATIONS ====================
@@ -456,32 +999,30 @@ class PesaDBService:
         limit: int = 100
     ) -> List[Dict[str, Any]]:
         """Get budgets with optional filters"""
-        where_clauses = [f"user_id = '{user_id}'"]
-        
-        if month is not None:
-            where_clauses.append(f"month = {month}")
-        
-        if year is not None:
-            where_clauses.append(f"year = {year}")
-        
-        where_clause = ' AND '.join(where_clauses)
+        # With month and year given: prefix of idx_budgets_user_year_month_category
+        where_clause, params = (
+            Where()
+            .eq('user_id', user_id)
+            .eq('month', int(month) if month is not None else None, optional=True)
+            .eq('year', int(year) if year is not None else None, optional=True)
+            .build()
+        )
+        params.append(int(limit))
         
         result = await query_db(f"""
         SELECT * FROM budgets
         WHERE {where_clause}
-        LIMIT {limit}
-        """)
+        LIMIT ?
+        """, params=params)
         
         return result
     
     @staticmethod
     async def get_budget_by_id(budget_id: str, user_id: Optional[str] = None) -> Optional[Dict[str, Any]]:
         """Get a budget by ID"""
-        where_clause = f"id = '{budget_id}'"
-        if user_id:
-            where_clause += f" AND user_id = '{user_id}'"
+        where_clause, params = Where().eq('id', budget_id).eq('user_id', user_id, optional=True).build()
         
-        result = await query_db(f"SELECT * FROM budgets WHERE {where_clause} LIMIT 1")
+        result = await query_db(f"SELECT * FROM budgets WHERE {where_clause} LIMIT 1", params=params)
         return result[0] if result else None
     
     @staticmethod
@@ -492,14 +1033,15 @@ class PesaDBService:
         year: int
     ) -> Optional[Dict[str, Any]]:
         """Get a budget for a specific category and month"""
-        result = await query_db(f"""
+        # Point lookup on idx_budgets_user_year_month_category
+        result = await query_db("""
         SELECT * FROM budgets
-        WHERE user_id = '{user_id}'
-        AND category_id = '{category_id}'
-        AND month = {month}
-        AND year = {year}
+        WHERE user_id = ?
+        AND category_id = ?
+        AND month = ?
+        AND year = ?
         LIMIT 1
-        """)
+        """, params=[user_id, category_id, int(month), int(year)])
         return result[0] if result else None
     
     @staticmethod
@@ -512,22 +1054,18 @@ class PesaDBService:
     @staticmethod
     async def update_budget(budget_id: str, update_data: Dict[str, Any], user_id: Optional[str] = None) -> bool:
         """Update a budget"""
-        where_clause = f"id = '{budget_id}'"
-        if user_id:
-            where_clause += f" AND user_id = '{user_id}'"
+        where_clause, params = Where().eq('id', budget_id).eq('user_id', user_id, optional=True).build()
         
-        sql = build_update('budgets', update_data, where_clause)
+        sql = build_update('budgets', update_data, where_clause, params)
         await execute_db(sql)
         return True
     
     @staticmethod
     async def delete_budget(budget_id: str, user_id: Optional[str] = None) -> bool:
         """Delete a budget"""
-        where_clause = f"id = '{budget_id}'"
-        if user_id:
-            where_clause += f" AND user_id = '{user_id}'"
+        where_clause, params = Where().eq('id', budget_id).eq('user_id', user_id, optional=True).build()
         
-        sql = build_delete('budgets', where_clause)
+        sql = build_delete('budgets', where_clause, params)
         await execute_db(sql)
         return True
     
@@ -538,9 +1076,9 @@ class PesaDBService:
         """Create an SMS import log"""
         # Convert lists to JSON strings
         if 'transactions_created' in log_data and isinstance(log_data['transactions_created'], list):
-            log_data['transactions_created'] = json.dumps(log_data['transactions_created'])
+            log_data['transactions_created'] = _dump_json(log_data['transactions_created'])
         if 'errors' in log_data and isinstance(log_data['errors'], list):
-            log_data['errors'] = json.dumps(log_data['errors'])
+            log_data['errors'] = _dump_json(log_data['errors'])
         
         sql = build_insert('sms_import_logs', log_data)
         await execute_db(sql)
@@ -549,19 +1087,14 @@ class PesaDBService:
     @staticmethod
     async def get_sms_import_log(import_session_id: str) -> Optional[Dict[str, Any]]:
         """Get an SMS import log by session ID"""
-        result = await query_db(f"""
+        result = await query_db("""
         SELECT * FROM sms_import_logs
-        WHERE import_session_id = '{import_session_id}'
+        WHERE import_session_id = ?
         LIMIT 1
-        """)
+        """, params=[import_session_id])
         
         if result:
-            log = result[0]
-            if 'transactions_created' in log and isinstance(log['transactions_created'], str):
-                log['transactions_created'] = json.loads(log['transactions_created'])
-            if 'errors' in log and isinstance(log['errors'], str):
-                log['errors'] = json.loads(log['errors'])
-            return log
+            return _parse_json_columns(result[0], _IMPORT_LOG_JSON_FIELDS)
         return None
     
     # ==================== DUPLICATE LOG OPERATIONS ====================
@@ -574,10 +1107,36 @@ class PesaDBService:
         return log_data
     
     @staticmethod
-    async def count_duplicate_logs(user_id: str) -> int:
-        """Count duplicate logs for a user"""
+    async def create_duplicate_logs(log_entries: List[Dict[str, Any]]) -> int:
+        """
+        Create several duplicate detection logs in one statement
+
+        Falls back to one INSERT per log if the multi-row INSERT is rejected.
+        """
+        if not log_entries:
+            return 0
+
+        try:
+            await execute_db(build_insert_many('duplicate_logs', log_entries))
+        except Exception:
+            for log_entry in log_entries:
+                await execute_db(build_insert('duplicate_logs', log_entry))
+        return len(log_entries)
+    
+    @staticmethod
+    async def count_duplicate_logs(user_id: str, exact: bool = True) -> int:
+        """
+        Count duplicate logs for a user
+
+        Args:
+            exact: False to accept a count up to a minute old
+        """
         try:
-            return await count_rows_safe('duplicate_logs', f"user_id = '{user_id}'", query_func=query_db)
+            return await _count(
+                ('duplicate_logs', user_id),
+                exact,
+                lambda: count_rows_safe('duplicate_logs', "user_id = ?", query_func=query_db, params=[user_id])
+            )
         except Exception as e:
             if is_table_not_found_error(e):
                 return 0
@@ -588,42 +1147,150 @@ class PesaDBService:
     @staticmethod
     async def create_status_check(status_data: Dict[str, Any]) -> Dict[str, Any]:
         """Create a status check record"""
-        sql = build_insert('status_checks', status_data)
-        await execute_db(sql)
+        await _status_check_writer.add(status_data)
         return status_data
     
     @staticmethod
     async def get_status_checks(limit: int = 100) -> List[Dict[str, Any]]:
         """Get recent status checks"""
-        result = await query_db(f"SELECT * FROM status_checks ORDER BY timestamp DESC LIMIT {limit}")
+        result = await query_db("SELECT * FROM status_checks ORDER BY timestamp DESC LIMIT ?", params=[int(limit)])
         return result
     
     # ==================== ANALYTICS / AGGREGATION OPERATIONS ====================
     
     @staticmethod
-    async def get_spending_by_category(user_id: str, category_id: str, start_date: str, end_date: str) -> float:
+    async def get_all_totals(user_id: str, start_date: DateParam, end_date: DateParam) -> Dict[Tuple[str, str], float]:
+        """
+        Get the amount totals for every (type, category_id) in a date range
+
+        One grouped query answers all the per-type and per-category totals
+        below. Results are cached for a few seconds (see _totals_cache), so
+        the several totals a view needs cost a single round trip.
+
+        Returns:
+            Dict of (type, category_id) -> total amount; combinations without
+            transactions are absent
+        """
+        key = (user_id, str(start_date), str(end_date))
+        cached = _totals_cache.get(key)
+        if cached is not None:
+            return cached
+
+        async def load() -> Dict[Tuple[str, str], float]:
+            generation = _totals_generation
+            params = [user_id, start_date, end_date]
+            try:
+                rows = await query_db("""
+                SELECT type, category_id, SUM(amount) as total
+                FROM transactions
+                WHERE user_id = ? AND date >= ? AND date <= ?
+                GROUP BY type, category_id
+                """, params=params)
+                totals = {(row.get('type'), row.get('category_id')): float(row.get('total') or 0) for row in rows}
+            except Exception as e:
+                # PesaDB builds without SUM / GROUP BY - total the rows here,
+                # as aggregate_safe does (it only groups by one column)
+                error_msg = str(e).lower()
+                if not (
+                    ('sum' in error_msg or 'group' in error_msg)
+                    and ('syntax' in error_msg or 'expected identifier' in error_msg)
+                ):
+                    raise
+                logger.warning("⚠️ FALLBACK: Database does not support SUM/GROUP BY. Calculating totals in memory.")
+                rows = await query_db(f"""
+                SELECT {_select_list(['type', 'category_id', 'amount'], ['user_id', 'date'])}
+                FROM transactions
+                WHERE user_id = ? AND date >= ? AND date <= ?
+                """, params=params)
+                totals = {}
+                for row in rows:
+                    group = (row.get('type'), row.get('category_id'))
+                    totals[group] = totals.get(group, 0.0) + float(row.get('amount') or 0)
+            if generation == _totals_generation:
+                _totals_cache.set(key, totals)
+            return totals
+
+        return await _single_flight(('totals',) + key, load)
+    
+    @staticmethod
+    async def get_spending_by_category(user_id: str, category_id: str, start_date: DateParam, end_date: DateParam) -> float:
         """Get total spending for a category in a date range"""
-        where = f"user_id = '{user_id}' AND category_id = '{category_id}' AND type = 'expense' AND date BETWEEN '{start_date}' AND '{end_date}'"
-        return await sum_safe('transactions', 'amount', where, query_func=query_db)
+        totals = await PesaDBService.get_all_totals(user_id, start_date, end_date)
+        return totals.get(('expense', category_id), 0.0)
+    
+    @staticmethod
+    async def get_spending_for_categories(
+        user_id: str,
+        category_ids: List[str],
+        start_date: DateParam,
+        end_date: DateParam
+    ) -> Dict[str, float]:
+        """
+        Get total spending for several categories in a date range
+
+        Returns:
+            Dict of category_id -> total spending (0.0 for categories with none)
+        """
+        if not category_ids:
+            return {}
+        totals = await PesaDBService.get_all_totals(user_id, start_date, end_date)
+        return {category_id: totals.get(('expense', category_id), 0.0) for category_id in category_ids}
     
     @staticmethod
-    async def get_total_by_type(user_id: str, transaction_type: str, start_date: Optional[str] = None, end_date: Optional[str] = None) -> float:
+    async def get_total_by_type(user_id: str, transaction_type: str, start_date: Optional[DateParam] = None, end_date: Optional[DateParam] = None) -> float:
         """Get total amount by transaction type"""
-        where_clauses = [f"user_id = '{user_id}'", f"type = '{transaction_type}'"]
+        if start_date and end_date:
+            totals = await PesaDBService.get_all_totals(user_id, start_date, end_date)
+            return sum(total for (txn_type, _), total in totals.items() if txn_type == transaction_type)
+
+        # Open-ended ranges aren't worth caching - sum directly
+        where_clause, params = (
+            Where()
+            .eq('user_id', user_id)
+            .eq('type', transaction_type)
+            .gte('date', start_date, optional=True)
+            .lte('date', end_date, optional=True)
+            .build()
+        )
+        return await sum_safe('transactions', 'amount', where_clause, query_func=query_db, params=params)
+    
+    @staticmethod
+    async def get_totals_by_type(user_id: str, start_date: DateParam, end_date: DateParam) -> Dict[str, float]:
+        """
+        Get income and expense totals for a date range
+
+        Returns:
+            Dict with 'income' and 'expense' totals (0.0 when there are none)
+        """
+        totals = {'income': 0.0, 'expense': 0.0}
+        for (txn_type, _), total in (await PesaDBService.get_all_totals(user_id, start_date, end_date)).items():
+            if txn_type in totals:
+                totals[txn_type] += total
+        return totals
+    
+    @staticmethod
+    async def get_dashboard_summary(user_id: str, start_date: DateParam, end_date: DateParam) -> Dict[str, Any]:
+        """
+        Get the dashboard aggregates for a date range
 
-        if start_date:
-            where_clauses.append(f"date >= '{start_date}'")
-        if end_date:
-            where_clauses.append(f"date <= '{end_date}'")
+        The type totals and the per-category summary are independent queries,
+        so they are sent together and cost one round trip of latency.
 
-        where_clause = ' AND '.join(where_clauses)
-        return await sum_safe('transactions', 'amount', where_clause, query_func=query_db)
+        Returns:
+            Dict with 'totals' (see get_totals_by_type) and 'categories'
+            (see get_category_spending_summary)
+        """
+        totals, categories = await asyncio.gather(
+            PesaDBService.get_totals_by_type(user_id, start_date, end_date),
+            PesaDBService.get_category_spending_summary(user_id, start_date, end_date)
+        )
+        return {'totals': totals, 'categories': categories}
     
     @staticmethod
-    async def get_category_spending_summary(user_id: str, start_date: str, end_date: str) -> List[Dict[str, Any]]:
+    async def get_category_spending_summary(user_id: str, start_date: DateParam, end_date: DateParam) -> List[Dict[str, Any]]:
         """Get spending summary grouped by category with category details in one query"""
         # Use JOIN to get category details along with aggregates - avoids N+1 queries
-        result = await query_db(f"""
+        result = await query_db("""
         SELECT
             t.category_id,
             c.name as category_name,
@@ -633,34 +1300,60 @@ class PesaDBService:
             COUNT(*) as transaction_count
         FROM transactions t
         LEFT JOIN categories c ON t.category_id = c.id
-        WHERE t.user_id = '{user_id}'
+        WHERE t.user_id = ?
           AND t.type = 'expense'
-          AND t.date >= '{start_date}'
-          AND t.date <= '{end_date}'
+          AND t.date >= ?
+          AND t.date <= ?
         GROUP BY t.category_id, c.name, c.color, c.icon
         ORDER BY total DESC
-        """)
+        """, params=[user_id, start_date, end_date])
 
         return result
     
     @staticmethod
-    async def get_daily_spending(user_id: str, start_date: str, end_date: str) -> List[Dict[str, Any]]:
-        """Get daily spending totals (simplified - date grouping)"""
-        # Note: Date extraction functions may vary by SQL dialect
-        # This is a simplified version that groups by the date string
+    async def get_daily_spending(
+        user_id: str,
+        start_date: DateParam,
+        end_date: DateParam,
+        category_id: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Get expense totals per calendar day in a date range
+
+        Grouped server-side on the indexed date_day column. Databases without
+        it yet group by the full date timestamp, and those rows are merged
+        into days here.
+
+        Returns:
+            Rows of {'date': 'YYYY-MM-DD', 'total': float, 'count': int},
+            oldest day first, for days with spending
+        """
+        day_column = 'date_day' if await _has_lookup_columns() else 'date'
+        where_clause, params = (
+            Where()
+            .eq('user_id', user_id)
+            .eq('type', 'expense')
+            .eq('category_id', category_id, optional=True)
+            .between('date', start_date, end_date)
+            .build()
+        )
         result = await query_db(f"""
         SELECT
-            date,
-            SUM(amount) as total
+            {day_column},
+            SUM(amount) as total,
+            COUNT(*) as count
         FROM transactions
-        WHERE user_id = '{user_id}'
-          AND type = 'expense'
-          AND date BETWEEN '{start_date}' AND '{end_date}'
-        GROUP BY date
-        ORDER BY date ASC
-        """)
-        
-        return result
+        WHERE {where_clause}
+        GROUP BY {day_column}
+        """, params=params)
+
+        days: Dict[str, Dict[str, Any]] = {}
+        for row in result:
+            day = transaction_date_day(row.get(day_column))
+            bucket = days.setdefault(day, {'date': day, 'total': 0.0, 'count': 0})
+            bucket['total'] += float(row.get('total') or 0)
+            bucket['count'] += int(row.get('count') or 0)
+        return [days[day] for day in sorted(days)]
 
 
 # Create a global instance
@@ -13,9 +13,9 @@ Usage:
 """
 
 import asyncio
-import os
 import sys
 from pathlib import Path
+from typing import Sequence
 from dotenv import load_dotenv
 
 # Add backend directory to path
@@ -32,14 +32,21 @@ def check_environment():
     print("  Step 1: Checking Environment Configuration")
     print("="*60 + "\n")
     
-    api_key = os.environ.get('PESADB_API_KEY')
-    api_url = os.environ.get('PESADB_API_URL', 'https://pesacoredb-backend.onrender.com/api')
-    database = os.environ.get('PESADB_DATABASE', 'mpesa_tracker')
+    # The settings the client will actually use, read once at import
+    from config.pesadb import config as pesadb_config
     
+    api_key = pesadb_config.api_key
     issues = []
     
-    print(f"📍 API URL: {api_url}")
-    print(f"📦 Database: {database}")
+    for label, icon, value, variable in (
+        ("API URL", "📍", pesadb_config.api_url, 'PESADB_API_URL'),
+        ("Database", "📦", pesadb_config.database, 'PESADB_DATABASE'),
+    ):
+        if value:
+            print(f"{icon} {label}: {value}")
+        else:
+            print(f"❌ {label}: NOT SET")
+            issues.append(f"{variable} is not set")
     
     if api_key:
         masked_key = f"{api_key[:8]}..." if len(api_key) > 8 else "***"
@@ -111,7 +118,8 @@ async def create_database():
 
 async def initialize_schema():
     """Initialize database schema"""
-    from config.pesadb import execute_db
+    from config.pesadb import AlreadyExistsError
+    from config.pesadb_script import iter_sql_statements, run_schema_waves
     
     print("\n" + "="*60)
     print("  Step 3: Initializing Schema")
@@ -124,40 +132,35 @@ async def initialize_schema():
         print(f"❌ Error: SQL file not found at {sql_file}")
         return False
     
-    with open(sql_file, 'r', encoding='utf-8') as f:
-        sql_content = f.read()
-    
-    # Split SQL statements
-    statements = [stmt.strip() for stmt in sql_content.split(';') if stmt.strip()]
-    
-    # Filter out comments and empty statements
-    statements = [stmt for stmt in statements if not stmt.startswith('--') and stmt]
+    # Read statement by statement, without comments, in a worker thread so
+    # the file reads don't block the event loop
+    statements = await asyncio.to_thread(list, iter_sql_statements(sql_file))
     
     print(f"📝 Found {len(statements)} SQL statements to execute\n")
     
     success_count = 0
     error_count = 0
     
-    for i, statement in enumerate(statements, 1):
-        try:
-            # Get first line for display
-            first_line = statement.split('\n')[0][:50]
-            print(f"⏳ [{i}/{len(statements)}] {first_line}...")
-            
-            await execute_db(statement)
+    done = 0
+    async for statement, result in run_schema_waves(statements):
+        done += 1
+        # Get first line for display
+        first_line = statement.split('\n')[0][:50]
+        print(f"⏳ [{done}/{len(statements)}] {first_line}...")
+        
+        if result is None:
             success_count += 1
             print(f"   ✅ Success")
-            
-        except Exception as e:
-            error_str = str(e)
-            # Check if it's a "table already exists" error - that's okay
-            if "already exists" in error_str.lower() or "duplicate" in error_str.lower():
-                print(f"   ⚠️  Already exists (skipping)")
-                success_count += 1
-            else:
-                print(f"   ❌ Error: {error_str}")
-                error_count += 1
-    
+            continue
+        
+        # A table or seed row that already exists is okay
+        if isinstance(result, AlreadyExistsError):
+            print(f"   ⚠️  Already exists (skipping)")
+            success_count += 1
+        else:
+            print(f"   ❌ Error: {str(result)}")
+            error_count += 1
+
     print("\n" + "-"*60)
     print(f"✅ Successful: {success_count}")
     print(f"❌ Errors: {error_count}")
@@ -171,38 +174,78 @@ async def initialize_schema():
     return True
 
 
+async def count_tables(tables: Sequence[str]) -> dict:
+    """
+    Count the rows of several tables
+
+    Tries one query with a scalar subquery per table; if PesaDB rejects
+    that (or any table is missing), counts each table separately, all at
+    once, so a failure is reported against its own table.
+
+    Returns:
+        {table: row count, or the exception its COUNT raised}
+    """
+    from config.pesadb import query_db
+    
+    combined = "SELECT " + ", ".join(f"(SELECT COUNT(*) FROM {table}) AS {table}" for table in tables)
+    try:
+        row = (await query_db(combined))[0]
+        return {table: row[table] for table in tables}
+    except Exception:
+        pass
+    
+    results = await asyncio.gather(
+        *(query_db(f"SELECT COUNT(*) as count FROM {table}") for table in tables),
+        return_exceptions=True
+    )
+    return {
+        table: result if isinstance(result, Exception) else (result[0]['count'] if result else 0)
+        for table, result in zip(tables, results)
+    }
+
+
 async def verify_setup():
     """Verify that the database is set up correctly"""
     from config.pesadb import query_db
+    from services.database_initializer import CORE_TABLES
     
     print("\n" + "="*60)
     print("  Step 4: Verifying Setup")
     print("="*60 + "\n")
     
-    tables = ['users', 'categories', 'transactions', 'budgets']
+    tables = CORE_TABLES
     
     all_verified = True
     
+    # The category sample doesn't depend on the counts, so fetch both at once
+    counts, categories = await asyncio.gather(
+        count_tables(tables),
+        query_db("SELECT id, name, icon FROM categories WHERE is_default = TRUE LIMIT 3"),
+        return_exceptions=True
+    )
+    
     for table in tables:
-        try:
-            result = await query_db(f"SELECT COUNT(*) as count FROM {table}")
-            count = result[0]['count'] if result else 0
-            print(f"✅ Table '{table}' exists ({count} rows)")
-        except Exception as e:
-            print(f"❌ Table '{table}' verification failed: {str(e)}")
+        count = counts[table]
+        if isinstance(count, Exception):
+            print(f"❌ Table '{table}' verification failed: {str(count)}")
             all_verified = False
+        else:
+            print(f"✅ Table '{table}' exists ({count} rows)")
     
     # Check categories specifically
-    try:
-        categories = await query_db("SELECT id, name, icon FROM categories WHERE is_default = TRUE LIMIT 5")
-        print(f"\n📋 Sample categories ({len(categories)} default categories):")
-        for cat in categories[:3]:
-            print(f"   - {cat['name']}: {cat['icon']}")
-        if len(categories) > 3:
-            print(f"   ... and {len(categories) - 3} more")
-    except Exception as e:
-        print(f"\n⚠️  Could not retrieve categories: {str(e)}")
+    if isinstance(categories, Exception):
+        print(f"\n⚠️  Could not retrieve categories: {str(categories)}")
         all_verified = False
+    else:
+        # Only the sample rows are fetched; the total comes from the counts
+        total = counts.get('categories')
+        if not isinstance(total, int):
+            total = len(categories)
+        print(f"\n📋 Sample categories ({total} categories):")
+        for cat in categories:
+            print(f"   - {cat['name']}: {cat['icon']}")
+        if total > len(categories):
+            print(f"   ... and {total - len(categories)} more")
     
     print()
     return all_verified
@@ -255,6 +298,9 @@ async def main():
         import traceback
         traceback.print_exc()
         sys.exit(1)
+    finally:
+        from config.pesadb import close_client
+        await close_client()
 
 
 if __name__ == "__main__":
@@ -5,7 +5,7 @@ Test script to debug COUNT(*) query issues with PesaDB
 import asyncio
 import logging
 import sys
-from config.pesadb import query_db, config
+from config.pesadb import query_db, config, close_client
 
 # Set up detailed logging
 logging.basicConfig(
@@ -19,6 +19,26 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
+# (description, SQL, print the rows instead of the raw result)
+COUNT_PROBES = [
+    ("Simple COUNT(*) on categories", "SELECT COUNT(*) as count FROM categories", False),
+    ("COUNT(*) without alias", "SELECT COUNT(*) FROM categories", False),
+    ("Simple SELECT * from categories", "SELECT * FROM categories LIMIT 1", True),
+    ("COUNT(*) on users table", "SELECT COUNT(*) as count FROM users", False),
+    ("COUNT with WHERE clause", "SELECT COUNT(*) as count FROM categories WHERE is_default = TRUE", False),
+    ("Show tables to see what exists", "SHOW TABLES", False),
+]
+
+
+async def _probe(sql: str):
+    """Run one probe query, returning (result, None) or (None, error)"""
+    logger.info(f"Executing: {sql}")
+    try:
+        return await query_db(sql), None
+    except Exception as e:
+        return None, e
+
+
 async def test_count_queries():
     """Test various COUNT queries to identify the issue"""
     
@@ -36,90 +56,37 @@ async def test_count_queries():
         logger.error(f"❌ Config validation failed: {e}")
         return
     
-    # Test 1: Simple COUNT(*) on categories
-    print("\n📝 Test 1: SELECT COUNT(*) as count FROM categories")
-    print("-" * 80)
-    try:
-        sql = "SELECT COUNT(*) as count FROM categories"
-        logger.info(f"Executing: {sql}")
-        result = await query_db(sql)
-        logger.info(f"✅ SUCCESS: {result}")
-        print(f"Result: {result}")
-    except Exception as e:
-        logger.error(f"❌ FAILED: {e}")
-        print(f"Error: {e}")
-    
-    # Test 2: COUNT(*) without alias
-    print("\n📝 Test 2: SELECT COUNT(*) FROM categories")
-    print("-" * 80)
-    try:
-        sql = "SELECT COUNT(*) FROM categories"
-        logger.info(f"Executing: {sql}")
-        result = await query_db(sql)
-        logger.info(f"✅ SUCCESS: {result}")
-        print(f"Result: {result}")
-    except Exception as e:
-        logger.error(f"❌ FAILED: {e}")
-        print(f"Error: {e}")
+    # The probes are independent, so they all run at once; the output is
+    # printed afterwards in test order
+    results = await asyncio.gather(*(_probe(sql) for _, sql, _ in COUNT_PROBES))
     
-    # Test 3: Simple SELECT * from categories
-    print("\n📝 Test 3: SELECT * FROM categories LIMIT 1")
-    print("-" * 80)
-    try:
-        sql = "SELECT * FROM categories LIMIT 1"
-        logger.info(f"Executing: {sql}")
-        result = await query_db(sql)
-        logger.info(f"✅ SUCCESS")
-        print(f"Result count: {len(result)} rows")
-        if result:
-            print(f"First row: {result[0]}")
-    except Exception as e:
-        logger.error(f"❌ FAILED: {e}")
-        print(f"Error: {e}")
-    
-    # Test 4: COUNT(*) on users table
-    print("\n📝 Test 4: SELECT COUNT(*) as count FROM users")
-    print("-" * 80)
-    try:
-        sql = "SELECT COUNT(*) as count FROM users"
-        logger.info(f"Executing: {sql}")
-        result = await query_db(sql)
-        logger.info(f"✅ SUCCESS: {result}")
-        print(f"Result: {result}")
-    except Exception as e:
-        logger.error(f"❌ FAILED: {e}")
-        print(f"Error: {e}")
-    
-    # Test 5: COUNT with WHERE clause
-    print("\n📝 Test 5: SELECT COUNT(*) as count FROM categories WHERE is_default = TRUE")
-    print("-" * 80)
-    try:
-        sql = "SELECT COUNT(*) as count FROM categories WHERE is_default = TRUE"
-        logger.info(f"Executing: {sql}")
-        result = await query_db(sql)
-        logger.info(f"✅ SUCCESS: {result}")
-        print(f"Result: {result}")
-    except Exception as e:
-        logger.error(f"❌ FAILED: {e}")
-        print(f"Error: {e}")
-    
-    # Test 6: Show tables to see what exists
-    print("\n📝 Test 6: SHOW TABLES")
-    print("-" * 80)
-    try:
-        sql = "SHOW TABLES"
-        logger.info(f"Executing: {sql}")
-        result = await query_db(sql)
-        logger.info(f"✅ SUCCESS")
-        print(f"Result: {result}")
-    except Exception as e:
-        logger.error(f"❌ FAILED: {e}")
-        print(f"Error: {e}")
+    for number, ((title, sql, show_rows), (result, error)) in enumerate(zip(COUNT_PROBES, results), 1):
+        print(f"\n📝 Test {number}: {sql}")
+        print("-" * 80)
+        if error is not None:
+            logger.error(f"❌ FAILED ({title}): {error}")
+            print(f"Error: {error}")
+        elif show_rows:
+            logger.info(f"✅ SUCCESS ({title})")
+            print(f"Result count: {len(result)} rows")
+            if result:
+                print(f"First row: {result[0]}")
+        else:
+            logger.info(f"✅ SUCCESS ({title}): {result}")
+            print(f"Result: {result}")
     
     print("\n" + "="*80)
     print("TESTS COMPLETED")
     print("="*80 + "\n")
 
 
+async def main():
+    """Run the probes on one client, closing it at the end"""
+    try:
+        await test_count_queries()
+    finally:
+        await close_client()
+
+
 if __name__ == "__main__":
-    asyncio.run(test_count_queries())
+    asyncio.run(main())
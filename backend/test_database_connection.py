@@ -18,7 +18,7 @@ from pathlib import Path
 backend_dir = Path(__file__).parent
 sys.path.insert(0, str(backend_dir))
 
-from config.pesadb import query_db, execute_db, config, database_exists, create_database
+from config.pesadb import query_db, execute_db, config, database_exists, create_database, close_client
 from services.database_initializer import db_initializer
 
 async def test_connection():
@@ -73,29 +73,34 @@ async def test_connection():
         return False
     print()
     
+    # Tests 3 and 4 only need the table, not each other, so the count
+    # and the insert go out together; either count is a valid result
+    count_result, insert_result = await asyncio.gather(
+        query_db("SELECT COUNT(*) as count FROM test_table"),
+        execute_db("INSERT INTO test_table (id, name, value) VALUES ('test1', 'Test Item', 42)"),
+        return_exceptions=True
+    )
+    
     # Test 3: Query the test table
     print("🔍 Test 3: Querying test table...")
-    try:
-        result = await query_db("SELECT COUNT(*) as count FROM test_table")
-        count = result[0]['count'] if result else 0
-        print(f"✅ Test table query successful (count: {count})")
-    except Exception as e:
-        print(f"❌ Error querying test table: {str(e)}")
+    if isinstance(count_result, Exception):
+        print(f"❌ Error querying test table: {str(count_result)}")
         return False
+    count = count_result[0]['count'] if count_result else 0
+    print(f"✅ Test table query successful (count: {count})")
     print()
     
     # Test 4: Insert test data
     print("🔍 Test 4: Inserting test data...")
-    try:
-        await execute_db("INSERT INTO test_table (id, name, value) VALUES ('test1', 'Test Item', 42)")
-        print("✅ Test data inserted successfully")
-    except Exception as e:
+    if isinstance(insert_result, Exception):
         # This might fail if record already exists, which is OK
-        if "duplicate" in str(e).lower() or "unique" in str(e).lower():
+        if "duplicate" in str(insert_result).lower() or "unique" in str(insert_result).lower():
             print("⚠️  Test data already exists (this is OK)")
         else:
-            print(f"❌ Error inserting test data: {str(e)}")
+            print(f"❌ Error inserting test data: {str(insert_result)}")
             return False
+    else:
+        print("✅ Test data inserted successfully")
     print()
     
     # Test 5: Query inserted data
@@ -208,6 +213,8 @@ async def main():
         import traceback
         traceback.print_exc()
         sys.exit(1)
+    finally:
+        await close_client()
 
 
 if __name__ == "__main__":
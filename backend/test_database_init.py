@@ -12,40 +12,65 @@ Usage:
 import asyncio
 import sys
 from pathlib import Path
+from typing import List, Optional, Sequence
 
 # Add backend directory to path
 backend_dir = Path(__file__).parent
 sys.path.insert(0, str(backend_dir))
 
-from config.pesadb import query_db, execute_db, get_client
-from services.database_initializer import db_initializer
+from config.pesadb import query_db, execute_db, close_client
+from services.database_initializer import CORE_TABLES, REQUIRED_TABLES, db_initializer
 from services.pesadb_service import db_service
 
 
 class DatabaseTest:
     """Database initialization testing"""
     
-    def __init__(self):
+    def __init__(self, buffered: bool = False, shared: Optional[dict] = None):
         self.passed = 0
         self.failed = 0
         self.warnings = 0
+        # Output held back while steps run concurrently (see step())
+        self.lines: Optional[List[str]] = [] if buffered else None
+        # State shared with step testers: the SHOW TABLES listing, fetched
+        # once for all existence checks
+        self._shared = shared if shared is not None else {}
+    
+    def _print(self, text: str):
+        if self.lines is None:
+            print(text)
+        else:
+            self.lines.append(text)
+    
+    def step(self) -> "DatabaseTest":
+        """Tester for one step run alongside others; see report()"""
+        return DatabaseTest(buffered=True, shared=self._shared)
+    
+    def report(self, step: "DatabaseTest"):
+        """Print a finished step's output and add its results to this tester"""
+        if step.lines:
+            # One write for the whole step rather than one per line
+            self._print("\n".join(step.lines))
+        self.passed += step.passed
+        self.failed += step.failed
+        self.warnings += step.warnings
     
     def test_passed(self, test_name: str):
         """Mark test as passed"""
         self.passed += 1
-        print(f"✅ PASS: {test_name}")
+        self._print(f"✅ PASS: {test_name}")
     
     def test_failed(self, test_name: str, error: str):
         """Mark test as failed"""
         self.failed += 1
-        print(f"❌ FAIL: {test_name}")
-        print(f"   Error: {error}")
+        self._print(f"❌ FAIL: {test_name}")
+        self._print(f"   Error: {error}")
     
     def test_warning(self, test_name: str, message: str):
         """Mark test as warning"""
         self.warnings += 1
-        print(f"⚠️  WARN: {test_name}")
-        print(f"   {message}")
+        self._print(f"⚠️  WARN: {test_name}")
+        self._print(f"   {message}")
     
     async def test_table_exists(self, table_name: str) -> bool:
         """Test if a table exists"""
@@ -57,6 +82,37 @@ class DatabaseTest:
             self.test_failed(f"Table '{table_name}' exists", str(e))
             return False
     
+    async def test_tables_exist(self, table_names: Sequence[str]) -> bool:
+        """Test if several tables exist, from one catalog query if possible"""
+        listing = self._shared.get('tables')
+        if listing is None:
+            listing = self._shared['tables'] = asyncio.ensure_future(db_initializer.list_tables())
+        existing = await listing
+        if existing is not None:
+            all_exist = True
+            for table_name in table_names:
+                if table_name in existing:
+                    self.test_passed(f"Table '{table_name}' exists")
+                else:
+                    self.test_failed(f"Table '{table_name}' exists", "Not listed by SHOW TABLES")
+                    all_exist = False
+            return all_exist
+        
+        # No catalog - probe the tables concurrently
+        results = await asyncio.gather(
+            *(query_db(f"SELECT * FROM {table_name} LIMIT 1") for table_name in table_names),
+            return_exceptions=True
+        )
+        # Report in table order, not completion order
+        all_exist = True
+        for table_name, result in zip(table_names, results):
+            if isinstance(result, Exception):
+                self.test_failed(f"Table '{table_name}' exists", str(result))
+                all_exist = False
+            else:
+                self.test_passed(f"Table '{table_name}' exists")
+        return all_exist
+    
     async def test_table_structure(self, table_name: str) -> dict:
         """Test table structure by querying it"""
         try:
@@ -68,6 +124,17 @@ class DatabaseTest:
             self.test_failed(f"Table '{table_name}' structure is valid", str(e))
             return {}
     
+    async def test_table_structures(self, table_names: Sequence[str]):
+        """Test several table structures concurrently; each result names its table"""
+        async with asyncio.TaskGroup() as group:
+            for table_name in table_names:
+                group.create_task(self.test_table_structure(table_name))
+    
+    async def test_seed_data(self):
+        """Test that categories were seeded with keywords"""
+        await self.test_categories_seeded()
+        await self.test_category_keywords()
+    
     async def test_categories_seeded(self) -> bool:
         """Test if default categories were seeded"""
         try:
@@ -97,12 +164,7 @@ class DatabaseTest:
             
             # Just verify the tables that should have relations exist
             tables_with_fk = ['transactions', 'budgets', 'sms_import_logs', 'duplicate_logs']
-            all_exist = True
-            
-            for table in tables_with_fk:
-                exists = await self.test_table_exists(table)
-                if not exists:
-                    all_exist = False
+            all_exist = await self.test_tables_exist(tables_with_fk)
             
             if all_exist:
                 self.test_passed("Foreign key tables exist")
@@ -189,12 +251,17 @@ async def run_tests():
     
     # Test 1: Run initialization
     print("🚀 Step 1: Running database initialization...\n")
+    # Whether any table could be created or found - if not, the database
+    # is unreachable and every verification query would fail the same way
+    reachable = False
     try:
         result = await db_initializer.initialize_database(
             seed_categories=True,
             create_default_user=True
         )
         
+        reachable = result['tables_created'] + result['tables_skipped'] > 0
+        
         if result['success']:
             tester.test_passed("Database initialization")
             print(f"   Tables created: {result['tables_created']}")
@@ -209,54 +276,30 @@ async def run_tests():
     except Exception as e:
         tester.test_failed("Database initialization", str(e))
     
-    print("\n🔍 Step 2: Verifying table structure...\n")
+    if not reachable:
+        print("\n⏭️  Skipping verification steps - no tables could be created or found")
+        return tester.print_summary()
     
-    # Test 2: Verify all required tables exist
-    required_tables = [
-        'users',
-        'categories',
-        'transactions',
-        'budgets',
-        'sms_import_logs',
-        'duplicate_logs',
-        'status_checks'
+    # Steps 2-6 only read what initialization created, so they run at once;
+    # each step's output is held back and printed in step order
+    steps = [
+        ("Step 2: Verifying table structure", lambda step: step.test_tables_exist(REQUIRED_TABLES)),
+        ("Step 3: Verifying table structures", lambda step: step.test_table_structures(CORE_TABLES)),
+        ("Step 4: Verifying seed data", lambda step: step.test_seed_data()),
+        ("Step 5: Verifying relationships", lambda step: step.test_foreign_keys()),
+        ("Step 6: Verifying user creation", lambda step: step.test_user_creation()),
     ]
+    step_testers = [tester.step() for _ in steps]
+    async with asyncio.TaskGroup() as group:
+        for (_, run), step in zip(steps, step_testers):
+            group.create_task(run(step))
     
-    for table in required_tables:
-        await tester.test_table_exists(table)
-    
-    print("\n🔍 Step 3: Verifying table structures...\n")
-    
-    # Test 3: Verify table structures
-    for table in required_tables[:4]:  # Test first 4 main tables
-        await tester.test_table_structure(table)
-    
-    print("\n🔍 Step 4: Verifying seed data...\n")
-    
-    # Test 4: Verify categories were seeded
-    await tester.test_categories_seeded()
-    
-    # Test 5: Verify category keywords
-    await tester.test_category_keywords()
-    
-    print("\n🔍 Step 5: Verifying relationships...\n")
-    
-    # Test 6: Verify foreign keys
-    await tester.test_foreign_keys()
-    
-    print("\n🔍 Step 6: Verifying user creation...\n")
-    
-    # Test 7: Verify user creation
-    await tester.test_user_creation()
+    for (title, _), step in zip(steps, step_testers):
+        print(f"\n🔍 {title}...\n")
+        tester.report(step)
     
     # Print summary
-    success = tester.print_summary()
-    
-    # Close client
-    client = get_client()
-    await client.close()
-    
-    return success
+    return tester.print_summary()
 
 
 async def main():
@@ -272,6 +315,8 @@ async def main():
         import traceback
         traceback.print_exc()
         sys.exit(1)
+    finally:
+        await close_client()
 
 
 if __name__ == "__main__":
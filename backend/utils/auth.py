@@ -2,12 +2,13 @@
 Authentication utilities for JWT token management
 """
 import os
+import time
 import jwt
-from datetime import datetime, timedelta
 from typing import Optional, Dict, Any
 from fastapi import HTTPException, Security, Depends, Header
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from services.pesadb_service import db_service
+from utils.cache import LRUCache
 import logging
 
 logger = logging.getLogger(__name__)
@@ -16,10 +17,16 @@ logger = logging.getLogger(__name__)
 SECRET_KEY = os.environ.get('JWT_SECRET_KEY', 'your-secret-key-change-this-in-production')
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 60 * 24 * 7  # 7 days
+_ACCESS_TOKEN_EXPIRE_SECONDS = ACCESS_TOKEN_EXPIRE_MINUTES * 60
 
 # Security scheme
 security = HTTPBearer()
 
+# Verified token payloads keyed by the raw token. Clients reuse one token
+# for days, so most requests skip the HMAC check and JSON parse; the exp
+# claim is still checked on every hit. Invalid tokens are stored as None.
+_decoded_tokens = LRUCache(maxsize=4096)
+
 
 def create_access_token(user_id: str, email: str) -> str:
     """
@@ -32,19 +39,47 @@ def create_access_token(user_id: str, email: str) -> str:
     Returns:
         JWT token string
     """
-    expire = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+    # Unix timestamps, as PyJWT would encode datetimes anyway
+    now = int(time.time())
     
     payload = {
         "sub": user_id,  # Subject (user ID)
         "email": email,
-        "exp": expire,  # Expiration time
-        "iat": datetime.utcnow(),  # Issued at
+        "exp": now + _ACCESS_TOKEN_EXPIRE_SECONDS,  # Expiration time
+        "iat": now,  # Issued at
     }
     
     token = jwt.encode(payload, SECRET_KEY, algorithm=ALGORITHM)
     return token
 
 
+def _decode_cached(token: str) -> Dict[str, Any]:
+    """
+    Decode and verify a token, reusing earlier verifications
+
+    Raises:
+        jwt.ExpiredSignatureError: If the token has expired
+        jwt.InvalidTokenError: If the token is invalid
+    """
+    payload = _decoded_tokens.get(token, False)
+    if payload is False:
+        try:
+            payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        except jwt.ExpiredSignatureError:
+            raise
+        except jwt.InvalidTokenError:
+            _decoded_tokens.set(token, None)
+            raise
+        _decoded_tokens.set(token, payload)
+
+    if payload is None:
+        raise jwt.InvalidTokenError("Invalid token")
+    if payload.get('exp', float('inf')) <= time.time():
+        _decoded_tokens.invalidate(token)
+        raise jwt.ExpiredSignatureError("Signature has expired")
+    return dict(payload)
+
+
 def decode_access_token(token: str) -> Dict[str, Any]:
     """
     Decode and verify a JWT token
@@ -59,8 +94,7 @@ def decode_access_token(token: str) -> Dict[str, Any]:
         HTTPException: If token is invalid or expired
     """
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        return payload
+        return _decode_cached(token)
     except jwt.ExpiredSignatureError:
         raise HTTPException(
             status_code=401,
@@ -122,13 +156,13 @@ async def _get_credentials_optional(
     if not authorization:
         return None
 
-    try:
-        scheme, credentials = authorization.split()
-        if scheme.lower() != "bearer":
-            return None
-        return HTTPAuthorizationCredentials(scheme=scheme, credentials=credentials)
-    except ValueError:
+    # "<scheme> <token>" - one partition rather than split() into a list and
+    # catching ValueError; the length check skips lowercasing long junk
+    scheme, _, credentials = authorization.strip().partition(" ")
+    credentials = credentials.lstrip()
+    if len(scheme) != 6 or scheme.lower() != "bearer" or not credentials or " " in credentials:
         return None
+    return HTTPAuthorizationCredentials(scheme=scheme, credentials=credentials)
 
 
 async def get_current_user_optional(
@@ -168,7 +202,6 @@ def verify_token(token: str) -> Optional[Dict[str, Any]]:
         Decoded payload if valid, None otherwise
     """
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        return payload
+        return _decode_cached(token)
     except (jwt.ExpiredSignatureError, jwt.InvalidTokenError):
         return None
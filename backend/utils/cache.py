@@ -0,0 +1,144 @@
+"""
+In-process caching utilities
+"""
+import hashlib
+import math
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+
+class LRUCache:
+    """
+    Bounded least-recently-used cache
+
+    Used to memoize database lookups that are repeated on hot paths.
+    Not shared between worker processes. With `ttl` set, entries expire
+    that many seconds after they were stored.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: Optional[float] = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, Tuple[Any, Optional[float]]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Get a cached value, marking it as recently used"""
+        entry = self._data.get(key)
+        if entry is not None:
+            value, expires_at = entry
+            if expires_at is None or expires_at > time.monotonic():
+                self._data.move_to_end(key)
+                self.hits += 1
+                return value
+            del self._data[key]
+        self.misses += 1
+        return default
+
+    def set(self, key: Hashable, value: Any):
+        """Store a value, evicting the least recently used entry if full"""
+        expires_at = time.monotonic() + self.ttl if self.ttl is not None else None
+        self._data[key] = (value, expires_at)
+        self._data.move_to_end(key)
+        if len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def replace(self, key: Hashable, value: Any) -> bool:
+        """
+        Change the value of a live entry, keeping its expiry time
+
+        Returns:
+            False (and stores nothing) if the key is absent or expired
+        """
+        entry = self._data.get(key)
+        if entry is None or (entry[1] is not None and entry[1] <= time.monotonic()):
+            return False
+        self._data[key] = (value, entry[1])
+        return True
+
+    def invalidate(self, key: Hashable):
+        """Remove a single entry if present"""
+        self._data.pop(key, None)
+
+    def clear(self):
+        """Remove all entries"""
+        self._data.clear()
+
+    def info(self) -> Dict[str, int]:
+        """Get cache statistics"""
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'size': len(self._data),
+            'maxsize': self.maxsize
+        }
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class BloomFilter:
+    """
+    Fixed-size probabilistic set of strings
+
+    `key in bloom` is False only if the key was never added; True may be a
+    false positive, at roughly `error_rate` once `capacity` keys are added.
+    Keys cannot be removed.
+    """
+
+    def __init__(self, capacity: int = 1_000_000, error_rate: float = 0.001):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.num_bits = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+        self._bits = bytearray((self.num_bits + 7) // 8)
+        self.count = 0
+
+    def _positions(self, key: str) -> List[int]:
+        """Bit positions for a key (double hashing over one 128-bit digest)"""
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return [(h1 + i * h2) % self.num_bits for i in range(self.num_hashes)]
+
+    def add(self, key: str):
+        """Add a key to the set"""
+        for pos in self._positions(key):
+            self._bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+    def __contains__(self, key: str) -> bool:
+        return all(self._bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(key))
+
+    def __len__(self) -> int:
+        return self.count
+
+
+class ScalableBloomFilter:
+    """
+    Bloom filter that grows instead of degrading once full
+
+    Keys go into the newest BloomFilter layer; when it reaches its capacity
+    a layer twice as large is added, with half the error rate so the
+    combined false-positive rate stays below `error_rate`.
+    """
+
+    def __init__(self, initial_capacity: int = 100_000, error_rate: float = 0.001):
+        self.error_rate = error_rate
+        self._layers: List[BloomFilter] = [BloomFilter(initial_capacity, error_rate / 2)]
+
+    def add(self, key: str):
+        """Add a key to the set"""
+        layer = self._layers[-1]
+        if layer.count >= layer.capacity:
+            layer = BloomFilter(layer.capacity * 2, layer.error_rate / 2)
+            self._layers.append(layer)
+        layer.add(key)
+
+    def __contains__(self, key: str) -> bool:
+        return any(key in layer for layer in self._layers)
+
+    def __len__(self) -> int:
+        return sum(layer.count for layer in self._layers)
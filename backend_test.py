@@ -42,18 +42,21 @@ def print_warning(message):
 def print_info(message):
     print(f"{Colors.BLUE}ℹ️  {message}{Colors.ENDC}")
 
+# One session for every test, so requests reuse a keep-alive connection
+# instead of opening a new one each time
+SESSION = requests.Session()
+
 def make_request(method, endpoint, data=None, params=None):
     """Make HTTP request and return response"""
     url = f"{API_BASE}{endpoint}"
     try:
-        if method.upper() == 'GET':
-            response = requests.get(url, params=params, timeout=10)
-        elif method.upper() == 'POST':
-            response = requests.post(url, json=data, timeout=10)
-        elif method.upper() == 'PUT':
-            response = requests.put(url, json=data, timeout=10)
-        elif method.upper() == 'DELETE':
-            response = requests.delete(url, timeout=10)
+        method = method.upper()
+        if method == 'GET':
+            response = SESSION.get(url, params=params, timeout=10)
+        elif method in ('POST', 'PUT'):
+            response = SESSION.request(method, url, json=data, timeout=10)
+        elif method == 'DELETE':
+            response = SESSION.delete(url, timeout=10)
         else:
             raise ValueError(f"Unsupported method: {method}")
         
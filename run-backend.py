@@ -2,27 +2,27 @@
 """
 Enhanced backend startup script for M-Pesa Expense Tracker
 """
-import subprocess
 import sys
 import os
 import time
+from importlib.util import find_spec
 from pathlib import Path
 
 def check_dependencies():
     """Check if required dependencies are installed"""
     print("🔍 Checking dependencies...")
 
-    try:
-        import uvicorn
-        import fastapi
-        import aiohttp
-        print("✅ Core dependencies found")
-        return True
-    except ImportError as e:
-        print(f"❌ Missing dependency: {e}")
+    # find_spec locates the packages without importing them - the server
+    # process does the real imports
+    missing = [name for name in ("uvicorn", "fastapi", "aiohttp") if find_spec(name) is None]
+    if missing:
+        print(f"❌ Missing dependency: {', '.join(missing)}")
         print("💡 Install dependencies with: pip install -r backend/requirements.txt")
         return False
 
+    print("✅ Core dependencies found")
+    return True
+
 def check_environment():
     """Check environment variables and configuration"""
     print("🔍 Checking environment configuration...")
@@ -70,22 +70,23 @@ def start_backend():
     print("="*60 + "\n")
     
     try:
-        # Start the uvicorn server with better error handling
-        result = subprocess.run([
-            sys.executable, "-m", "uvicorn", 
-            "server:app", 
-            "--reload", 
-            "--host", "0.0.0.0", 
-            "--port", "8000",
-            "--log-level", "info"
-        ], check=False)
-        
-        return result.returncode
+        # Run uvicorn in this process instead of starting a second
+        # interpreter for "python -m uvicorn"
+        import uvicorn
+        uvicorn.run(
+            "server:app",
+            app_dir=str(backend_dir),
+            reload=True,
+            host="0.0.0.0",
+            port=8000,
+            log_level="info"
+        )
+        return 0
         
     except KeyboardInterrupt:
         print("\n\n🛑 Server stopped by user")
         return 0
-    except FileNotFoundError:
+    except ImportError:
         print("\n❌ uvicorn not found. Install it with: pip install uvicorn[standard]")
         return 1
     except Exception as e:
@@ -2,7 +2,6 @@
 """
 Simple script to start the M-Pesa Expense Tracker backend server
 """
-import subprocess
 import sys
 import os
 from pathlib import Path
@@ -24,17 +23,16 @@ def main():
     print("\n" + "="*50)
     
     try:
-        # Start the uvicorn server
-        subprocess.run([
-            sys.executable, "-m", "uvicorn", 
-            "server:app", 
-            "--reload", 
-            "--host", "0.0.0.0", 
-            "--port", "8000"
-        ])
+        # Start the uvicorn server in this process
+        import uvicorn
+        uvicorn.run("server:app", app_dir=str(backend_dir), reload=True, host="0.0.0.0", port=8000)
+        return 0
     except KeyboardInterrupt:
         print("\n\n🛑 Server stopped by user")
         return 0
+    except ImportError:
+        print("\n❌ uvicorn not found. Install it with: pip install uvicorn[standard]")
+        return 1
     except Exception as e:
         print(f"\n❌ Error starting server: {e}")
         return 1
@@ -3,133 +3,169 @@
 Backend Connection Test Script for M-Pesa Expense Tracker
 Tests all major endpoints to identify connection issues
 """
-import requests
+import aiohttp
+import asyncio
+import io
 import json
+import orjson
+import sys
 import time
 from datetime import datetime
-from typing import Dict, List
+from typing import Dict, List, NamedTuple, Optional, TextIO
 
 # Configuration
 BASE_URL = "http://localhost:8000"  # Change this to your backend URL
 TIMEOUT = 10  # seconds
 
-def colored_print(message: str, color: str = "white"):
-    """Print colored messages"""
-    colors = {
-        "red": "\033[91m",
-        "green": "\033[92m",
-        "yellow": "\033[93m",
-        "blue": "\033[94m",
-        "magenta": "\033[95m",
-        "cyan": "\033[96m",
-        "white": "\033[97m",
-        "reset": "\033[0m"
-    }
-    
-    print(f"{colors.get(color, colors['white'])}{message}{colors['reset']}")
+class TestCase(NamedTuple):
+    name: str
+    endpoint: str
+    critical: bool = False
+    inspect: bool = False  # read the response body and show key fields
 
-def test_endpoint(endpoint: str, method: str = "GET", data: Dict = None) -> Dict:
-    """Test a single endpoint"""
+TEST_CASES = (
+    # Basic connectivity
+    TestCase("Root Endpoint", "/api/", critical=True),
+    TestCase("Health Check", "/api/health", critical=True, inspect=True),
+    
+    # Core functionality
+    TestCase("Analytics Summary", "/api/transactions/analytics/summary", critical=True, inspect=True),
+    TestCase("Categories List", "/api/categories/", critical=True),
+    TestCase("Transactions List", "/api/transactions/"),
+    
+    # Budget endpoints
+    TestCase("Budget Summary", "/api/budgets/summary?month=12&year=2024"),
+    TestCase("Budget Alerts", "/api/budgets/alerts"),
+    TestCase("Budget Monitoring", "/api/budgets/monitoring/analysis?month=12&year=2024"),
+    TestCase("Budget Goals", "/api/budgets/monitoring/goals?month=12&year=2024"),
+    
+    # Additional endpoints
+    TestCase("Charges Analytics", "/api/transactions/charges/analytics?period=month", inspect=True),
+    TestCase("Debug Database", "/api/transactions/debug/database"),
+)
+
+COLORS = {
+    "red": "\033[91m",
+    "green": "\033[92m",
+    "yellow": "\033[93m",
+    "blue": "\033[94m",
+    "magenta": "\033[95m",
+    "cyan": "\033[96m",
+    "white": "\033[97m",
+}
+RESET = "\033[0m"
+
+def colored_print(message: str, color: str = "white", out: Optional[TextIO] = None):
+    """Print colored messages (to stdout, or to out if given)"""
+    (out or sys.stdout).write(f"{COLORS.get(color, COLORS['white'])}{message}{RESET}\n")
+
+async def test_endpoint(
+    session: aiohttp.ClientSession,
+    endpoint: str,
+    method: str = "GET",
+    data: Dict = None,
+    inspect: bool = False
+) -> Dict:
+    """Test a single endpoint (reading its response body only if inspect is set)"""
     url = f"{BASE_URL}{endpoint}"
     
+    if method not in ("GET", "POST"):
+        return {"success": False, "error": f"Unsupported method: {method}"}
+    
     try:
-        if method == "GET":
-            response = requests.get(url, timeout=TIMEOUT)
-        elif method == "POST":
-            response = requests.post(url, json=data, timeout=TIMEOUT)
-        else:
-            return {"success": False, "error": f"Unsupported method: {method}"}
-        
-        return {
-            "success": response.status_code < 400,
-            "status_code": response.status_code,
-            "response": response.json() if response.headers.get('content-type', '').startswith('application/json') else response.text,
-            "response_time": response.elapsed.total_seconds()
-        }
-    
-    except requests.exceptions.ConnectionError:
+        start = time.perf_counter()
+        async with session.request(method, url, json=data) as response:
+            if not inspect:
+                body = None
+            elif response.content_type == 'application/json':
+                body = orjson.loads(await response.read())
+            else:
+                body = await response.text()
+            
+            return {
+                "success": response.status < 400,
+                "status_code": response.status,
+                "response": body,
+                "response_time": time.perf_counter() - start
+            }
+    
+    except aiohttp.ClientConnectorError:
         return {"success": False, "error": "Connection refused - backend not running"}
-    except requests.exceptions.Timeout:
+    except asyncio.TimeoutError:
         return {"success": False, "error": "Request timeout"}
-    except requests.exceptions.RequestException as e:
-        return {"success": False, "error": f"Request error: {str(e)}"}
-    except json.JSONDecodeError:
+    except json.JSONDecodeError:  # orjson.JSONDecodeError is a subclass
         return {"success": False, "error": "Invalid JSON response"}
+    except aiohttp.ClientError as e:
+        return {"success": False, "error": f"Request error: {str(e)}"}
     except Exception as e:
         return {"success": False, "error": f"Unexpected error: {str(e)}"}
 
-def run_comprehensive_tests():
+async def run_comprehensive_tests():
     """Run comprehensive backend tests"""
     
     colored_print("🎯 M-Pesa Expense Tracker Backend Test Suite", "cyan")
     colored_print("=" * 60, "cyan")
     
-    # Test endpoints
-    test_cases = [
-        # Basic connectivity
-        {"name": "Root Endpoint", "endpoint": "/api/", "critical": True},
-        {"name": "Health Check", "endpoint": "/api/health", "critical": True},
-        
-        # Core functionality
-        {"name": "Analytics Summary", "endpoint": "/api/transactions/analytics/summary", "critical": True},
-        {"name": "Categories List", "endpoint": "/api/categories/", "critical": True},
-        {"name": "Transactions List", "endpoint": "/api/transactions/", "critical": False},
-        
-        # Budget endpoints
-        {"name": "Budget Summary", "endpoint": "/api/budgets/summary?month=12&year=2024", "critical": False},
-        {"name": "Budget Alerts", "endpoint": "/api/budgets/alerts", "critical": False},
-        {"name": "Budget Monitoring", "endpoint": "/api/budgets/monitoring/analysis?month=12&year=2024", "critical": False},
-        {"name": "Budget Goals", "endpoint": "/api/budgets/monitoring/goals?month=12&year=2024", "critical": False},
-        
-        # Additional endpoints
-        {"name": "Charges Analytics", "endpoint": "/api/transactions/charges/analytics?period=month", "critical": False},
-        {"name": "Debug Database", "endpoint": "/api/transactions/debug/database", "critical": False},
-    ]
-    
     results = []
     critical_failures = 0
     
     colored_print(f"🌐 Testing backend at: {BASE_URL}", "blue")
     colored_print(f"⏱️  Timeout: {TIMEOUT}s per request\n", "blue")
     
-    for i, test_case in enumerate(test_cases, 1):
-        endpoint = test_case["endpoint"]
-        name = test_case["name"]
-        critical = test_case.get("critical", False)
+    # The endpoints are independent, so probe them all at once; the run
+    # takes as long as the slowest one rather than the sum of them all.
+    # Test cases repeating an endpoint share a single probe.
+    probes = dict.fromkeys((test_case.endpoint, test_case.inspect) for test_case in TEST_CASES)
+    
+    timeout = aiohttp.ClientTimeout(total=TIMEOUT)
+    async with aiohttp.ClientSession(timeout=timeout) as session:
+        probe_results = await asyncio.gather(
+            *(test_endpoint(session, endpoint, inspect=inspect) for endpoint, inspect in probes)
+        )
+    probes = dict(zip(probes, probe_results))
+    endpoint_results = [probes[(test_case.endpoint, test_case.inspect)] for test_case in TEST_CASES]
+    
+    # Report in test order, collected and written out in one go
+    report = io.StringIO()
+    for i, (test_case, result) in enumerate(zip(TEST_CASES, endpoint_results), 1):
+        endpoint = test_case.endpoint
+        name = test_case.name
+        critical = test_case.critical
         
-        colored_print(f"[{i:2d}/{len(test_cases)}] Testing {name}...", "white")
+        colored_print(f"[{i:2d}/{len(TEST_CASES)}] Testing {name}...", "white", report)
         
-        result = test_endpoint(endpoint)
         results.append({"name": name, "endpoint": endpoint, "critical": critical, **result})
         
         if result["success"]:
             response_time = result.get("response_time", 0)
-            colored_print(f"      ✅ SUCCESS ({response_time:.2f}s)", "green")
+            colored_print(f"      ✅ SUCCESS ({response_time:.2f}s)", "green", report)
             
             # Show some response data for key endpoints
-            if "analytics" in endpoint.lower() or "health" in endpoint.lower():
+            if test_case.inspect:
                 response_data = result.get("response", {})
                 if isinstance(response_data, dict):
                     if "status" in response_data:
-                        colored_print(f"         Status: {response_data['status']}", "green")
+                        colored_print(f"         Status: {response_data['status']}", "green", report)
                     if "totals" in response_data:
                         totals = response_data["totals"]
-                        colored_print(f"         Income: KSh {totals.get('income', 0):,.2f}, Expenses: KSh {totals.get('expenses', 0):,.2f}", "green")
+                        colored_print(f"         Income: KSh {totals.get('income', 0):,.2f}, Expenses: KSh {totals.get('expenses', 0):,.2f}", "green", report)
         else:
             error = result.get("error", "Unknown error")
             status_code = result.get("status_code")
             
             if critical:
                 critical_failures += 1
-                colored_print(f"      ❌ CRITICAL FAILURE: {error}", "red")
+                colored_print(f"      ❌ CRITICAL FAILURE: {error}", "red", report)
                 if status_code:
-                    colored_print(f"         Status Code: {status_code}", "red")
+                    colored_print(f"         Status Code: {status_code}", "red", report)
             else:
-                colored_print(f"      ⚠️  FAILURE: {error}", "yellow")
+                colored_print(f"      ⚠️  FAILURE: {error}", "yellow", report)
                 if status_code:
-                    colored_print(f"         Status Code: {status_code}", "yellow")
+                    colored_print(f"         Status Code: {status_code}", "yellow", report)
         
-        print()  # Empty line for spacing
+        report.write("\n")  # Empty line for spacing
+    
+    sys.stdout.write(report.getvalue())
     
     # Summary
     colored_print("📊 TEST SUMMARY", "cyan")
@@ -183,7 +219,7 @@ def run_comprehensive_tests():
 def main():
     """Main function"""
     try:
-        success = run_comprehensive_tests()
+        success = asyncio.run(run_comprehensive_tests())
         return 0 if success else 1
     except KeyboardInterrupt:
         colored_print("\n\n🛑 Tests interrupted by user", "yellow")
@@ -193,5 +229,4 @@ def main():
         return 1
 
 if __name__ == "__main__":
-    import sys
     sys.exit(main())
@@ -0,0 +1,6 @@
+import sys
+from pathlib import Path
+
+# The backend imports its modules from the backend directory (config.*,
+# services.*, utils.*), as when the server is started there
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
@@ -0,0 +1,132 @@
+import pytest
+
+from utils import cache
+from utils.cache import BloomFilter, LRUCache, ScalableBloomFilter
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(cache.time, 'monotonic', fake)
+    return fake
+
+
+def test_get_missing_returns_default_and_counts_miss():
+    lru = LRUCache()
+    assert lru.get('a') is None
+    assert lru.get('a', 'fallback') == 'fallback'
+    assert lru.info()['misses'] == 2
+
+
+def test_get_default_distinguishes_a_stored_none():
+    lru = LRUCache()
+    missing = object()
+    lru.set('a', None)
+    assert lru.get('a', missing) is None
+    assert lru.get('b', missing) is missing
+    assert lru.info()['hits'] == 1
+
+
+def test_least_recently_used_entry_is_evicted():
+    lru = LRUCache(maxsize=2)
+    lru.set('a', 1)
+    lru.set('b', 2)
+    lru.get('a')
+    lru.set('c', 3)
+    assert lru.get('b') is None
+    assert lru.get('a') == 1 and lru.get('c') == 3
+    assert len(lru) == 2
+
+
+def test_set_on_existing_key_refreshes_its_position():
+    lru = LRUCache(maxsize=2)
+    lru.set('a', 1)
+    lru.set('b', 2)
+    lru.set('a', 10)
+    lru.set('c', 3)
+    assert lru.get('a') == 10
+    assert lru.get('b') is None
+
+
+def test_entries_expire_after_ttl(clock):
+    lru = LRUCache(ttl=60)
+    lru.set('a', 1)
+    clock.now += 59
+    assert lru.get('a') == 1
+    clock.now += 1
+    assert lru.get('a') is None
+    assert len(lru) == 0
+
+
+def test_without_ttl_entries_do_not_expire(clock):
+    lru = LRUCache()
+    lru.set('a', 1)
+    clock.now += 10 ** 9
+    assert lru.get('a') == 1
+
+
+def test_replace_live_entry_keeps_its_expiry(clock):
+    lru = LRUCache(ttl=60)
+    lru.set('a', 1)
+    clock.now += 30
+    assert lru.replace('a', 2) is True
+    assert lru.get('a') == 2
+    clock.now += 30
+    assert lru.get('a') is None
+
+
+def test_replace_absent_or_expired_entry_stores_nothing(clock):
+    lru = LRUCache(ttl=60)
+    assert lru.replace('a', 1) is False
+    assert lru.get('a') is None
+    lru.set('b', 1)
+    clock.now += 60
+    assert lru.replace('b', 2) is False
+    assert lru.get('b') is None
+
+
+def test_invalidate_and_clear():
+    lru = LRUCache()
+    lru.set('a', 1)
+    lru.set('b', 2)
+    lru.invalidate('a')
+    lru.invalidate('missing')
+    assert lru.get('a') is None and lru.get('b') == 2
+    lru.clear()
+    assert len(lru) == 0
+
+
+def _false_positive_rate(bloom, count):
+    return sum(f'absent-{i}' in bloom for i in range(count)) / count
+
+
+def test_bloom_filter_has_no_false_negatives_and_bounded_false_positives():
+    bloom = BloomFilter(capacity=10_000, error_rate=0.01)
+    keys = [f'key-{i}' for i in range(10_000)]
+    for key in keys:
+        bloom.add(key)
+    assert all(key in bloom for key in keys)
+    assert len(bloom) == 10_000
+    # At capacity the rate is about error_rate; allow for sampling noise
+    assert _false_positive_rate(bloom, 20_000) < 0.02
+
+
+def test_scalable_bloom_filter_grows_past_its_initial_capacity():
+    bloom = ScalableBloomFilter(initial_capacity=1_000, error_rate=0.01)
+    keys = [f'key-{i}' for i in range(10_000)]
+    for key in keys:
+        bloom.add(key)
+    assert len(bloom._layers) > 1
+    assert [layer.capacity for layer in bloom._layers][:3] == [1_000, 2_000, 4_000]
+    assert all(key in bloom for key in keys)
+    assert len(bloom) == 10_000
+    # Growing keeps the combined rate under error_rate instead of saturating
+    assert _false_positive_rate(bloom, 20_000) < 0.02
@@ -0,0 +1,75 @@
+from datetime import datetime
+
+import pytest
+
+from config.pesadb import bind_params, escape_string
+
+
+def test_binds_values_in_placeholder_order():
+    sql = bind_params("SELECT * FROM transactions WHERE user_id = ? AND amount > ?", ['u1', 100])
+    assert sql == "SELECT * FROM transactions WHERE user_id = 'u1' AND amount > 100"
+
+
+def test_single_quotes_are_doubled():
+    assert bind_params("SELECT * FROM users WHERE name = ?", ["O'Brien"]) == \
+        "SELECT * FROM users WHERE name = 'O''Brien'"
+
+
+def test_injection_attempt_stays_inside_the_literal():
+    sql = bind_params("SELECT * FROM users WHERE email = ?", ["x' OR '1'='1"])
+    assert sql == "SELECT * FROM users WHERE email = 'x'' OR ''1''=''1'"
+
+
+def test_question_mark_inside_string_literal_is_not_a_placeholder():
+    sql = bind_params("SELECT * FROM categories WHERE name = 'What?' AND id = ?", ['c1'])
+    assert sql == "SELECT * FROM categories WHERE name = 'What?' AND id = 'c1'"
+
+
+def test_question_mark_after_escaped_quote_inside_literal():
+    sql = bind_params("SELECT * FROM t WHERE a = 'it''s ?' AND b = ?", [1])
+    assert sql == "SELECT * FROM t WHERE a = 'it''s ?' AND b = 1"
+
+
+def test_question_mark_in_bound_value_is_not_rebound():
+    assert bind_params("UPDATE t SET a = ?, b = ?", ['?', 'x']) == "UPDATE t SET a = '?', b = 'x'"
+
+
+def test_tuple_expands_without_parentheses():
+    # The template supplies the parentheses: callers write IN (?)
+    assert bind_params("SELECT * FROM t WHERE id IN (?)", [('a', "b'c")]) == \
+        "SELECT * FROM t WHERE id IN ('a', 'b''c')"
+    assert bind_params("id IN ?", [('a', 'b')]) == "id IN 'a', 'b'"
+
+
+def test_empty_tuple_is_rejected():
+    with pytest.raises(ValueError):
+        bind_params("SELECT * FROM t WHERE id IN (?)", [()])
+
+
+@pytest.mark.parametrize('sql, params', [
+    ("SELECT * FROM t WHERE a = ? AND b = ?", ['x']),
+    ("SELECT * FROM t WHERE a = ?", ['x', 'y']),
+    ("SELECT * FROM t WHERE a = '?'", ['x']),
+])
+def test_placeholder_count_mismatch_raises(sql, params):
+    with pytest.raises(ValueError):
+        bind_params(sql, params)
+
+
+@pytest.mark.parametrize('params', [None, [], ()])
+def test_empty_params_pass_sql_through_unchanged(params):
+    # Not validated: leftover placeholders are sent as they are
+    assert bind_params("SELECT * FROM t WHERE a = ?", params) == "SELECT * FROM t WHERE a = ?"
+
+
+@pytest.mark.parametrize('value, expected', [
+    (None, 'NULL'),
+    (True, 'TRUE'),
+    (False, 'FALSE'),
+    (3, '3'),
+    (2.5, '2.5'),
+    (datetime(2024, 1, 2, 3, 4, 5), "'2024-01-02T03:04:05'"),
+    ({'note': "it's"}, "'{\"note\":\"it''s\"}'"),
+])
+def test_escape_string_value_types(value, expected):
+    assert escape_string(value) == expected
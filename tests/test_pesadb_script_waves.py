@@ -0,0 +1,94 @@
+import asyncio
+
+from config import pesadb_script
+from config.pesadb_script import merge_inserts, plan_schema_waves, run_schema_waves
+
+USERS = "CREATE TABLE users (id STRING PRIMARY KEY)"
+CATEGORIES = "CREATE TABLE categories (id STRING PRIMARY KEY, user_id STRING REFERENCES users(id))"
+TRANSACTIONS = (
+    "CREATE TABLE transactions (id STRING PRIMARY KEY, user_id STRING REFERENCES users(id), "
+    "category_id STRING REFERENCES categories(id), parent_id STRING REFERENCES transactions(id))"
+)
+STATUS = "CREATE TABLE status_checks (id STRING PRIMARY KEY)"
+INDEX = "CREATE INDEX idx_transactions_user ON transactions (user_id)"
+
+
+def test_tables_are_ordered_by_foreign_key_depth():
+    waves = plan_schema_waves([TRANSACTIONS, INDEX, CATEGORIES, STATUS, USERS])
+    assert waves == [[STATUS, USERS], [CATEGORIES], [TRANSACTIONS], [INDEX]]
+
+
+def test_references_to_tables_outside_the_script_are_ignored():
+    orphan = "CREATE TABLE budgets (id STRING, user_id STRING REFERENCES users(id))"
+    assert plan_schema_waves([orphan]) == [[orphan]]
+
+
+def test_reference_cycle_does_not_recurse_forever():
+    a = "CREATE TABLE a (id STRING, b_id STRING REFERENCES b(id))"
+    b = "CREATE TABLE b (id STRING, a_id STRING REFERENCES a(id))"
+    waves = plan_schema_waves([a, b])
+    assert sorted(statement for wave in waves for statement in wave) == [a, b]
+
+
+def test_inserts_follow_ddl_one_table_per_wave_in_script_order():
+    system_user = "INSERT INTO users (id) VALUES ('system')"
+    category = "INSERT INTO categories (id, user_id) VALUES ('c1', 'system')"
+    waves = plan_schema_waves([USERS, system_user, CATEGORIES, category, INDEX])
+    assert waves == [[USERS], [CATEGORIES], [INDEX], [system_user], [category]]
+
+
+def test_merge_inserts_combines_rows_with_the_same_columns():
+    first = "INSERT INTO categories (id, name) VALUES ('c1', 'Food')"
+    second = "INSERT INTO categories (id,  name) VALUES ('c2', 'Rent; and bills')"
+    other_columns = "INSERT INTO categories (id) VALUES ('c3')"
+    merged = merge_inserts([first, second, other_columns, INDEX])
+    assert merged == [
+        ("INSERT INTO categories (id, name) VALUES ('c1', 'Food'), ('c2', 'Rent; and bills')", [first, second]),
+        ("INSERT INTO categories (id) VALUES ('c3')", [other_columns]),
+        (INDEX, [INDEX]),
+    ]
+
+
+def test_merge_inserts_respects_the_byte_limit(monkeypatch):
+    rows = [f"INSERT INTO t (id) VALUES ('{i:03}')" for i in range(5)]
+    single = len("INSERT INTO t (id) VALUES ('000')")
+    # Room for the first statement and exactly one more row
+    monkeypatch.setattr(pesadb_script, 'MAX_MERGED_INSERT_BYTES', single + len(", ('000')"))
+    merged = merge_inserts(rows)
+    assert [originals for _, originals in merged] == [rows[0:2], rows[2:4], rows[4:5]]
+    assert all(len(sql) <= pesadb_script.MAX_MERGED_INSERT_BYTES for sql, _ in merged)
+
+
+def _run(statements, monkeypatch, fail):
+    sent = []
+
+    async def execute_db(sql):
+        sent.append(sql)
+        if fail(sql):
+            raise RuntimeError(f"rejected: {sql}")
+        return True
+
+    monkeypatch.setattr(pesadb_script, 'execute_db', execute_db)
+
+    async def collect():
+        return [item async for item in run_schema_waves(statements)]
+
+    return asyncio.run(collect()), sent
+
+
+def test_failed_multi_row_insert_falls_back_to_single_rows(monkeypatch):
+    rows = [f"INSERT INTO users (id) VALUES ('u{i}')" for i in range(3)]
+    # The merged INSERT and the one bad row fail
+    results, sent = _run(rows, monkeypatch, lambda sql: "'u1'" in sql)
+    assert sent[0] == "INSERT INTO users (id) VALUES ('u0'), ('u1'), ('u2')"
+    assert sorted(sent[1:]) == rows
+    assert [statement for statement, _ in results] == rows
+    assert [error is None for _, error in results] == [True, False, True]
+
+
+def test_single_row_failure_is_not_retried(monkeypatch):
+    row = "INSERT INTO users (id) VALUES ('u0')"
+    results, sent = _run([USERS, row], monkeypatch, lambda sql: sql == row)
+    assert sent == [USERS, row]
+    assert results[0] == (USERS, None)
+    assert results[1][0] == row and isinstance(results[1][1], RuntimeError)
@@ -0,0 +1,68 @@
+import pytest
+
+from config.pesadb import bind_params
+from config.pesadb_where import Where
+
+
+def test_empty_builder_builds_empty_clause():
+    assert Where().build() == ('', [])
+
+
+def test_conditions_are_anded_in_order():
+    where, params = Where().eq('user_id', 'u1').gte('date', '2024-01-01').lte('date', '2024-01-31').build()
+    assert where == 'user_id = ? AND date >= ? AND date <= ?'
+    assert params == ['u1', '2024-01-01', '2024-01-31']
+
+
+@pytest.mark.parametrize('value', [None, ''])
+def test_optional_condition_skipped_for_missing_value(value):
+    where, params = (
+        Where()
+        .eq('user_id', 'u1')
+        .eq('category_id', value, optional=True)
+        .gte('date', value, optional=True)
+        .lte('date', value, optional=True)
+        .build()
+    )
+    assert where == 'user_id = ?'
+    assert params == ['u1']
+
+
+@pytest.mark.parametrize('value', [0, False, 'x'])
+def test_optional_condition_kept_for_falsy_but_present_value(value):
+    assert Where().eq('amount', value, optional=True).build() == ('amount = ?', [value])
+
+
+def test_required_condition_kept_for_none():
+    assert Where().eq('category_id', None).build() == ('category_id = ?', [None])
+
+
+def test_between():
+    where, params = Where().between('date', '2024-01-01', '2024-01-31').build()
+    assert where == 'date BETWEEN ? AND ?'
+    assert params == ['2024-01-01', '2024-01-31']
+
+
+def test_is_in_binds_values_as_one_tuple():
+    where, params = Where().eq('user_id', 'u1').is_in('id', ['a', 'b']).build()
+    assert where == 'user_id = ? AND id IN (?)'
+    assert params == ['u1', ('a', 'b')]
+    assert bind_params(where, params) == "user_id = 'u1' AND id IN ('a', 'b')"
+
+
+def test_is_in_rejects_empty_values():
+    with pytest.raises(ValueError):
+        Where().is_in('id', [])
+
+
+def test_raw_condition_params():
+    where, params = Where().eq('user_id', 'u1').raw('(amount > ? OR type = ?)', 10, 'income').build()
+    assert where == 'user_id = ? AND (amount > ? OR type = ?)'
+    assert params == ['u1', 10, 'income']
+
+
+def test_build_returns_a_copy_of_params():
+    builder = Where().eq('user_id', 'u1')
+    _, params = builder.build()
+    params.append('extra')
+    assert builder.build() == ('user_id = ?', ['u1'])